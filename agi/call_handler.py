@@ -8,7 +8,9 @@ import sys
 import os
 import logging
 import json
+import time
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -29,6 +31,9 @@ from services.llm_service import LLMService
 from services.tts_service import TTSService
 from services.classifier import IncidentClassifier
 from services.logger import CallLogger
+from services.duplicate_detector import DuplicateDetector
+from services.followup_planner import FollowUpPlanner
+from services.eagi_audio import EAGIAudioStream, is_eagi, split_wav, write_wav
 
 # Configure logging
 logging.basicConfig(
@@ -45,14 +50,17 @@ logger = logging.getLogger(__name__)
 class CallHandler:
     """Main call handling class."""
     
-    def __init__(self, agi=None):
+    def __init__(self, agi=None, overlap=True):
         """
         Initialize call handler.
         
         Args:
             agi: Asterisk AGI instance or None for testing
+            overlap: Transcribe, analyze and render speech in the background
+                while prompts play, instead of one step after another
         """
         self.agi = agi
+        self.overlap = overlap
         self.caller_id = None
         self.language = 'ru'  # default language
         self.call_start_time = datetime.now()
@@ -64,6 +72,7 @@ class CallHandler:
             'classification': None,
             'recording_path': None,
             'duration': None,
+            'incident_id': None,
             'status': 'initiated'
         }
         
@@ -75,6 +84,31 @@ class CallHandler:
         self.classifier = IncidentClassifier()
         self.logger_service = CallLogger()
         
+        # STT, LLM and TTS work in the background; only this thread talks to Asterisk
+        self._executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix='call')
+        self._tts_futures = {}
+        
+        # Silence on the line while the caller waits for us
+        self.dead_air = 0.0
+        self._silent_since = None
+        
+        # EAGI: the caller's audio on fd 3 allows barge-in and end-of-speech detection
+        self.audio_stream = None
+        self.no_input_seconds = float(os.getenv('NO_INPUT_SECONDS', 5))
+        if agi is not None and os.getenv('BARGE_IN', 'true').lower() == 'true' and is_eagi(agi):
+            try:
+                self.audio_stream = EAGIAudioStream().start()
+                logger.info("EAGI audio stream active, barge-in enabled")
+            except Exception as e:
+                logger.warning(f"EAGI audio unavailable, using fixed-length recording: {e}")
+        
+        # Shared with other call processes through the calls database
+        try:
+            self.duplicate_detector = DuplicateDetector(self.logger_service.db_path)
+        except Exception as e:
+            logger.warning(f"Duplicate detection disabled: {e}")
+            self.duplicate_detector = None
+        
         # Greeting messages
         self.greetings = {
             'ru': "102 қызметінің автоматты көмекшісісіз. Қысқаша не болғанын айтыңыз.",
@@ -82,7 +116,14 @@ class CallHandler:
             'en': "This is the automated assistant of 102 service. Please briefly describe what happened."
         }
         
-        # Follow-up questions (max 3)
+        # Played right after the caller finishes, while the first utterance is transcribed
+        self.acknowledgements = {
+            'ru': "Түсіндім, бір сәт күте тұрыңыз.",
+            'kk': "Түсіндім, бір сәт күте тұрыңыз.",
+            'en': "Understood, one moment please."
+        }
+        
+        # Follow-up questions (max 3), asked only for missing slots
         self.follow_up_questions = {
             'ru': [
                 "Не болды?",
@@ -107,6 +148,14 @@ class CallHandler:
             ]
         }
         
+        # Index of the question asking for each slot of the analysis
+        self.slot_questions = {
+            'address': 1,
+            'current_danger': 2,
+            'people_involved': 3,
+            'weapons': 4
+        }
+        
         logger.info("CallHandler initialized")
 
     def set_caller_info(self, caller_id, language='ru'):
@@ -123,13 +172,18 @@ class CallHandler:
         logger.info(f"Playing greeting: {greeting}")
         
         if self.agi:
+            # The caller may start describing the incident during the greeting
+            self._listen()
+            
             # Generate TTS and play
-            audio_path = self.tts_service.text_to_speech(greeting, self.language)
+            audio_path = self._render_text(greeting)
             if audio_path and os.path.exists(audio_path):
-                self.agi.stream_file(audio_path.replace('.wav', ''))  # Asterisk expects no extension
+                self._stream_audio(audio_path, interruptible=True)
             else:
                 # Fallback to pre-recorded or synthesized voice
+                self._end_silence()
                 self.agi.stream_file('custom/ai_greeting')
+                self._start_silence()
         else:
             print(f"[TTS] {greeting}")
         
@@ -148,6 +202,9 @@ class CallHandler:
         """
         logger.info(f"Recording response for {duration} seconds...")
         
+        if self.audio_stream:
+            return self._record_utterance(duration)
+        
         if self.agi:
             # Create temporary file for recording
             with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp:
@@ -155,7 +212,9 @@ class CallHandler:
             
             # Asterisk recording command
             # Note: Actual implementation depends on Asterisk version and configuration
+            self._end_silence()
             self.agi.record_file(recording_path, 'wav', duration, silence_threshold)
+            self._start_silence()
             
             # Wait for recording to complete
             self.agi.wait_for_digit(1000)
@@ -174,6 +233,24 @@ class CallHandler:
             self.call_data['recording_path'] = test_audio
             return test_audio
 
+    def _record_utterance(self, duration):
+        """Take the caller's utterance from the EAGI stream; the turn ends with the speech."""
+        self._end_silence()
+        audio = self.audio_stream.wait_utterance(max_seconds=duration, no_input_seconds=self.no_input_seconds)
+        self._start_silence()
+        
+        if not audio:
+            logger.warning("No speech detected")
+            return None
+        
+        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp:
+            recording_path = tmp.name
+        write_wav(recording_path, audio)
+        
+        logger.info(f"Utterance recorded: {recording_path} ({len(audio) / 16000:.1f}s)")
+        self.call_data['recording_path'] = recording_path
+        return recording_path
+
     def transcribe_audio(self, audio_path):
         """
         Transcribe audio to text using STT service.
@@ -217,35 +294,62 @@ class CallHandler:
         """
         logger.info(f"Analyzing transcript with AI...")
         
-        # Initial analysis
-        initial_result = self.llm_service.analyze_incident(transcript, self.language)
+        # Another caller may already have reported this incident
+        incident = self._find_open_incident(transcript)
+        
+        # Follow-up turns send only the previous result and the new answer
+        session = self.llm_service.start_session(self.language)
+        
+        if incident:
+            # Reuse the incident's analysis instead of calling the LLM again
+            initial_result = dict(incident.analysis)
+            initial_result['needs_clarification'] = False
+            self.call_data['incident_id'] = incident.incident_id
+            session.seed(transcript, initial_result)
+        planner = FollowUpPlanner(self.classifier.extractor)
+        
+        if not incident:
+            # Render the question most likely to follow while the LLM runs
+            address = self.classifier.extractor.extract(transcript).address
+            self._prefetch_question(planner, {'address': address}, transcript)
+            
+            # Initial analysis
+            initial_result = session.analyze(transcript)
         
-        # If more information is needed, ask follow-up questions
+        # The response for the current urgency is usually the final one
+        self._prefetch_text(self._response_text(initial_result))
+        
+        # If more information is needed, ask only for the missing details
         questions_asked = 0
-        all_responses = [transcript]
         
         while questions_asked < max_questions and initial_result.get('needs_clarification', False):
-            # Get next question
-            question_idx = questions_asked % len(self.follow_up_questions[self.language])
-            question = self.follow_up_questions[self.language][question_idx]
+            slot = planner.next_slot(initial_result, session.transcript)
+            if slot is None:
+                logger.info("All required details known, no more questions")
+                break
+            question = self.follow_up_questions[self.language][self.slot_questions[slot]]
+            self._prefetch_question(planner, initial_result, session.transcript)
             
-            # Ask question
+            # Ask question, the caller may answer before it ends
             logger.info(f"Asking follow-up: {question}")
-            self._play_text(question)
+            self._listen()
+            self._play_text(question, interruptible=True)
             
             # Record response
             response_audio = self.record_response(duration=8)
             if response_audio:
                 response_text = self.transcribe_audio(response_audio)
                 if response_text:
-                    all_responses.append(response_text)
-                    
                     # Update analysis with new information
-                    combined_text = " ".join(all_responses)
-                    initial_result = self.llm_service.analyze_incident(combined_text, self.language)
+                    initial_result = session.update(response_text, question)
+                    self._prefetch_text(self._response_text(initial_result))
             
             questions_asked += 1
         
+        logger.info(f"Follow-up dialog: {questions_asked} questions ({', '.join(planner.asked) or 'none'})")
+        if session.turns:
+            logger.info(f"LLM usage: {session.stats()}")
+        
         # Final classification
         final_result = self.classifier.classify(initial_result)
         
@@ -256,17 +360,99 @@ class CallHandler:
         self.call_data['ai_response'] = compliant_result
         self.call_data['classification'] = compliant_result.get('category', 'unknown')
         
+        if not incident:
+            self._open_incident(transcript, compliant_result)
+        
         return compliant_result
 
-    def _play_text(self, text):
+    def _find_open_incident(self, transcript):
+        """Match the call to an incident other callers already reported."""
+        if not self.duplicate_detector:
+            return None
+        
+        try:
+            address = self.classifier.extractor.extract(transcript).address
+            incident = self.duplicate_detector.match(transcript, address)
+            if incident:
+                logger.info(f"Call is about open incident {incident.incident_id} "
+                            f"({incident.call_count} calls), reusing its analysis")
+            return incident
+        except Exception as e:
+            logger.warning(f"Duplicate lookup failed: {e}")
+            return None
+
+    def _open_incident(self, transcript, analysis):
+        """Register the call as a new incident so later callers can be grouped with it."""
+        if not self.duplicate_detector:
+            return
+        
+        try:
+            self.call_data['incident_id'] = self.duplicate_detector.register(transcript, analysis)
+        except Exception as e:
+            logger.warning(f"Failed to register incident: {e}")
+
+    def _play_text(self, text, interruptible=False):
         """Convert text to speech and play."""
         if self.agi:
-            audio_path = self.tts_service.text_to_speech(text, self.language)
+            audio_path = self._render_text(text)
             if audio_path and os.path.exists(audio_path):
-                self.agi.stream_file(audio_path.replace('.wav', ''))
+                self._stream_audio(audio_path, interruptible)
         else:
             print(f"[TTS] {text}")
 
+    def _stream_audio(self, audio_path, interruptible=False):
+        """Play an audio file; with EAGI an interruptible prompt stops when the caller speaks."""
+        self._end_silence()
+        if interruptible and self.audio_stream:
+            # Short segments, so the prompt stops within one segment of the barge-in
+            for segment in split_wav(audio_path):
+                if self.audio_stream.speech_started.is_set():
+                    logger.info("Caller barged in, prompt stopped")
+                    break
+                self.agi.stream_file(segment.replace('.wav', ''))
+        else:
+            self.agi.stream_file(audio_path.replace('.wav', ''))  # Asterisk expects no extension
+        self._start_silence()
+
+    def _listen(self):
+        """Start capturing the next utterance, including speech over the coming prompt."""
+        if self.audio_stream:
+            self.audio_stream.arm()
+
+    def _prefetch_text(self, text):
+        """Start rendering speech for text in the background so it plays without delay."""
+        if self.overlap and self.agi and text not in self._tts_futures:
+            self._tts_futures[text] = self._executor.submit(self.tts_service.text_to_speech, text, self.language)
+
+    def _prefetch_question(self, planner, analysis, transcript):
+        """Prefetch the question for the first open slot that has not been asked yet."""
+        for slot in planner.missing_slots(analysis, transcript):
+            if slot not in planner.asked:
+                self._prefetch_text(self.follow_up_questions[self.language][self.slot_questions[slot]])
+                return
+
+    def _render_text(self, text):
+        """Audio file for text, prefetched if available."""
+        future = self._tts_futures.get(text)
+        if future is not None:
+            try:
+                audio_path = future.result()
+                if audio_path and os.path.exists(audio_path):
+                    return audio_path
+            except Exception as e:
+                logger.warning(f"Prefetched TTS failed: {e}")
+        return self.tts_service.text_to_speech(text, self.language)
+
+    def _start_silence(self):
+        """Mark the end of audio on the line (prompt played or caller recorded)."""
+        self._silent_since = time.monotonic()
+
+    def _end_silence(self):
+        """Mark the start of audio on the line and add the gap to dead air."""
+        if self._silent_since is not None:
+            self.dead_air += time.monotonic() - self._silent_since
+            self._silent_since = None
+
     def _ensure_json_compliance(self, result):
         """Ensure result matches required JSON format."""
         required_format = {
@@ -305,6 +491,12 @@ class CallHandler:
         Returns:
             Response text
         """
+        response = self._response_text(analysis_result)
+        logger.info(f"Generated response: {response}")
+        return response
+
+    def _response_text(self, analysis_result):
+        """Response for the urgency of the analysis."""
         urgency = analysis_result.get('urgency', 'medium')
         category = analysis_result.get('category', 'unknown')
         
@@ -329,9 +521,7 @@ class CallHandler:
             }
         }
         
-        response = responses[self.language].get(urgency, responses[self.language]['medium'])
-        logger.info(f"Generated response: {response}")
-        return response
+        return responses[self.language].get(urgency, responses[self.language]['medium'])
 
     def play_response(self, response_text):
         """Play response to caller."""
@@ -361,19 +551,32 @@ class CallHandler:
         """
         logger.info(f"=== Starting call handling for {caller_id} ===")
         
+        goodbye_msg = {
+            'ru': "Сау болыңыз. Қоңырау аяқталды.",
+            'kk': "Сау болыңыз. Қоңырау аяқталды.",
+            'en': "Goodbye. Call ended."
+        }
+        
         try:
             # 1. Set caller info
             self.set_caller_info(caller_id, language)
             
-            # 2. Play greeting
+            # 2. Play greeting, fixed prompts are rendered meanwhile
+            self._prefetch_text(self.acknowledgements[self.language])
+            self._prefetch_text(goodbye_msg[self.language])
             self.play_greeting()
             
             # 3. Record initial response
             recording = self.record_response(duration=15)
             
             if recording:
-                # 4. Transcribe audio
-                transcript = self.transcribe_audio(recording)
+                # 4. Transcribe audio, while the acknowledgement plays
+                if self.overlap and self.agi:
+                    transcription = self._executor.submit(self.transcribe_audio, recording)
+                    self._play_text(self.acknowledgements[self.language])
+                    transcript = transcription.result()
+                else:
+                    transcript = self.transcribe_audio(recording)
                 
                 if transcript and len(transcript.strip()) > 10:
                     # 5. Analyze with AI
@@ -398,13 +601,9 @@ class CallHandler:
             self.log_call()
             
             # 8. Play goodbye
-            goodbye_msg = {
-                'ru': "Сау болыңыз. Қоңырау аяқталды.",
-                'kk': "Сау болыңыз. Қоңырау аяқталды.",
-                'en': "Goodbye. Call ended."
-            }
             self._play_text(goodbye_msg[self.language])
             
+            logger.info(f"Dead air: {self.dead_air:.1f}s")
             logger.info("=== Call handling completed successfully ===")
             
         except Exception as e:
@@ -421,6 +620,11 @@ class CallHandler:
             }
             if self.agi:
                 self._play_text(error_msg[self.language])
+        
+        finally:
+            self._executor.shutdown(wait=False)
+            if self.audio_stream:
+                self.audio_stream.close()
 
 
 def main():
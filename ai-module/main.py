@@ -1,14 +1,25 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import logging
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import os
 from dotenv import load_dotenv
 import base64
 import sys
-from openai import OpenAI
+import io
+import json
+import wave
+import time
+import asyncio
+import uuid
+import threading
+from contextlib import asynccontextmanager
+from collections import deque
+from openai import AsyncOpenAI
+from fastapi.responses import Response, JSONResponse
+from starlette.concurrency import run_in_threadpool
 
 # Настройка путей и сервисов
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -17,27 +28,43 @@ load_dotenv()
 from services.speech_to_text import SpeechToTextService
 from services.openai_classifier import OpenAIClassifierService
 from services.tts_service import TTSService
+from services.classifier import IncidentClassifier
+from services.call_scheduler import PriorityCallScheduler, SchedulerOverloaded, prescore_call
+from services.circuit_breaker import breaker_states
+from services.vad import VoiceActivityDetector
+from services.session_store import CallSessionState, create_session_store
 
-app = FastAPI(title="AI Call Intake Module")
-
-# CORS и Логи
-app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+# Логи
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Инициализация (ленивая - при первом запросе)
+# Инициализация (прогрев при старте или при первом запросе)
 speech_service = None
 openai_classifier_service = None
 tts_service = None
 client = None
+incident_classifier = IncidentClassifier()
+call_scheduler = PriorityCallScheduler(
+    max_concurrency=int(os.getenv("CALL_WORKERS", 4)),
+    max_queue=int(os.getenv("CALL_QUEUE_SIZE", 64))
+)
+# История диалога и инцидент звонка хранятся на сервере по sessionId
+session_store = create_session_store()
+# Прогрев при старте: /ready отвечает 200 только после него
+readiness: Dict[str, Any] = {"ready": False, "status": "starting", "steps": {}}
+_init_lock = threading.Lock()
 
 def initialize_services():
-    """Инициализация сервисов при первом запросе (ленивая загрузка)"""
+    """Инициализация сервисов (при старте в warm-up или при первом запросе)"""
+    with _init_lock:
+        if speech_service is not None:
+            return  # Уже инициализировано
+        _create_services()
+
+def _create_services():
+    """Создание сервисов и клиента OpenAI (под _init_lock)"""
     global speech_service, openai_classifier_service, tts_service, client
     
-    if speech_service is not None:
-        return  # Уже инициализировано
-    
     try:
         # Используем mock для STT и TTS при старте
         os.environ['STT_ENGINE'] = 'mock'  # Принудительно mock
@@ -47,24 +74,92 @@ def initialize_services():
         openai_classifier_service = OpenAIClassifierService()
         tts_service = TTSService()
         
-        # OpenAI client может отсутствовать без API key
+        # OpenAI client может отсутствовать без API key; асинхронный клиент не занимает поток на время ответа
         api_key = os.getenv("OPENAI_API_KEY", "sk-test-key")
-        client = OpenAI(api_key=api_key)
-        logger.info("✅ Services Initialized Successfully (mock engines, lazy loading)")
+        client = AsyncOpenAI(api_key=api_key)
+        logger.info("✅ Services Initialized Successfully (mock engines)")
     except Exception as e:
         logger.error(f"❌ Error initializing services: {e}", exc_info=True)
         client = None
 
+
+async def warm_up():
+    """
+    Прогрев после старта: создание сервисов и пробный прогон STT, ответа,
+    классификации и TTS, чтобы загрузка моделей, кэши и соединения с OpenAI
+    не доставались первому абоненту. Ошибки внешних вызовов не мешают
+    готовности (они и в работе уходят в fallback), ошибка создания сервисов — мешает.
+    """
+    started = time.perf_counter()
+    readiness["status"] = "warming_up"
+
+    async def step(name: str, coroutine):
+        step_started = time.perf_counter()
+        try:
+            await coroutine
+            readiness["steps"][name] = {"ok": True, "ms": round((time.perf_counter() - step_started) * 1000)}
+        except Exception as e:
+            logger.warning(f"Warm-up step {name} failed: {e}")
+            readiness["steps"][name] = {"ok": False, "error": str(e)}
+
+    await step("init", run_in_threadpool(initialize_services))
+    if speech_service is None:
+        readiness["status"] = "failed"
+        return
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(b'\0\0' * 16000)  # 1 с тишины
+    await step("stt", run_in_threadpool(speech_service.transcribe, buffer.getvalue(), "ru"))
+
+    if os.getenv("WARMUP_REMOTE", "1") == "1":
+        await asyncio.gather(
+            step("llm", _reply("warmup", "Проверка связи", [])),
+            step("classifier", _classify("warmup", "Проверка связи"))
+        )
+    await step("tts", _speak("warmup", "Проверка связи"))
+
+    readiness.update(ready=True, status="ready", warmup_ms=round((time.perf_counter() - started) * 1000))
+    logger.info(f"✅ Warm-up finished in {readiness['warmup_ms']} ms")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Прогрев в фоне (liveness /health доступен сразу) и остановка планировщика"""
+    if os.getenv("WARMUP_ON_STARTUP", "1") == "1":
+        warmup_task = asyncio.create_task(warm_up())
+    else:
+        warmup_task = None
+        readiness.update(ready=True, status="ready")  # Ленивая инициализация при первом запросе
+
+    yield
+
+    if warmup_task:
+        warmup_task.cancel()
+    await call_scheduler.stop()
+
+
+app = FastAPI(title="AI Call Intake Module", lifespan=lifespan)
+
+# CORS
+app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+
 # --- Модели данных ---
 class ProcessCallRequest(BaseModel):
     sessionId: str
     audioData: str 
-    history: List[Dict[str, str]] = [] 
+    history: List[Dict[str, str]] = []  # Только для старых клиентов: начальная история новой сессии
+    waitForAudio: bool = True  # False: ответить сразу после текста и инцидента, аудио забрать по audioUrl
+    callerProfile: Optional[Dict[str, Any]] = None  # История номера (false_calls, suspected_hoax) из CallerProfileCache
 
 class ProcessCallResponse(BaseModel):
     userText: str
     responseText: str
     audioBase64: Optional[str] = None
+    audioUrl: Optional[str] = None
     incident: Dict[str, Any] = {}
 
 # --- Промпт Диспетчера ---
@@ -78,13 +173,45 @@ SYSTEM_PROMPT = """Ты — опытный оператор службы 112 (К
 
 @app.get("/health")
 def health():
-    return {"status": "ok", "version": "updated_v2"}
+    return {
+        "status": "ok",
+        "version": "updated_v2",
+        "ready": readiness["ready"],
+        "scheduler": call_scheduler.get_stats(),
+        "circuit_breakers": breaker_states(),
+        "stream_sessions": len(stream_sessions),
+        "pending_audio": len(pending_audio),
+        "sessions": session_store.get_stats()
+    }
+
+
+@app.get("/ready")
+def ready():
+    """Готовность принимать звонки (после прогрева); 503, пока реплика не прогрета"""
+    return JSONResponse(status_code=200 if readiness["ready"] else 503, content=readiness)
+
+
+@app.get("/sessions/{session_id}")
+async def get_session(session_id: str):
+    """Текущее состояние звонка: реплики, транскрипция и инцидент"""
+    state = await session_store.get(session_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return state.to_dict()
+
+
+@app.delete("/sessions/{session_id}")
+async def end_session(session_id: str):
+    """Завершение звонка: состояние больше не нужно"""
+    await session_store.delete(session_id)
+    return {"status": "deleted"}
 
 @app.post("/process-call", response_model=ProcessCallResponse)
 async def process_call(request: ProcessCallRequest):
     try:
-        # Инициализация сервисов при первом запросе
-        initialize_services()
+        # Инициализация сервисов при первом запросе (в пуле потоков: прогрев может держать _init_lock)
+        if speech_service is None:
+            await run_in_threadpool(initialize_services)
         
         session_id = request.sessionId
         logger.info(f"[{session_id}] 📨 Processing audio chunk...")
@@ -99,8 +226,8 @@ async def process_call(request: ProcessCallRequest):
             audio_bytes = base64.b64decode(request.audioData)
             logger.info(f"[{session_id}] Decoded audio: {len(audio_bytes)} bytes")
             
-            # Transcribe
-            user_text = speech_service.transcribe(audio_bytes, "ru")
+            # Transcribe (в пуле потоков, чтобы не блокировать цикл событий)
+            user_text = await run_in_threadpool(speech_service.transcribe, audio_bytes, "ru")
             logger.info(f"[{session_id}] STT result: {user_text}")
         except Exception as e:
             logger.error(f"[{session_id}] STT Error: {str(e)}", exc_info=True)
@@ -113,60 +240,321 @@ async def process_call(request: ProcessCallRequest):
 
         logger.info(f"[{session_id}] 🗣️ User: {user_text}")
 
-        # 2. Text -> AI Response
-        ai_text = "Понял. Что еще можете рассказать?"
+        state = await session_store.get(session_id)
+        if state is None:
+            state = CallSessionState(session_id)
+            for message in request.history:
+                if message.get("role") == "user":
+                    state.transcript = f"{state.transcript} {message.get('content', '')}".strip()
+            state.turns = list(request.history)
+        if request.callerProfile is not None:
+            state.caller_profile = request.callerProfile
+
+        # Приоритет по ключевым словам текущей реплики и прошлых реплик абонента
+        priority = prescore_call(f"{state.transcript} {user_text}", incident_classifier)
+
         try:
-            if not client:
-                logger.warning(f"[{session_id}] OpenAI client not initialized")
-                ai_text = "Система готова. Расскажите подробнее."
+            ai_text, incident_data, speech = await call_scheduler.submit(priority, _session_turn, state, user_text)
+        except SchedulerOverloaded as e:
+            logger.warning(f"[{session_id}] Shed {priority.name} chunk: scheduler overloaded")
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+        response = ProcessCallResponse(userText=user_text, responseText=ai_text, incident=incident_data)
+        if request.waitForAudio:
+            audio_response = await speech
+            if audio_response:
+                response.audioBase64 = base64.b64encode(audio_response).decode('utf-8')
+        else:
+            response.audioUrl = _defer_audio(speech)
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error in process-call: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Аудио ответов, которые клиент заберет позже (waitForAudio=false)
+PENDING_AUDIO_TTL_SECONDS = 60
+pending_audio: Dict[str, "asyncio.Task"] = {}
+
+
+def _defer_audio(speech: "asyncio.Task") -> str:
+    """Сохранить задачу TTS до запроса клиента; невостребованное аудио удаляется через TTL"""
+    audio_id = uuid.uuid4().hex
+    pending_audio[audio_id] = speech
+    asyncio.get_running_loop().call_later(PENDING_AUDIO_TTL_SECONDS, pending_audio.pop, audio_id, None)
+    return f"/process-call/audio/{audio_id}"
+
+
+@app.get("/process-call/audio/{audio_id}")
+async def get_call_audio(audio_id: str):
+    """Аудио ответа в WAV: ждет окончания синтеза, если он еще идет"""
+    speech = pending_audio.pop(audio_id, None)
+    if speech is None:
+        raise HTTPException(status_code=404, detail="Audio not found or expired")
+    audio_response = await speech
+    if not audio_response:
+        return Response(status_code=204)
+    return Response(content=audio_response, media_type="audio/wav")
+
+
+async def _session_turn(state: CallSessionState, user_text: str) -> Tuple[str, Dict[str, Any], "asyncio.Task"]:
+    """
+    Ход диалога как граф задач: ответ LLM и классификация реплики идут параллельно,
+    TTS стартует, как только готов текст ответа. Возвращает текст, инцидент
+    (дополненный классификацией) и задачу TTS, которую вызывающий ждет сам.
+    """
+    session_id = state.session_id
+    classification = asyncio.create_task(_classify(session_id, user_text, state.caller_profile))
+    ai_text = await _reply(session_id, user_text, state.turns)
+    speech = asyncio.create_task(_speak(session_id, ai_text))
+
+    fragment = await classification
+
+    def apply_turn(current: CallSessionState):
+        # Реплика добавляется к состоянию из хранилища, а не к прочитанному до LLM:
+        # параллельный ход той же сессии (другой процесс) не затирается
+        if state.caller_profile is not None:
+            current.caller_profile = state.caller_profile
+        current.add_turn(user_text, ai_text)
+        current.merge_incident(fragment)
+
+    state.refresh(await session_store.update(session_id, apply_turn, default=state))
+    return ai_text, state.incident, speech
+
+
+async def _reply(session_id: str, user_text: str, history: List[Dict[str, str]]) -> str:
+    """Ответ диспетчера (асинхронный клиент OpenAI)"""
+    try:
+        if not client:
+            logger.warning(f"[{session_id}] OpenAI client not initialized")
+            return "Система готова. Расскажите подробнее."
+
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+        # Добавляем историю (последние 4 сообщения для контекста)
+        messages.extend(history[-4:])
+        messages.append({"role": "user", "content": user_text})
+
+        completion = await client.chat.completions.create(
+            model="gpt-4o-mini", messages=messages, max_tokens=100, timeout=5
+        )
+        ai_text = completion.choices[0].message.content
+        logger.info(f"[{session_id}] 🤖 AI: {ai_text}")
+        return ai_text
+    except Exception as e:
+        logger.error(f"[{session_id}] LLM Error: {str(e)}")
+        return "Извините, ошибка обработки."
+
+
+async def _classify(session_id: str, user_text: str,
+                    caller_profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Данные инцидента по реплике (для ЕРДР); не зависят от ответа диспетчера"""
+    try:
+        classification = await openai_classifier_service.aclassify(user_text, caller_profile)
+        incident_data = {
+            "type": classification.categories[0] if classification.categories else "Unknown",
+            "address": classification.extracted_info.get("address", ""),
+            "priority": classification.priority,
+            "description": user_text
+        }
+        logger.info(f"[{session_id}] Classification: {incident_data['type']}")
+        return incident_data
+    except Exception as e:
+        logger.error(f"[{session_id}] Classification Error: {str(e)}")
+        return {"type": "Unknown", "address": "", "priority": "low", "description": user_text}
+
+
+async def _speak(session_id: str, ai_text: str) -> Optional[bytes]:
+    """Аудио ответа (без base64); движки TTS синхронные, поэтому в пуле потоков"""
+    try:
+        audio_response = await run_in_threadpool(tts_service.generate_speech, ai_text, "ru")
+        logger.info(f"[{session_id}] TTS: Generated {len(audio_response) if audio_response else 0} bytes")
+        return audio_response
+    except Exception as e:
+        logger.error(f"[{session_id}] TTS Error: {str(e)}")
+        return None
+
+
+# --- WebSocket-поток ---
+# Протокол /ws/call/{session_id}:
+#   клиент -> сервер: текст {"type": "start", "sampleRate": 16000, "language": "ru", "vad": true,
+#                            "callerProfile": {...}} (необязательно, история номера)
+#                     бинарные кадры PCM 16 бит моно
+#                     текст {"type": "flush"} - конец реплики (без VAD или досрочно)
+#                     текст {"type": "stop"} - конец звонка
+#   сервер -> клиент: {"type": "transcript"}, {"type": "response"} с инцидентом,
+#                     бинарное аудио TTS частями и {"type": "audio_end"}, {"type": "error"}
+STREAM_AUDIO_CHUNK = 32 * 1024
+STREAM_MAX_UTTERANCE_SECONDS = 30
+
+stream_sessions: Dict[str, "StreamSession"] = {}
+
+
+class StreamSession:
+    """Состояние WebSocket-сессии: буфер PCM, детектор речи и история диалога"""
+
+    def __init__(self, session_id: str, state: CallSessionState):
+        self.session_id = session_id
+        self.state = state  # Из хранилища: переподключение продолжает звонок
+        self.utterances: asyncio.Queue = asyncio.Queue()
+        self.bytes_received = 0
+        self.configure()
+
+    def configure(self, sample_rate: int = 16000, language: str = "ru", vad: bool = True):
+        """Параметры потока из сообщения start (незаконченная реплика отбрасывается)"""
+        self.sample_rate = sample_rate
+        self.language = language
+        self.vad = VoiceActivityDetector(sample_rate=sample_rate) if vad else None
+        self.frame_bytes = self.vad.frame_bytes if self.vad else 0
+        self.max_bytes = sample_rate * 2 * STREAM_MAX_UTTERANCE_SECONDS
+        self._audio = bytearray()
+        self._pending = b''
+        self._preroll = deque(maxlen=15)
+
+    def feed(self, pcm: bytes):
+        """Принять кадр PCM; законченные реплики попадают в очередь utterances"""
+        self.bytes_received += len(pcm)
+        if not self.vad:
+            self._audio.extend(pcm)
+            if len(self._audio) >= self.max_bytes:
+                self.flush()
+            return
+
+        data = self._pending + pcm
+        usable = len(data) - len(data) % self.frame_bytes
+        self._pending = data[usable:]
+        for offset in range(0, usable, self.frame_bytes):
+            frame = data[offset:offset + self.frame_bytes]
+            event = self.vad.process(frame)
+            if event == VoiceActivityDetector.START:
+                self._audio.extend(b''.join(self._preroll))
+            if self.vad.in_speech or event == VoiceActivityDetector.END:
+                self._audio.extend(frame)
             else:
-                messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-                # Добавляем историю (последние 4 сообщения для контекста)
-                messages.extend(request.history[-4:]) 
-                messages.append({"role": "user", "content": user_text})
+                self._preroll.append(frame)
+            if event == VoiceActivityDetector.END or len(self._audio) >= self.max_bytes:
+                self.flush()
+
+    def flush(self):
+        """Завершить текущую реплику"""
+        if self._audio:
+            self.utterances.put_nowait(bytes(self._audio))
+        self._audio = bytearray()
+        self._preroll.clear()
+        if self.vad:
+            self.vad.reset()
+
+    def to_wav(self, pcm: bytes) -> bytes:
+        """PCM реплики в WAV для STT"""
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(pcm)
+        return buffer.getvalue()
+
+
+@app.websocket("/ws/call/{session_id}")
+async def stream_call(websocket: WebSocket, session_id: str):
+    """Двунаправленный поток звонка: сырые PCM-кадры на вход, события и аудио TTS на выход"""
+    await websocket.accept()
+    if speech_service is None:
+        await run_in_threadpool(initialize_services)
+
+    session = StreamSession(session_id, await session_store.get_or_create(session_id))
+    stream_sessions[session_id] = session
+    worker = asyncio.create_task(_stream_worker(websocket, session))
+    logger.info(f"[{session_id}] 🔌 Stream opened")
 
-                completion = client.chat.completions.create(
-                    model="gpt-4o-mini", messages=messages, max_tokens=100, timeout=5
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            if message.get("bytes") is not None:
+                session.feed(message["bytes"])
+                continue
+
+            try:
+                control = json.loads(message.get("text") or "{}")
+            except ValueError:
+                await websocket.send_json({"type": "error", "detail": "invalid control message"})
+                continue
+
+            if control.get("type") == "start":
+                session.configure(
+                    sample_rate=int(control.get("sampleRate", 16000)),
+                    language=control.get("language", "ru"),
+                    vad=bool(control.get("vad", True))
                 )
-                ai_text = completion.choices[0].message.content
-                logger.info(f"[{session_id}] 🤖 AI: {ai_text}")
-        except Exception as e:
-            logger.error(f"[{session_id}] LLM Error: {str(e)}")
-            ai_text = "Извините, ошибка обработки."
+                if control.get("callerProfile") is not None:
+                    session.state.caller_profile = control["callerProfile"]
+            elif control.get("type") == "flush":
+                session.flush()
+            elif control.get("type") == "stop":
+                session.flush()
+                await session.utterances.join()
+                break
+    except WebSocketDisconnect:
+        pass
+    finally:
+        worker.cancel()
+        if stream_sessions.get(session_id) is session:
+            del stream_sessions[session_id]
+        logger.info(f"[{session_id}] Stream closed ({session.bytes_received} audio bytes)")
 
-        # 3. AI -> Incident Data (для ЕРДР)
-        incident_data = {"type": "Unknown", "address": "", "priority": "low", "description": user_text}
-        try:
-            classification = openai_classifier_service.classify(user_text)
-            incident_data = {
-                "type": classification.categories[0] if classification.categories else "Unknown",
-                "address": classification.extracted_info.get("address", ""),
-                "priority": classification.priority,
-                "description": user_text
-            }
-            logger.info(f"[{session_id}] Classification: {incident_data['type']}")
-        except Exception as e:
-            logger.error(f"[{session_id}] Classification Error: {str(e)}")
+    try:
+        await websocket.close()
+    except RuntimeError:
+        pass  # Клиент уже закрыл соединение
 
-        # 4. Text -> Audio
-        audio_b64 = None
+
+async def _stream_worker(websocket: WebSocket, session: StreamSession):
+    """Обработка реплик сессии по очереди, пока клиент продолжает присылать аудио"""
+    while True:
+        pcm = await session.utterances.get()
         try:
-            audio_response = tts_service.generate_speech(ai_text, "ru")
-            audio_b64 = base64.b64encode(audio_response).decode('utf-8') if audio_response else None
-            logger.info(f"[{session_id}] TTS: Generated {len(audio_b64) if audio_b64 else 0} bytes")
+            await _stream_turn(websocket, session, pcm)
+        except WebSocketDisconnect:
+            return
         except Exception as e:
-            logger.error(f"[{session_id}] TTS Error: {str(e)}")
+            logger.error(f"[{session.session_id}] Stream turn failed: {e}")
+            try:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+            except Exception:
+                return
+        finally:
+            session.utterances.task_done()
 
-        return ProcessCallResponse(
-            userText=user_text,
-            responseText=ai_text,
-            audioBase64=audio_b64,
-            incident=incident_data
-        )
 
-    except Exception as e:
-        logger.error(f"❌ Error in process-call: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+async def _stream_turn(websocket: WebSocket, session: StreamSession, pcm: bytes):
+    """STT реплики, ответ диспетчера и аудио ответа одной реплики"""
+    session_id = session.session_id
+    user_text = await run_in_threadpool(speech_service.transcribe, session.to_wav(pcm), session.language)
+    if not user_text or len(user_text.strip()) < 2:
+        return
+    await websocket.send_json({"type": "transcript", "text": user_text})
+
+    priority = prescore_call(f"{session.state.transcript} {user_text}", incident_classifier)
+    try:
+        ai_text, incident_data, speech = await call_scheduler.submit(priority, _session_turn, session.state, user_text)
+    except SchedulerOverloaded as e:
+        logger.warning(f"[{session_id}] Shed {priority.name} utterance: scheduler overloaded")
+        await websocket.send_json({"type": "error", "status": 503, "detail": str(e), "retryAfter": e.retry_after})
+        return
+
+    # Инцидент уходит клиенту, пока TTS еще синтезирует ответ
+    await websocket.send_json({"type": "response", "userText": user_text, "responseText": ai_text,
+                               "incident": incident_data})
+    audio = await speech
+    if audio:
+        for offset in range(0, len(audio), STREAM_AUDIO_CHUNK):
+            await websocket.send_bytes(audio[offset:offset + STREAM_AUDIO_CHUNK])
+    await websocket.send_json({"type": "audio_end", "bytes": len(audio) if audio else 0})
 
 
 if __name__ == "__main__":
@@ -1,7 +1,7 @@
 import os
 import logging
 from typing import Dict, Any, Optional, List
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
@@ -25,36 +25,79 @@ class OpenAIClassifierService:
         if not api_key:
             logger.warning("OPENAI_API_KEY not set, OpenAI classifier will be disabled")
             self.client = None
+            self.async_client = None
         else:
             self.client = OpenAI(api_key=api_key)
+            self.async_client = AsyncOpenAI(api_key=api_key)
         self.model = "gpt-3.5-turbo"  # можно использовать gpt-4 если доступно
         logger.info("OpenAIClassifierService initialized")
 
-    def classify(self, text: str) -> ClassificationResult:
+    def classify(self, text: str, caller_profile: Optional[Dict[str, Any]] = None) -> ClassificationResult:
         """
         Классифицирует текст звонка с помощью OpenAI.
+        
+        caller_profile — история номера из CallerProfileCache (необязательно).
+        Для номеров с историей ложных вызовов эвристика без высокого приоритета
+        считается достаточной, и запрос к OpenAI не выполняется. Ложным звонок
+        при этом не помечается: это решает только эвристика по тексту.
         """
         if not self.client or not text.strip():
             # Возвращаем результат по умолчанию
             return self._default_result(text)
 
-        prompt = self._build_prompt(text)
+        shortcut = self._hoax_shortcut(text, caller_profile)
+        if shortcut:
+            return shortcut
+
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self._system_prompt()},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                max_tokens=800,
-            )
+            response = self.client.chat.completions.create(**self._request(text))
+            result_text = response.choices[0].message.content.strip()
+            return self._parse_response(result_text)
+        except Exception as e:
+            logger.error(f"OpenAI classification error: {e}")
+            return self._default_result(text)
+
+    async def aclassify(self, text: str, caller_profile: Optional[Dict[str, Any]] = None) -> ClassificationResult:
+        """
+        То же, что classify, но через асинхронный клиент OpenAI:
+        не занимает поток, пока ждет ответа модели.
+        """
+        if not self.async_client or not text.strip():
+            return self._default_result(text)
+
+        shortcut = self._hoax_shortcut(text, caller_profile)
+        if shortcut:
+            return shortcut
+
+        try:
+            response = await self.async_client.chat.completions.create(**self._request(text))
             result_text = response.choices[0].message.content.strip()
             return self._parse_response(result_text)
         except Exception as e:
             logger.error(f"OpenAI classification error: {e}")
             return self._default_result(text)
 
+    def _hoax_shortcut(self, text: str, caller_profile: Optional[Dict[str, Any]]) -> Optional[ClassificationResult]:
+        """Эвристический результат для номеров с историей ложных вызовов (без запроса к OpenAI)."""
+        if caller_profile and caller_profile.get("suspected_hoax"):
+            result = self._default_result(text)
+            if result.priority != "high":
+                logger.info(f"Caller with {caller_profile.get('false_calls', 0)} false calls, OpenAI skipped")
+                return result
+        return None
+
+    def _request(self, text: str) -> Dict[str, Any]:
+        """Параметры запроса к chat.completions."""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self._system_prompt()},
+                {"role": "user", "content": self._build_prompt(text)}
+            ],
+            "temperature": 0.1,
+            "max_tokens": 800,
+        }
+
     def _system_prompt(self) -> str:
         return """Ты — система анализа экстренных звонков. Твоя задача:
 1. Определить категорию звонка (пожар, медицинский, ДТП, криминал, ЧС, ложный, информационный).
@@ -0,0 +1,230 @@
+import os
+import copy
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_RANK = {"low": 0, "medium": 1, "high": 2}
+
+
+class CallSessionState:
+    """Состояние звонка на сервере: реплики диалога, накопленная транскрипция и текущий инцидент."""
+
+    __slots__ = ("session_id", "turns", "transcript", "incident", "updated_at", "caller_profile")
+
+    def __init__(self, session_id: str, turns: Optional[List[Dict[str, str]]] = None,
+                 transcript: str = "", incident: Optional[Dict[str, Any]] = None,
+                 updated_at: Optional[float] = None, caller_profile: Optional[Dict[str, Any]] = None):
+        self.session_id = session_id
+        self.turns = turns or []
+        self.transcript = transcript
+        self.incident = incident or {}
+        self.updated_at = updated_at or time.time()
+        self.caller_profile = caller_profile  # История номера от клиента (CallerProfileCache), если есть
+
+    def add_turn(self, user_text: str, ai_text: str, max_turns: int = 50):
+        """Добавляет реплику абонента и ответ диспетчера."""
+        self.turns.append({"role": "user", "content": user_text})
+        self.turns.append({"role": "assistant", "content": ai_text})
+        del self.turns[:-max_turns * 2]
+        self.transcript = f"{self.transcript} {user_text}".strip()
+
+    def merge_incident(self, fragment: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Дополняет инцидент классификацией новой реплики вместо замены.
+
+        Адрес и тип берутся из новой реплики, только если она их содержит;
+        приоритет не понижается; описание — вся транскрипция звонка.
+        """
+        incident = dict(self.incident) or {"type": "Unknown", "address": "", "priority": "low"}
+        if fragment.get("type") and fragment["type"] != "Unknown":
+            if incident.get("type", "Unknown") == "Unknown" or \
+                    PRIORITY_RANK.get(fragment.get("priority"), 0) >= PRIORITY_RANK.get(incident.get("priority"), 0):
+                incident["type"] = fragment["type"]
+        if fragment.get("address"):
+            incident["address"] = fragment["address"]
+        if PRIORITY_RANK.get(fragment.get("priority"), 0) > PRIORITY_RANK.get(incident.get("priority"), 0):
+            incident["priority"] = fragment["priority"]
+        incident["description"] = self.transcript
+        self.incident = incident
+        return incident
+
+    def refresh(self, other: "CallSessionState"):
+        """Принимает состояние из хранилища после атомарного обновления."""
+        for slot in self.__slots__:
+            setattr(self, slot, getattr(other, slot))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CallSessionState":
+        return cls(**{key: data.get(key) for key in cls.__slots__})
+
+
+class InMemorySessionStore:
+    """
+    Хранилище сессий в памяти процесса: LRU с ограничением размера и TTL.
+
+    Сессия живет ttl_seconds с последнего обращения; при переполнении
+    вытесняется давно не использованная. Интерфейс асинхронный, как у
+    RedisSessionStore, чтобы обработчики не зависели от бэкенда.
+    """
+
+    def __init__(self, max_sessions: int = 10000, ttl_seconds: float = 1800):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, CallSessionState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+        self.expired = 0
+
+    def _get_locked(self, session_id: str) -> Optional[CallSessionState]:
+        state = self._sessions.get(session_id)
+        if state is None:
+            return None
+        if time.time() - state.updated_at > self.ttl_seconds:
+            del self._sessions[session_id]
+            self.expired += 1
+            return None
+        self._sessions.move_to_end(session_id)
+        return state
+
+    def _save_locked(self, state: CallSessionState):
+        state.updated_at = time.time()
+        self._sessions[state.session_id] = state
+        self._sessions.move_to_end(state.session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+
+    async def get(self, session_id: str) -> Optional[CallSessionState]:
+        with self._lock:
+            return self._get_locked(session_id)
+
+    async def get_or_create(self, session_id: str) -> CallSessionState:
+        return await self.get(session_id) or CallSessionState(session_id)
+
+    async def save(self, state: CallSessionState):
+        with self._lock:
+            self._save_locked(state)
+
+    async def update(self, session_id: str, apply: Callable[[CallSessionState], Any],
+                     default: Optional[CallSessionState] = None) -> CallSessionState:
+        """
+        Атомарно применяет apply к текущему состоянию сессии и сохраняет его.
+
+        Если сессии нет, apply применяется к default (или к новой сессии).
+        Возвращает сохраненное состояние.
+        """
+        with self._lock:
+            state = self._get_locked(session_id) or default or CallSessionState(session_id)
+            apply(state)
+            self._save_locked(state)
+            return state
+
+    async def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "sessions": len(self._sessions),
+                "evicted": self.evicted, "expired": self.expired}
+
+
+class RedisSessionStore:
+    """
+    Хранилище сессий в Redis (общие сессии для нескольких процессов ai-module), TTL через SETEX.
+
+    Асинхронный клиент (redis.asyncio) не блокирует цикл событий; update
+    читает и записывает сессию в транзакции WATCH/MULTI и повторяет ее,
+    если другой процесс изменил сессию между чтением и записью.
+    """
+
+    KEY_PREFIX = "call-session:"
+
+    def __init__(self, url: str, ttl_seconds: float = 1800):
+        try:
+            import redis
+            import redis.asyncio
+            from redis.exceptions import WatchError
+        except ImportError:
+            logger.error("redis not installed. Install with: pip install redis")
+            raise
+        # Проверка доступности синхронным клиентом: хранилище создается при импорте, до цикла событий
+        probe = redis.Redis.from_url(url, socket_timeout=1)
+        try:
+            probe.ping()
+        finally:
+            probe.close()
+        self.client = redis.asyncio.Redis.from_url(url, socket_timeout=1)
+        self._watch_error = WatchError
+        self.ttl_seconds = int(ttl_seconds)
+        self.conflicts = 0
+        logger.info(f"Redis session store connected: {url}")
+
+    def _dump(self, state: CallSessionState) -> str:
+        state.updated_at = time.time()
+        return json.dumps(state.to_dict(), ensure_ascii=False)
+
+    async def get(self, session_id: str) -> Optional[CallSessionState]:
+        data = await self.client.get(self.KEY_PREFIX + session_id)
+        return CallSessionState.from_dict(json.loads(data)) if data else None
+
+    async def get_or_create(self, session_id: str) -> CallSessionState:
+        return await self.get(session_id) or CallSessionState(session_id)
+
+    async def save(self, state: CallSessionState):
+        await self.client.setex(self.KEY_PREFIX + state.session_id, self.ttl_seconds, self._dump(state))
+
+    async def update(self, session_id: str, apply: Callable[[CallSessionState], Any],
+                     default: Optional[CallSessionState] = None) -> CallSessionState:
+        """
+        Атомарно применяет apply к текущему состоянию сессии и сохраняет его.
+
+        Если сессии нет, apply применяется к копии default (или к новой
+        сессии). Возвращает сохраненное состояние.
+        """
+        key = self.KEY_PREFIX + session_id
+        async with self.client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    data = await pipe.get(key)
+                    if data:
+                        state = CallSessionState.from_dict(json.loads(data))
+                    else:
+                        state = copy.deepcopy(default) if default else CallSessionState(session_id)
+                    apply(state)
+                    pipe.multi()
+                    pipe.setex(key, self.ttl_seconds, self._dump(state))
+                    await pipe.execute()
+                    return state
+                except self._watch_error:
+                    self.conflicts += 1  # Сессию изменил другой процесс: применяем заново к свежему состоянию
+
+    async def delete(self, session_id: str):
+        await self.client.delete(self.KEY_PREFIX + session_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": "redis", "conflicts": self.conflicts}
+
+
+def create_session_store():
+    """
+    Хранилище сессий по $SESSION_STORE (memory или redis, $REDIS_URL).
+
+    Если Redis недоступен, используется память процесса.
+    """
+    ttl = float(os.getenv("SESSION_TTL_SECONDS", 1800))
+    if os.getenv("SESSION_STORE", "memory").lower() == "redis":
+        try:
+            return RedisSessionStore(os.getenv("REDIS_URL", "redis://localhost:6379/0"), ttl)
+        except Exception as e:
+            logger.warning(f"Redis session store unavailable, using memory: {e}")
+    return InMemorySessionStore(max_sessions=int(os.getenv("SESSION_MAX", 10000)), ttl_seconds=ttl)
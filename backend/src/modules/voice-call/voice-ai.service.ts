@@ -8,33 +8,23 @@ export class VoiceAiService {
   private readonly logger = new Logger(VoiceAiService.name);
   private readonly aiModuleUrl = 'http://localhost:8001'; // Python Module
   private readonly erdrServiceUrl = 'http://127.0.0.1:8000'; // Django/FastAPI ERDR
-  
-  // Храним историю диалогов в памяти (в продакшене лучше Redis)
-  private sessionHistory: Map<string, any[]> = new Map();
 
   async processAudio(audioBuffer: Buffer, sessionId: string, metadata: any) {
     try {
       const base64Audio = audioBuffer.toString('base64');
-      const history = this.sessionHistory.get(sessionId) || [];
 
-      // 1. Запрос к AI модулю (Python)
+      // 1. Запрос к AI модулю (Python). История диалога и инцидент хранятся в AI модуле по sessionId
       const response = await axios.post(`${this.aiModuleUrl}/process-call`, {
         sessionId: sessionId,
         audioData: base64Audio,
-        sampleRate: metadata.sampleRate || 16000,
-        history: history
+        sampleRate: metadata.sampleRate || 16000
       });
 
       const { userText, responseText, audioBase64, incident } = response.data;
 
       if (!userText) return { text: '', response: '' };
 
-      // 2. Обновляем историю
-      history.push({ role: 'user', content: userText });
-      history.push({ role: 'assistant', content: responseText });
-      this.sessionHistory.set(sessionId, history);
-
-      // 3. ОТПРАВКА В ЕРДР (Если есть полезные данные)
+      // 2. ОТПРАВКА В ЕРДР (Если есть полезные данные)
       if (incident && (incident.address || incident.type !== 'Unknown')) {
           this.sendToErdr(sessionId, incident, userText);
       }
@@ -78,7 +68,8 @@ export class VoiceAiService {
   }
 
   endCall(sessionId: string) {
-      this.sessionHistory.delete(sessionId);
+      axios.delete(`${this.aiModuleUrl}/sessions/${encodeURIComponent(sessionId)}`)
+           .catch(e => this.logger.warn(`Failed to clear AI session ${sessionId}: ${e.message}`));
       this.logger.log(`Session ${sessionId} cleared`);
   }
 }
\ No newline at end of file
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark: dialog turn of the ai-module as an asyncio task graph vs. the sequential pipeline.
+
+The LLM reply, the OpenAI classification and TTS are replaced by stand-ins
+with fixed latencies (network waits, no CPU). The sequential pipeline is
+the previous implementation: reply, classification and TTS one after
+another with synchronous clients in a scheduler worker thread. The task
+graph runs the reply and the classification concurrently on the event
+loop and starts TTS as soon as the reply is ready.
+
+Reported for N concurrent sessions through the same priority scheduler:
+time until the incident data is available (what the backend needs for
+the ERDR record) and until the response audio is ready.
+
+Usage:
+    python benchmarks/bench_async_turn.py [--sessions 1,16,64] [--workers 4]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import logging
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'ai-module'))  # ai-module/main.py, not the AGI entry point
+
+os.environ.setdefault('OPENAI_API_KEY', 'sk-bench')
+
+import main as ai_main  # noqa: E402
+from services.call_scheduler import CallPriority, PriorityCallScheduler  # noqa: E402
+from services.session_store import CallSessionState  # noqa: E402
+
+LLM_SECONDS = 0.8
+CLASSIFY_SECONDS = 0.9
+TTS_SECONDS = 0.6
+USER_TEXT = "Горит квартира на улице Абая 10, внутри люди"
+
+
+def completion(text: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+def classification():
+    return SimpleNamespace(categories=["пожар"], priority="high", extracted_info={"address": "ул. Абая, 10"})
+
+
+class AsyncCompletions:
+    async def create(self, **kwargs):
+        await asyncio.sleep(LLM_SECONDS)
+        return completion("Пожарные выезжают. Все ли вышли из квартиры?")
+
+
+class AsyncClassifier:
+    async def aclassify(self, text, caller_profile=None):
+        await asyncio.sleep(CLASSIFY_SECONDS)
+        return classification()
+
+
+class SlowTTS:
+    def generate_speech(self, text, language="ru"):
+        time.sleep(TTS_SECONDS)
+        return b'RIFF' + b'\0' * 16000
+
+
+def sequential_turn(state: CallSessionState, user_text: str):
+    """Previous pipeline: blocking reply, classification and TTS in one worker thread."""
+    time.sleep(LLM_SECONDS)
+    ai_text = "Пожарные выезжают. Все ли вышли из квартиры?"
+    time.sleep(CLASSIFY_SECONDS)
+    result = classification()
+    fragment = {"type": result.categories[0], "address": result.extracted_info["address"],
+                "priority": result.priority, "description": user_text}
+    audio = SlowTTS().generate_speech(ai_text)
+    state.add_turn(user_text, ai_text)
+    return ai_text, state.merge_incident(fragment), audio
+
+
+async def run(mode: str, sessions: int, workers: int):
+    scheduler = PriorityCallScheduler(max_concurrency=workers, max_queue=sessions + 1)
+    incident_times, audio_times = [], []
+
+    async def caller(index: int):
+        state = CallSessionState(f"bench-{index}")
+        started = time.perf_counter()
+        if mode == 'sequential':
+            await scheduler.submit(CallPriority.HIGH, sequential_turn, state, USER_TEXT)
+            incident_times.append(time.perf_counter() - started)
+            audio_times.append(time.perf_counter() - started)
+        else:
+            _, _, speech = await scheduler.submit(CallPriority.HIGH, ai_main._session_turn, state, USER_TEXT)
+            incident_times.append(time.perf_counter() - started)
+            await speech
+            audio_times.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(caller(i) for i in range(sessions)))
+    wall = time.perf_counter() - started
+    await scheduler.stop()
+    return incident_times, audio_times, wall
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', default='1,16,64', help="Comma-separated concurrent session counts")
+    parser.add_argument('--workers', type=int, default=4, help="Scheduler workers (CALL_WORKERS)")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    ai_main.client = SimpleNamespace(chat=SimpleNamespace(completions=AsyncCompletions()))
+    ai_main.openai_classifier_service = AsyncClassifier()
+    ai_main.tts_service = SlowTTS()
+    ai_main.session_store = SimpleNamespace(save=lambda state: None)
+
+    print(f"LLM {LLM_SECONDS:.1f} s, classification {CLASSIFY_SECONDS:.1f} s, TTS {TTS_SECONDS:.1f} s, "
+          f"{args.workers} scheduler workers\n")
+    print(f"  {'sessions':>8s} {'pipeline':12s} {'incident p50':>13s} {'incident p95':>13s} "
+          f"{'audio p50':>10s} {'audio p95':>10s} {'wall s':>7s}")
+    for sessions in (int(n) for n in args.sessions.split(',')):
+        for mode in ('sequential', 'task graph'):
+            incident, audio, wall = asyncio.run(run(mode, sessions, args.workers))
+            print(f"  {sessions:8d} {mode:12s} {percentile(incident, 0.5) * 1000:11.0f}ms "
+                  f"{percentile(incident, 0.95) * 1000:11.0f}ms {percentile(audio, 0.5) * 1000:8.0f}ms "
+                  f"{percentile(audio, 0.95) * 1000:8.0f}ms {wall:7.1f}")
+
+
+if __name__ == "__main__":
+    main()
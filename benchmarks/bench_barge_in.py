@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark: turn-end latency and barge-in reaction with the EAGI audio stream.
+
+Feeds synthetic caller audio (noise floor plus voiced bursts) through a pipe
+standing in for EAGI file descriptor 3, in scaled real time, and measures:
+
+- turn end: how long after the caller stops speaking the utterance is
+  returned, for utterances of different length. The fixed-length
+  recording used without EAGI ends only after its 2 s silence threshold
+  plus the 1 s wait_for_digit, and after the whole maximum duration when
+  line noise keeps the silence detector from firing.
+- barge-in: how much of a 4 s prompt keeps playing after the caller starts
+  speaking over it, with the prompt split into 400 ms segments.
+
+Usage:
+    python benchmarks/bench_barge_in.py [--scale 0.25]
+"""
+
+import os
+import sys
+import math
+import time
+import random
+import argparse
+import logging
+import tempfile
+import threading
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.vad import VoiceActivityDetector
+from services.eagi_audio import EAGIAudioStream, EAGI_SAMPLE_RATE, split_wav, write_wav
+
+FRAME_MS = 20
+FRAME_SAMPLES = EAGI_SAMPLE_RATE * FRAME_MS // 1000
+FIXED_SILENCE_SECONDS = 2.0
+FIXED_WAIT_SECONDS = 1.0
+
+
+def frame(rng: random.Random, speech: bool) -> bytes:
+    """20 ms of line noise, with a voiced tone on top while speaking."""
+    amplitude = rng.uniform(1500, 4000) if speech else 0
+    return array('h', (int(amplitude * math.sin(i * 0.35) + rng.gauss(0, 60))
+                       for i in range(FRAME_SAMPLES))).tobytes()
+
+
+class Caller(threading.Thread):
+    """Writes audio to the pipe in real time (times ``scale``) and counts frames written."""
+
+    def __init__(self, fd: int, frames, scale: float):
+        super().__init__(daemon=True)
+        self.fd, self.frames, self.scale = fd, frames, scale
+        self.written = 0
+
+    def run(self):
+        started = time.perf_counter()
+        for index, data in enumerate(self.frames):
+            delay = started + index * FRAME_MS / 1000 * self.scale - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            os.write(self.fd, data)
+            self.written = index + 1
+
+    def audio_ms(self) -> float:
+        return self.written * FRAME_MS
+
+
+def make_stream():
+    read_fd, write_fd = os.pipe()
+    stream = EAGIAudioStream(fd=read_fd, vad=VoiceActivityDetector(engine='energy')).start()
+    return stream, write_fd
+
+
+def turn_end(rng, speech_seconds: float, scale: float) -> float:
+    """Milliseconds of audio between the end of speech and the returned utterance."""
+    stream, write_fd = make_stream()
+    stream.arm()
+    lead, tail = 25, 150
+    frames = ([frame(rng, False)] * lead + [frame(rng, True) for _ in range(int(speech_seconds * 50))]
+              + [frame(rng, False) for _ in range(tail)])
+    caller = Caller(write_fd, frames, scale)
+    caller.start()
+    stream.wait_utterance(max_seconds=30, no_input_seconds=10)
+    ended = caller.audio_ms()
+    caller.join()
+    os.close(write_fd)
+    return ended - (lead * FRAME_MS + speech_seconds * 1000)
+
+
+def barge_in(rng, workdir: str, scale: float, speech_at: float = 1.0) -> float:
+    """Milliseconds of prompt played after the caller started speaking."""
+    prompt = os.path.join(workdir, 'prompt.wav')
+    write_wav(prompt, b''.join(frame(rng, True) for _ in range(200)))  # 4 s
+    segments = split_wav(prompt)
+
+    stream, write_fd = make_stream()
+    stream.arm()
+    frames = [frame(rng, False) for _ in range(int(speech_at * 50))] + [frame(rng, True) for _ in range(150)]
+    caller = Caller(write_fd, frames, scale)
+    caller.start()
+
+    played = 0.0
+    for segment in segments:
+        if stream.speech_started.is_set():
+            break
+        time.sleep(0.4 * scale)  # stream_file blocks while the segment plays
+        played += 400
+    caller.join()
+    os.close(write_fd)
+    return played - speech_at * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=float, default=0.25, help="Wall-clock time per second of audio")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    rng = random.Random(5)
+
+    print("Turn end after the caller stops speaking (audio ms)\n")
+    print(f"  {'speech s':>8s} {'EAGI VAD':>9s} {'fixed recording':>16s}")
+    for seconds in (1.0, 3.0, 6.0):
+        print(f"  {seconds:8.1f} {turn_end(rng, seconds, args.scale):9.0f} "
+              f"{(FIXED_SILENCE_SECONDS + FIXED_WAIT_SECONDS) * 1000:16.0f}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        overrun = [barge_in(rng, workdir, args.scale) for _ in range(5)]
+    print(f"\n  prompt played after barge-in: {sum(overrun) / len(overrun):.0f} ms on average "
+          f"(max {max(overrun):.0f} ms), without EAGI the whole prompt (3000 ms here)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: call list page payload and latency.
+
+Compares the full-row listing (SELECT * + ai_response parsing) with the
+CallSummary projection used by /api/calls, for one 100-row page.
+
+Usage:
+    python benchmarks/bench_call_listing.py [--rows 20000] [--page-size 100]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import argparse
+import statistics
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.logger import CallLogger
+
+TRANSCRIPT = (
+    "Здравствуйте, я звоню по поводу того, что во дворе дома номер 15 по улице Абая "
+    "мужчина кричит на женщину и, кажется, бьет ее. Там еще несколько человек стоят рядом. "
+)
+
+
+def populate(call_logger: CallLogger, rows: int):
+    """Fill database with synthetic calls with realistic transcript and AI response sizes."""
+    start = datetime.now() - timedelta(days=30)
+    for i in range(rows):
+        call_logger.log_call({
+            'call_id': f'bench_{i:08d}',
+            'caller_id': f'+7701{random.randint(1000000, 9999999)}',
+            'timestamp': start + timedelta(seconds=i * 30),
+            'duration': random.uniform(20, 180),
+            'transcript': TRANSCRIPT * random.randint(3, 8),
+            'ai_response': {
+                'urgency': random.choice(['critical', 'high', 'medium', 'low']),
+                'category': random.choice(['assault', 'theft', 'noise', 'fire', 'traffic']),
+                'address': 'ул. Абая, д. 15',
+                'current_danger': True,
+                'people_involved': 2,
+                'weapons': False,
+                'recommended_department': 'Полиция',
+                'summary': 'Мужчина избивает женщину во дворе дома номер 15',
+                'needs_clarification': False,
+                'clarification_questions': [],
+                'confidence_score': 0.85,
+                'validated': True,
+                'validation_notes': ['Текущая опасность - требуется срочное реагирование']
+            }
+        })
+
+
+def measure(fn, repeat: int):
+    """Return (median ms, payload bytes) for building one JSON page."""
+    timings = []
+    payload = b''
+    for _ in range(repeat):
+        started = time.perf_counter()
+        payload = json.dumps({'calls': fn()}, ensure_ascii=False, default=str).encode('utf-8')
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        call_logger = CallLogger(os.path.join(tmp, 'calls.db'))
+        print(f"Populating {args.rows} calls...")
+        populate(call_logger, args.rows)
+
+        cases = {
+            'full rows (SELECT *, parsed ai_response)':
+                lambda: call_logger.get_recent_calls(limit=args.page_size),
+            'CallSummary projection':
+                lambda: [s.to_dict() for s in call_logger.get_call_summaries(args.page_size)],
+        }
+
+        print(f"\n{args.page_size}-row page, median of {args.repeat} runs")
+        for name, fn in cases.items():
+            ms, size = measure(fn, args.repeat)
+            print(f"  {name:45s} {ms:8.2f} ms  {size / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark: dead air per call, sequential vs. overlapped CallHandler pipeline.
+
+Runs CallHandler.handle_call against a fake Asterisk channel that plays
+prompts and records the caller in (scaled) real time, with STT, LLM and
+TTS engines replaced by stand-ins of typical cloud latency. The caller
+leaves out the address, so the dialog has one follow-up question. Dead air
+is the time the line is silent while the caller waits for us, as measured
+by CallHandler itself.
+
+Usage:
+    python benchmarks/bench_call_pipeline.py [--calls 3] [--scale 0.1]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORKDIR = tempfile.mkdtemp(prefix='bench_call_pipeline_')
+os.environ.update({'STT_ENGINE': 'mock', 'LLM_ENGINE': 'mock', 'LLM_HEDGE_ENGINE': '',
+                   'CALL_LOG_DB': os.path.join(WORKDIR, 'calls.db')})
+
+# The AGI script logs to /var/log/ai-call-intake, which only exists on the PBX host
+logging.FileHandler = lambda *args, **kwargs: logging.NullHandler()
+
+from agi.call_handler import CallHandler  # noqa: E402
+from services.circuit_breaker import CircuitBreaker  # noqa: E402
+
+# Simulated durations in seconds (before scaling)
+STT_SECONDS = 1.5
+LLM_SECONDS = 2.4
+TTS_SECONDS = 0.8
+SPEECH_SECONDS_PER_CHAR = 0.06
+CALLER_SPEECH = ["Во дворе драка, мужчина бьет другого ножом, быстрее приезжайте",
+                 "Улица Абая, дом 15, во дворе"]
+
+FIRST = {"urgency": "critical", "category": "assault", "address": "не указан", "current_danger": True,
+         "people_involved": 2, "weapons": True, "recommended_department": "Полиция",
+         "summary": "Драка с ножом во дворе.", "needs_clarification": True, "clarification_questions": []}
+UPDATED = dict(FIRST, address="ул. Абая, д. 15", needs_clarification=False)
+
+SCALE = 0.1
+
+
+def pause(seconds: float):
+    time.sleep(seconds * SCALE)
+
+
+class FakeAGI:
+    """Asterisk channel: playback and recording take as long as the audio."""
+
+    def __init__(self):
+        self.utterances = list(CALLER_SPEECH)
+
+    def stream_file(self, path):
+        with open(path + '.wav', encoding='utf-8') as f:
+            pause(len(f.read()) * SPEECH_SECONDS_PER_CHAR)
+
+    def record_file(self, path, fmt, duration, silence):
+        text = self.utterances.pop(0) if self.utterances else ""
+        pause(len(text) * SPEECH_SECONDS_PER_CHAR + silence)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def wait_for_digit(self, timeout_ms):
+        pause(timeout_ms / 1000)
+
+
+class FakeTTS:
+    def text_to_speech(self, text, language="ru"):
+        pause(TTS_SECONDS)
+        fd, path = tempfile.mkstemp(suffix='.wav', dir=WORKDIR)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+
+class FakeSTT:
+    def transcribe(self, audio_data, language="ru"):
+        pause(STT_SECONDS)
+        return audio_data.decode('utf-8')
+
+
+class FakeLLMClient:
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=self)
+        self.calls = 0
+
+    def create(self, **kwargs):
+        pause(LLM_SECONDS)
+        self.calls += 1
+        content = json.dumps(FIRST if self.calls == 1 else UPDATED, ensure_ascii=False)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+
+class FakeLogger:
+    def log_call(self, call_data):
+        return 1
+
+
+def run_call(overlap: bool) -> float:
+    handler = CallHandler(FakeAGI(), overlap=overlap)
+    handler.tts_service = FakeTTS()
+    handler.stt_service = FakeSTT()
+    handler.logger_service = FakeLogger()
+    handler.duplicate_detector = None
+    handler.llm_service.engine = 'openai'
+    handler.llm_service.client = FakeLLMClient()
+    handler.llm_service.breaker = CircuitBreaker('llm.bench')
+
+    started = time.perf_counter()
+    handler.handle_call('+77010000000', 'ru')
+    total = time.perf_counter() - started
+    assert handler.call_data['status'] == 'completed'
+    return handler.dead_air / SCALE, total / SCALE
+
+
+def main():
+    global SCALE
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=3)
+    parser.add_argument('--scale', type=float, default=0.1, help="Wall-clock time per simulated second")
+    args = parser.parse_args()
+    SCALE = args.scale
+    logging.disable(logging.WARNING)
+
+    print(f"{args.calls} calls, STT {STT_SECONDS} s, LLM {LLM_SECONDS} s, TTS {TTS_SECONDS} s per request\n")
+    print(f"  {'pipeline':12s} {'dead air s':>11s} {'call s':>8s}")
+    for label, overlap in (('sequential', False), ('overlapped', True)):
+        runs = [run_call(overlap) for _ in range(args.calls)]
+        print(f"  {label:12s} {sum(r[0] for r in runs) / len(runs):11.1f} {sum(r[1] for r in runs) / len(runs):8.1f}")
+
+    shutil.rmtree(WORKDIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
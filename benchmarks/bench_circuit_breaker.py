@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: caller-visible latency during an engine outage, with and without a circuit breaker.
+
+Simulates a cloud engine that answers in ~100 ms, then goes down for a
+stretch of calls where every request hangs until the client timeout, then
+recovers. Calls arrive at a fixed interval; each one falls back to a
+local answer on failure, as the STT, LLM and TTS services do.
+
+Usage:
+    python benchmarks/bench_circuit_breaker.py [--calls 400] [--timeout-ms 500] [--interval-ms 50]
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+class FlakyEngine:
+    """Healthy outside [outage_start, outage_end) call indexes, hanging until timeout inside."""
+
+    def __init__(self, outage_start: int, outage_end: int, latency: float, timeout: float):
+        self.outage_start = outage_start
+        self.outage_end = outage_end
+        self.latency = latency
+        self.timeout = timeout
+        self.requests = 0
+
+    def __call__(self, index: int):
+        self.requests += 1
+        if self.outage_start <= index < self.outage_end:
+            time.sleep(self.timeout)
+            raise TimeoutError("engine timed out")
+        time.sleep(self.latency)
+        return "remote"
+
+
+def run(calls: int, interval: float, engine: FlakyEngine, breaker: CircuitBreaker = None):
+    timings = []
+    for index in range(calls):
+        time.sleep(interval)
+        started = time.perf_counter()
+        try:
+            if breaker:
+                breaker.call(engine, index)
+            else:
+                engine(index)
+        except (TimeoutError, CircuitOpenError):
+            pass  # local fallback answer
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=400)
+    parser.add_argument('--timeout-ms', type=float, default=500.0)
+    parser.add_argument('--interval-ms', type=float, default=50.0, help="Time between call arrivals")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    timeout = args.timeout_ms / 1000
+    outage = (args.calls // 4, args.calls // 4 * 3)
+
+    print(f"{args.calls} calls, outage during calls {outage[0]}-{outage[1]}, "
+          f"healthy latency 20 ms, timeout {args.timeout_ms:.0f} ms\n")
+    print(f"  {'policy':16s} {'busy s':>8s} {'outage mean ms':>15s} {'engine requests':>16s}")
+    for label, use_breaker in (('timeout only', False), ('circuit breaker', True)):
+        engine = FlakyEngine(*outage, latency=0.02, timeout=timeout)
+        breaker = CircuitBreaker('bench', window_seconds=10, min_calls=5, open_seconds=2.0) \
+            if use_breaker else None
+        timings = run(args.calls, args.interval_ms / 1000, engine, breaker)
+        during = timings[outage[0]:outage[1]]
+        print(f"  {label:16s} {sum(timings):8.1f} {sum(during) / len(during) * 1000:15.0f} {engine.requests:16d}")
+
+
+if __name__ == "__main__":
+    main()
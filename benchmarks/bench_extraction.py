@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark: address and head-count extraction, accuracy and throughput.
+
+Compares the previous serial extractor (five address regexes, three simple
+patterns, four people regexes and substring checks, all tried one after
+another) with the single-pass IncidentExtractor on a labeled corpus of
+Russian and Kazakh call descriptions.
+
+Usage:
+    python benchmarks/bench_extraction.py [--transcripts 50000]
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.incident_extractor import IncidentExtractor
+
+STREETS = ['абая', 'толе би', 'сейфуллина', 'ленина', 'достык', 'жибек жолы', 'момышулы', 'гагарина']
+KZ_STREETS = ['абай', 'төле би', 'сейфуллин', 'достық', 'гагарин']
+LANDMARKS = ['рынка', 'школы', 'магазина', 'остановки', 'вокзала']
+KZ_LANDMARKS = ['мектеп', 'дүкен', 'аялдама', 'базар']
+PREFIX = ['', 'здравствуйте, ', 'помогите, ', 'алло, срочно, ']
+RU_COUNT = [('', 0), (', там {n} человек', None), (', дерутся {n} мужчин', None),
+            (', двое мужчин дерутся', 2), (', собралась толпа', 5), (', несколько человек кричат', 3)]
+KZ_COUNT = [('', 0), (', {n} адам бар', None), (', екі адам төбелесіп жатыр', 2)]
+
+# (template, expects street, expects house, language)
+RU_TEMPLATES = [
+    ('{p}мужчина избивает женщину, улица {s}, дом {h}{c}', True, True),
+    ('{p}у нас драка на улице {s}, дом {h}{c}', True, True),
+    ('{p}пожар, ул. {s}, д. {h}{c}', True, True),
+    ('{p}дом {h} по улице {s}, соседи шумят{c}', True, True),
+    ('{p}украли машину возле {l}{c}', False, False),
+    ('{p}авария на улице {s}{c}', True, False),
+    ('{p}{h} дом на {s}, горит квартира{c}', True, True),
+    ('{p}в доме {h} кричит ребенок{c}', False, True),
+]
+KZ_TEMPLATES = [
+    ('{p}{s} көшесі, {h} үй, төбелес{c}', True, True),
+    ('{p}ер адам {s} көшесіндегі {h}-үйде айқайлады{c}', True, True),
+    ('{p}{l} жанында өрт{c}', False, False),
+]
+
+
+def build_corpus(size: int, seed: int = 7):
+    """Generate (text, expected address, expected people) triples."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        kazakh = rng.random() < 0.3
+        template, has_street, has_house = rng.choice(KZ_TEMPLATES if kazakh else RU_TEMPLATES)
+        street = rng.choice(KZ_STREETS if kazakh else STREETS)
+        landmark = rng.choice(KZ_LANDMARKS if kazakh else LANDMARKS)
+        house = str(rng.randint(1, 120))
+        count_template, people = rng.choice(KZ_COUNT if kazakh else RU_COUNT)
+        n = rng.randint(2, 9)
+        count = count_template.format(n=n)
+        if people is None:
+            people = n
+
+        text = template.format(p=rng.choice(PREFIX), s=street, h=house, l=landmark, c=count)
+        if has_street and has_house:
+            address = f"ул. {street}, д. {house}"
+        elif has_street:
+            address = f"ул. {street}"
+        elif has_house:
+            address = f"д. {house}"
+        else:
+            address = f"около {landmark}"
+        corpus.append((text.capitalize(), address, people))
+    return corpus
+
+
+class LegacyExtractor:
+    """Extraction as performed by IncidentClassifier before IncidentExtractor."""
+
+    address_patterns = [
+        r'улица\s+([\w\s]+)\s*,\s*(?:дом|д\.?)\s*(\d+)',
+        r'ул\.\s*([\w\s]+)\s*,\s*(?:дом|д\.?)\s*(\d+)',
+        r'([\w\s]+)\s*улица\s*,\s*(?:дом|д\.?)\s*(\d+)',
+        r'дом\s*(\d+)\s*по\s*улице\s*([\w\s]+)',
+        r'(\d+)\s*дом\s*на\s*([\w\s]+)'
+    ]
+
+    def extract_people_count(self, text: str) -> int:
+        text_lower = text.lower()
+        patterns = [
+            r'(\d+)\s*(?:человек|людей|люди|чел)',
+            r'(\d+)\s*(?:мужчин|женщин|детей)',
+            r'около\s*(\d+)\s*(?:человек|людей)',
+            r'несколько\s*(?:человек|людей)'
+        ]
+        for pattern in patterns:
+            match = re.search(pattern, text_lower)
+            if match:
+                try:
+                    return int(match.group(1))
+                except (ValueError, IndexError):
+                    pass
+        if 'один' in text_lower or '1' in text:
+            return 1
+        elif 'два' in text_lower or '2' in text or 'пара' in text_lower:
+            return 2
+        elif 'несколько' in text_lower:
+            return 3
+        elif 'много' in text_lower or 'толпа' in text_lower:
+            return 5
+        return 0
+
+    def extract_address(self, text: str) -> str:
+        text_lower = text.lower()
+        for pattern in self.address_patterns:
+            match = re.search(pattern, text_lower, re.IGNORECASE)
+            if match:
+                try:
+                    return f"ул. {match.group(1).strip()}, д. {match.group(2).strip()}"
+                except (IndexError, AttributeError):
+                    continue
+        for pattern in [r'на\s+улице\s+([\w\s]+)', r'в\s+доме\s+(\d+)', r'возле\s+([\w\s]+)']:
+            match = re.search(pattern, text_lower, re.IGNORECASE)
+            if match:
+                try:
+                    return f"около {match.group(1).strip()}"
+                except (IndexError, AttributeError):
+                    continue
+        return 'не указан'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transcripts', type=int, default=50000)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.transcripts)
+    legacy = LegacyExtractor()
+    extractor = IncidentExtractor()
+
+    def run_legacy(text):
+        return legacy.extract_address(text), legacy.extract_people_count(text)
+
+    def run_single_pass(text):
+        details = extractor.extract(text)
+        return details.address, details.people
+
+    print(f"{len(corpus)} labeled descriptions (~30% Kazakh)\n")
+    print(f"  {'extractor':22s} {'us/text':>8s} {'address acc':>12s} {'people acc':>11s}")
+    for name, fn in (('serial regexes (old)', run_legacy), ('IncidentExtractor', run_single_pass)):
+        started = time.perf_counter()
+        results = [fn(text) for text, _, _ in corpus]
+        elapsed = time.perf_counter() - started
+
+        address_ok = sum(1 for (address, _), (_, expected, _) in zip(results, corpus) if address == expected)
+        people_ok = sum(1 for (_, people), (_, _, expected) in zip(results, corpus) if people == expected)
+        print(f"  {name:22s} {elapsed / len(corpus) * 1e6:8.1f} "
+              f"{address_ok / len(corpus):12.1%} {people_ok / len(corpus):11.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark: call duration of the follow-up dialog, fixed question rotation vs. slot planner.
+
+Generates calls where the caller's first statement already contains a
+random subset of the required details (address, danger, weapons, head
+count). A simulated LLM reports known details and defaults for the rest
+and asks for clarification while anything is unknown; each answer fills
+the detail the question asked for. Both policies are replayed with at most
+3 questions per call, as in CallHandler.analyze_with_ai, and every
+question is charged the time of one follow-up turn (prompt playback,
+8 s recording, STT and LLM update).
+
+Usage:
+    python benchmarks/bench_followup_questions.py [--calls 2000] [--turn-seconds 14]
+"""
+
+import os
+import sys
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.followup_planner import FollowUpPlanner
+
+MAX_QUESTIONS = 3
+
+# Slot asked by each question of CallHandler.follow_up_questions (None: "What happened?")
+ROTATION = [None, 'address', 'current_danger', 'people_involved', 'weapons']
+
+# What the caller says about a detail, and the value the LLM extracts from it
+PHRASES = {
+    'address': ("это на улице Абая, дом 15", "ул. Абая, д. 15"),
+    'current_danger': ("он все еще здесь, кричит и угрожает", True),
+    'weapons': ("у него в руках нож", True),
+    'people_involved': ("их двое", 2),
+}
+DEFAULTS = {'address': 'не указан', 'current_danger': False, 'weapons': False, 'people_involved': 0}
+
+# Chance that the first statement already contains the detail
+KNOWN_RATE = {'address': 0.6, 'current_danger': 0.7, 'weapons': 0.5, 'people_involved': 0.5}
+
+
+class Call:
+    """One simulated call: ground truth plus what the caller has said so far."""
+
+    def __init__(self, rng: random.Random):
+        self.category = rng.choice(['assault', 'assault', 'domestic', 'theft', 'noise'])
+        self.urgency = 'high' if self.category in ('assault', 'domestic') else 'medium'
+        self.known = {slot for slot, rate in KNOWN_RATE.items() if rng.random() < rate}
+        self.texts = ["Алло, помогите"] + [PHRASES[slot][0] for slot in sorted(self.known)]
+
+    def analysis(self):
+        result = {'urgency': self.urgency, 'category': self.category}
+        for slot in PHRASES:
+            result[slot] = PHRASES[slot][1] if slot in self.known else DEFAULTS[slot]
+        result['needs_clarification'] = len(self.known) < len(PHRASES)
+        return result
+
+    def answer(self, slot):
+        if slot and slot not in self.known:
+            self.known.add(slot)
+            self.texts.append(PHRASES[slot][0])
+        else:
+            self.texts.append("я же уже сказал")
+
+
+def run_rotation(call: Call) -> int:
+    asked = 0
+    while asked < MAX_QUESTIONS and call.analysis()['needs_clarification']:
+        call.answer(ROTATION[asked % len(ROTATION)])
+        asked += 1
+    return asked
+
+
+def run_planner(call: Call) -> int:
+    planner = FollowUpPlanner()
+    asked = 0
+    while asked < MAX_QUESTIONS and call.analysis()['needs_clarification']:
+        slot = planner.next_slot(call.analysis(), " ".join(call.texts))
+        if slot is None:
+            break
+        call.answer(slot)
+        asked += 1
+    return asked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--turn-seconds', type=float, default=14.0,
+                        help="Duration of one follow-up turn (playback + recording + STT + LLM)")
+    args = parser.parse_args()
+
+    print(f"{args.calls} calls, max {MAX_QUESTIONS} questions, {args.turn_seconds:.0f} s per follow-up turn\n")
+    print(f"  {'policy':10s} {'questions':>10s} {'redundant':>10s} {'complete':>9s} {'dialog s':>9s}")
+
+    results = {}
+    for label, policy in (('rotation', run_rotation), ('planner', run_planner)):
+        rng = random.Random(7)
+        questions = redundant = complete = 0
+        for _ in range(args.calls):
+            call = Call(rng)
+            known_before = len(call.known)
+            asked = policy(call)
+            questions += asked
+            redundant += asked - (len(call.known) - known_before)
+            complete += len(call.known) == len(PHRASES)
+        seconds = questions * args.turn_seconds / args.calls
+        results[label] = seconds
+        print(f"  {label:10s} {questions / args.calls:10.2f} {redundant / args.calls:10.2f} "
+              f"{complete / args.calls:9.0%} {seconds:9.1f}")
+
+    print(f"\n  average call duration saved: {results['rotation'] - results['planner']:.1f} s per call")
+
+
+if __name__ == "__main__":
+    main()
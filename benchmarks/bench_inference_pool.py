@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark: web event-loop responsiveness while STT inference runs in threads vs. the inference pool.
+
+A CPU-bound stand-in for Whisper (pure-Python pass over the PCM samples,
+holding the GIL like the Python parts of model inference) transcribes a
+batch of 3 s utterances submitted from a thread pool, as the web workers
+do today. Meanwhile the event loop of the same process ticks every 5 ms,
+standing in for HTTP handling; its lag shows how long a request would
+wait for the interpreter.
+
+- threads: inference runs in the web process (current STTService)
+- pool: inference runs in services.inference_pool worker processes; the
+  web process only copies audio into the shared ring and waits
+
+Reported: event-loop lag p50/p99/max and transcription throughput.
+Throughput only scales with the pool when there are spare cores.
+
+Usage:
+    python benchmarks/bench_inference_pool.py [--utterances 24] [--workers 2] [--threads 4]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import logging
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.inference_pool import InferencePool  # noqa: E402
+
+SAMPLE_RATE = 16000
+UTTERANCE_SECONDS = 3
+TICK_SECONDS = 0.005
+
+
+def fake_transcribe(audio, language="ru"):
+    """CPU-bound passes over the samples, roughly 0.15 s per 3 s utterance on one core."""
+    samples = array('h', audio)
+    energy = 0
+    for _ in range(32):
+        for sample in samples:
+            energy += sample * sample
+    return f"{len(samples) / SAMPLE_RATE:.1f} s of {language} audio, energy {energy % 1000}"
+
+
+def fake_handlers():
+    return {'stt': fake_transcribe}
+
+
+async def run(mode: str, utterances: int, workers: int, threads: int):
+    audio = array('h', (i % 2000 - 1000 for i in range(SAMPLE_RATE * UTTERANCE_SECONDS))).tobytes()
+    pool = InferencePool(workers=workers, slots=16, handlers_factory=fake_handlers) if mode == 'pool' else None
+    if pool:
+        while pool.get_stats()['ready'] < workers:
+            await asyncio.sleep(0.05)
+    transcribe = pool.transcribe if pool else fake_transcribe
+
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(TICK_SECONDS)
+            lags.append(time.perf_counter() - started - TICK_SECONDS)
+
+    loop = asyncio.get_running_loop()
+    tick_task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        await asyncio.gather(*(loop.run_in_executor(executor, transcribe, audio, "ru") for _ in range(utterances)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await tick_task
+    if pool:
+        pool.close()
+    return lags, elapsed
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--utterances', type=int, default=24)
+    parser.add_argument('--workers', type=int, default=2, help="Inference pool processes")
+    parser.add_argument('--threads', type=int, default=4, help="Web threads submitting transcriptions")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print(f"{args.utterances} utterances of {UTTERANCE_SECONDS} s, {args.threads} submitting threads, "
+          f"{os.cpu_count()} CPU(s)\n")
+    print(f"  {'mode':8s} {'lag p50':>8s} {'lag p99':>8s} {'lag max':>8s} {'utt/s':>6s}")
+    for mode in ('threads', 'pool'):
+        lags, elapsed = asyncio.run(run(mode, args.utterances, args.workers, args.threads))
+        print(f"  {mode:8s} {percentile(lags, 0.5) * 1000:6.1f}ms {percentile(lags, 0.99) * 1000:6.1f}ms "
+              f"{max(lags) * 1000:6.1f}ms {args.utterances / elapsed:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: IncidentClassifier keyword checks over a transcript corpus.
+
+Compares the previous per-keyword ``in`` scans (category detection, danger,
+immediate danger and weapon checks run separately, as classify() used to)
+with a single KeywordMatcher pass feeding all checks.
+
+Usage:
+    python benchmarks/bench_keyword_matching.py [--transcripts 100000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.classifier import IncidentClassifier
+
+FILLER = (
+    "здравствуйте я звоню потому что у нас во дворе дома номер пятнадцать по улице абая "
+    "что-то происходит там стоят люди и никто не знает что делать помогите пожалуйста "
+    "приезжайте быстрее мы ждем у подъезда сосед говорит что уже вызывал но никто не приехал"
+).split()
+
+
+def build_corpus(classifier: IncidentClassifier, size: int, seed: int = 42):
+    """Generate transcripts of 40-200 words with a few classifier keywords mixed in."""
+    rng = random.Random(seed)
+    keywords = [kw for info in classifier.categories.values() for kw in info['keywords']]
+    keywords += classifier.danger_indicators + classifier.weapon_indicators
+    corpus = []
+    for _ in range(size):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(40, 200))]
+        for _ in range(rng.randint(0, 4)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(keywords))
+        corpus.append(' '.join(words).capitalize())
+    return corpus
+
+
+def legacy_checks(classifier: IncidentClassifier, text: str):
+    """Keyword checks as performed before KeywordMatcher (one scan per keyword per check)."""
+    text = text.lower()
+
+    def has_danger(text_lower):
+        return any(indicator in text_lower for indicator in classifier.danger_indicators)
+
+    # _detect_category_from_text scanned every keyword twice
+    category_scores = {}
+    for category, info in classifier.categories.items():
+        score = sum(1 for keyword in info['keywords'] if keyword in text)
+        score += sum(0.5 for keyword in info['keywords'] if keyword in text)
+        category_scores[category] = score
+    best = max(category_scores.items(), key=lambda x: x[1])
+    category = best[0] if best[1] > 0 else 'other'
+
+    # Each check lowercased the text again; immediate danger re-ran the danger check
+    danger = has_danger(text.lower())
+    immediate = any(indicator in text.lower() for indicator in classifier.immediate_indicators) \
+        and has_danger(text.lower())
+    weapons = any(indicator in text.lower() for indicator in classifier.weapon_indicators)
+    return category, danger, immediate, weapons
+
+
+def matcher_checks(classifier: IncidentClassifier, text: str):
+    """Keyword checks fed by one KeywordMatcher pass."""
+    text = text.lower()
+    hits = classifier.keyword_matcher.count(text)
+    return (
+        classifier._detect_category_from_text(text, hits),
+        classifier._has_danger_indicators(text, hits),
+        classifier._has_immediate_danger_indicators(text, hits),
+        classifier._has_weapon_indicators(text, hits),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transcripts', type=int, default=100000)
+    args = parser.parse_args()
+
+    classifier = IncidentClassifier()
+    print(f"Generating {args.transcripts} transcripts...")
+    corpus = build_corpus(classifier, args.transcripts)
+    avg_chars = sum(len(t) for t in corpus) / len(corpus)
+    mode = 'automaton' if classifier.keyword_matcher._automaton is not None else 'fallback scan'
+
+    results = {}
+    print(f"\n{len(corpus)} transcripts, {avg_chars:.0f} chars on average, matcher: {mode}")
+    for name, fn in (('per-keyword scans (legacy)', legacy_checks), ('KeywordMatcher single pass', matcher_checks)):
+        started = time.perf_counter()
+        results[name] = [fn(classifier, text) for text in corpus]
+        elapsed = time.perf_counter() - started
+        print(f"  {name:30s} {elapsed:8.2f} s  {elapsed / len(corpus) * 1e6:8.1f} us/transcript")
+
+    legacy, compiled = results.values()
+    mismatches = sum(1 for a, b in zip(legacy, compiled) if a != b)
+    print(f"\nMismatching results: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
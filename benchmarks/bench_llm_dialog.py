@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark: prompt tokens and latency per follow-up turn, full re-send vs. delta session.
+
+Replays a caller dialog (first statement plus follow-up answers) through a
+fake OpenAI-compatible client that counts prompt tokens of every request,
+simulates a provider prefix cache for repeated system prompts, and models
+latency as prefill time per uncached prompt token plus decode time per
+completion token.
+
+- full re-send: CallHandler before sessions, analyze_incident() on all
+  answers joined together, every turn
+- delta session: LLMService.start_session(), previous result + new answer
+
+Usage:
+    python benchmarks/bench_llm_dialog.py [--answers 7] [--answer-scale 3]
+
+Prompt tokens per turn stay flat with the session and grow with the dialog
+when re-sending; with very short answers the previous result sent back can
+outweigh the re-sent transcript for the first turns.
+"""
+
+import os
+import sys
+import json
+import argparse
+import logging
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.llm_service import LLMService, estimate_tokens
+
+FIRST_STATEMENT = ("Алло, у нас во дворе драка, мужчина избивает другого, там кричат, "
+                   "я из окна вижу, кажется у одного что-то в руках, может нож, пожалуйста быстрее")
+ANSWERS = [
+    "Это улица Абая, дом 15, во дворе за магазином, третий подъезд",
+    "Их двое, еще несколько человек стоят рядом и смотрят, один уже лежит на земле",
+    "Да, у того что в черной куртке нож, он им размахивает",
+    "Нет, скорую еще никто не вызывал, тот что лежит не встает",
+    "Нападающий высокий, в черной куртке и кепке, лет тридцать на вид",
+    "Сейчас он уходит в сторону остановки на Толе би",
+    "Я Айгуль, мой номер вы видите, могу встретить полицию у подъезда",
+]
+
+RESULT = {
+    "urgency": "critical", "category": "assault", "address": "ул. Абая, д. 15",
+    "current_danger": True, "people_involved": 2, "weapons": True,
+    "recommended_department": "Полиция",
+    "summary": "Драка во дворе дома 15 по улице Абая, у нападающего нож, пострадавший лежит.",
+    "needs_clarification": True, "clarification_questions": ["Есть ли пострадавшие?"]
+}
+
+# Simulated provider costs
+PREFILL_SECONDS_PER_TOKEN = 0.0002
+DECODE_SECONDS_PER_TOKEN = 0.02
+CACHE_BLOCK = 128
+
+
+class CountingClient:
+    """Fake chat client recording tokens; caches prompt prefixes in 128-token blocks like OpenAI."""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=self)
+        self.cached_prefixes = set()
+        self.requests = []
+
+    def create(self, messages, **kwargs):
+        system, user = messages[0]['content'], messages[1]['content']
+        prompt_tokens = estimate_tokens(system) + estimate_tokens(user)
+        system_tokens = estimate_tokens(system)
+        cached = (system_tokens // CACHE_BLOCK) * CACHE_BLOCK if system in self.cached_prefixes else 0
+        self.cached_prefixes.add(system)
+
+        content = json.dumps(RESULT, ensure_ascii=False)
+        completion_tokens = estimate_tokens(content)
+        latency = (prompt_tokens - cached) * PREFILL_SECONDS_PER_TOKEN + completion_tokens * DECODE_SECONDS_PER_TOKEN
+        self.requests.append((prompt_tokens, cached, latency))
+
+        usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                                prompt_tokens_details=SimpleNamespace(cached_tokens=cached))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=usage)
+
+
+def make_service() -> LLMService:
+    service = LLMService(engine='mock', hedge_engine='')
+    service.engine = 'openai'
+    service.client = CountingClient()
+    from services.circuit_breaker import CircuitBreaker
+    service.breaker = CircuitBreaker('llm.bench')
+    return service
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--answers', type=int, default=len(ANSWERS), help=f"Follow-up answers (max {len(ANSWERS)})")
+    parser.add_argument('--answer-scale', type=int, default=3,
+                        help="Repeat every utterance N times to simulate longer speech")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    scale = max(1, args.answer_scale)
+    first = " ".join([FIRST_STATEMENT] * scale)
+    answers = [" ".join([answer] * scale) for answer in ANSWERS[:args.answers]]
+
+    full = make_service()
+    said = [first]
+    full.analyze_incident(first, 'ru')
+    for answer in answers:
+        said.append(answer)
+        full.analyze_incident(" ".join(said), 'ru')
+
+    delta = make_service()
+    session = delta.start_session('ru')
+    session.analyze(first)
+    for answer in answers:
+        session.update(answer, "Уточните, пожалуйста")
+
+    print(f"Dialog of 1 statement + {len(answers)} answers x{scale} (tokens ~ chars/3, "
+          f"{PREFILL_SECONDS_PER_TOKEN * 1000:.1f} ms/uncached prompt token, "
+          f"{DECODE_SECONDS_PER_TOKEN * 1000:.0f} ms/completion token)\n")
+    print(f"  {'turn':>4s} {'full prompt':>12s} {'cached':>7s} {'full ms':>8s} "
+          f"{'delta prompt':>13s} {'cached':>7s} {'delta ms':>9s}")
+    for turn, (f, d) in enumerate(zip(full.client.requests, delta.client.requests), start=1):
+        print(f"  {turn:4d} {f[0]:12d} {f[1]:7d} {f[2] * 1000:8.0f} {d[0]:13d} {d[1]:7d} {d[2] * 1000:9.0f}")
+
+    for label, service in (('full re-send', full), ('delta session', delta)):
+        requests = service.client.requests
+        print(f"\n  {label:14s} prompt tokens {sum(r[0] for r in requests):6d}, "
+              f"uncached {sum(r[0] - r[1] for r in requests):6d}, "
+              f"model time {sum(r[2] for r in requests):6.2f} s", end="")
+    print()
+    print(f"  session stats: {session.stats()}")
+
+
+if __name__ == "__main__":
+    main()
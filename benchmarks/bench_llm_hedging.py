@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tail latency of LLM analysis with and without hedged requests.
+
+The primary engine is simulated with a heavy-tailed latency (most requests
+fast, a few percent stalling for seconds, like a congested cloud API); the
+hedge engine is slower on average but steady, like a local Ollama model.
+Requests run sequentially through LLMService, once with hedging disabled
+and once with the hedge delay driven by the primary's latency histogram.
+
+Usage:
+    python benchmarks/bench_llm_hedging.py [--requests 300] [--stall-rate 0.05]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import logging
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.llm_service import LLMService
+from services.circuit_breaker import CircuitBreaker
+
+RESPONSE = json.dumps({
+    "urgency": "high",
+    "category": "violence",
+    "address": "ул. Абая, д. 15",
+    "current_danger": True,
+    "people_involved": 2,
+    "weapons": False,
+    "recommended_department": "Полиция",
+    "summary": "Драка во дворе дома 15 по улице Абая.",
+    "needs_clarification": False,
+    "clarification_questions": []
+}, ensure_ascii=False)
+
+
+class FakeEngineClient:
+    """Streams RESPONSE in 8 chunks after a sampled total latency."""
+
+    def __init__(self, sample_latency):
+        self.sample_latency = sample_latency
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, stream=False, **kwargs):
+        latency = self.sample_latency()
+        if not stream:
+            time.sleep(latency)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=RESPONSE))])
+        return _FakeStream(latency)
+
+
+class _FakeStream:
+    def __init__(self, latency: float, pieces: int = 8):
+        step = len(RESPONSE) // pieces + 1
+        self.chunks = [RESPONSE[i:i + step] for i in range(0, len(RESPONSE), step)]
+        self.delay = latency / len(self.chunks)
+        self.closed = False
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            if self.closed:
+                return
+            time.sleep(self.delay)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=chunk))])
+
+    def close(self):
+        self.closed = True
+
+
+def make_service(client, engine: str) -> LLMService:
+    service = LLMService(engine='mock', hedge_engine='')
+    service.engine = engine
+    service.client = client
+    service.breaker = CircuitBreaker(f"llm.{engine}")
+    service.latency = service.breaker.latency
+    return service
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--stall-rate', type=float, default=0.05, help="Share of primary requests that stall")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    rng = random.Random(3)
+
+    def primary_latency():
+        if rng.random() < args.stall_rate:
+            return rng.uniform(2.0, 4.0)
+        return rng.lognormvariate(-1.9, 0.3)  # ~150 ms median
+
+    def hedge_latency():
+        return rng.uniform(0.3, 0.4)
+
+    results = {}
+    for label, hedged in (('primary only', False), ('hedged (p95)', True)):
+        service = make_service(FakeEngineClient(primary_latency), 'openai')
+        if hedged:
+            service.hedge = make_service(FakeEngineClient(hedge_latency), 'ollama')
+            service._executor = ThreadPoolExecutor(max_workers=8)
+            service.hedge_initial_delay = 0.5
+
+        timings = []
+        for _ in range(args.requests):
+            started = time.perf_counter()
+            result = service.analyze_incident("Драка во дворе, улица Абая 15", 'ru')
+            timings.append(time.perf_counter() - started)
+            assert result['category'] == 'violence'
+        results[label] = (timings, service)
+
+    print(f"{args.requests} sequential requests, {args.stall_rate:.0%} primary stalls of 2-4 s\n")
+    print(f"  {'policy':14s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'max ms':>8s} {'hedges':>7s} {'hedge wins':>11s}")
+    for label, (timings, service) in results.items():
+        print(f"  {label:14s} {percentile(timings, 0.5) * 1000:8.0f} {percentile(timings, 0.95) * 1000:8.0f} "
+              f"{percentile(timings, 0.99) * 1000:8.0f} {max(timings) * 1000:8.0f} "
+              f"{service.hedges_sent:7d} {service.hedge_wins:11d}")
+
+    _, service = results['hedged (p95)']
+    print(f"\n  final hedge delay: {service.hedge_delay() * 1000:.0f} ms, "
+          f"primary latency: {service.latency.snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
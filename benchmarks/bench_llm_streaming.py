@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time to first usable urgency with streamed LLM analysis.
+
+Replays a typical analysis completion through a fake OpenAI-compatible
+client at a fixed token rate and measures when LLMService reports the
+provisional urgency/category compared with the complete parsed result,
+plus the CPU overhead of the incremental parser per response.
+
+Usage:
+    python benchmarks/bench_llm_streaming.py [--token-ms 25] [--runs 5]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.llm_service import LLMService
+from services.json_stream import IncrementalJSONParser
+
+RESPONSE = json.dumps({
+    "urgency": "critical",
+    "category": "violence",
+    "address": "ул. Абая, д. 15",
+    "current_danger": True,
+    "people_involved": 2,
+    "weapons": True,
+    "recommended_department": "Полиция",
+    "summary": "Мужчина с ножом угрожает женщине во дворе дома 15 по улице Абая, соседи слышат крики.",
+    "needs_clarification": True,
+    "clarification_questions": ["Есть ли пострадавшие?", "Где сейчас находится нападающий?",
+                                "Как выглядит нападающий?"]
+}, ensure_ascii=False, indent=2)
+
+
+def tokenize(text: str, size: int = 4):
+    """Split text into token-sized pieces (~4 characters, like BPE output)."""
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class FakeStreamingClient:
+    """Minimal stand-in for ``OpenAI().chat.completions`` that streams RESPONSE."""
+
+    def __init__(self, token_delay: float):
+        self.token_delay = token_delay
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, stream=False, **kwargs):
+        tokens = tokenize(RESPONSE)
+        if not stream:
+            time.sleep(self.token_delay * len(tokens))
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=RESPONSE))])
+        return self._stream(tokens)
+
+    def _stream(self, tokens):
+        for token in tokens:
+            time.sleep(self.token_delay)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--token-ms', type=float, default=25.0, help="Simulated generation time per token")
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    service = LLMService(engine='mock')
+    service.engine = 'openai'
+    service.client = FakeStreamingClient(args.token_ms / 1000)
+    transcript = "Мужчина с ножом угрожает женщине во дворе, улица Абая 15"
+
+    blocking, provisional, streamed = [], [], []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        service.analyze_incident(transcript, 'ru')
+        blocking.append(time.perf_counter() - started)
+
+        marks = {}
+        started = time.perf_counter()
+        service.analyze_incident(
+            transcript, 'ru', on_provisional=lambda fields: marks.setdefault('at', time.perf_counter())
+        )
+        streamed.append(time.perf_counter() - started)
+        provisional.append(marks['at'] - started)
+
+    tokens = tokenize(RESPONSE)
+    print(f"{len(tokens)} tokens at {args.token_ms:.0f} ms/token, {args.runs} runs\n")
+    print(f"  {'blocking completion':32s} {sum(blocking) / args.runs * 1000:8.0f} ms")
+    print(f"  {'streamed: provisional urgency':32s} {sum(provisional) / args.runs * 1000:8.0f} ms")
+    print(f"  {'streamed: complete analysis':32s} {sum(streamed) / args.runs * 1000:8.0f} ms")
+
+    # Parser cost without network delay
+    iterations = 2000
+    started = time.perf_counter()
+    for _ in range(iterations):
+        incremental = IncrementalJSONParser()
+        for token in tokens:
+            incremental.feed(token)
+    per_response = (time.perf_counter() - started) / iterations
+    print(f"\n  incremental parser: {per_response * 1e6:.0f} us per response")
+
+
+if __name__ == "__main__":
+    main()
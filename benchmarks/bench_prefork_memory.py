@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory of N web workers with per-worker model loading vs. pre-fork sharing.
+
+Whisper/Coqui are not needed: a numpy array of --model-mb random float32
+weights stands in for the model, and every request runs a read-only
+"inference" over all of it (a dot product), as model.transcribe reads
+the weights. Two server layouts are started in a subprocess:
+
+- separate: every worker loads its own copy at startup, as with
+  ``uvicorn --workers`` (spawned processes, lifespan loads the model);
+- prefork: services.prefork.PreforkServer loads the weights once in the
+  master and forks the workers.
+
+After a round of requests hitting every worker, RSS and PSS of the master
+and workers are read from /proc/<pid>/smaps_rollup. RSS counts shared
+pages in every process; the PSS total is the memory actually used.
+
+Usage:
+    python benchmarks/bench_prefork_memory.py [--workers 4,8] [--model-mb 200]
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import subprocess
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services.prefork import PreforkServer, preloaded_models, memory_report  # noqa: E402
+
+
+def load_weights(model_mb: int):
+    import numpy as np
+    return np.random.default_rng(0).standard_normal(model_mb * 1024 * 1024 // 4, dtype=np.float32)
+
+
+def make_app(model_mb: int):
+    """ASGI app running a read-only pass over the model on every request."""
+    import numpy as np
+    state = {}
+
+    async def app(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    state['weights'] = preloaded_models().get('weights')
+                    if state['weights'] is None:
+                        state['weights'] = load_weights(model_mb)  # Separate copy per worker
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        weights = state['weights']
+        score = float(np.dot(weights, weights[::-1]))
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [(b'content-type', b'text/plain')]})
+        await send({'type': 'http.response.body', 'body': f"{os.getpid()} {score:.1f}".encode()})
+
+    return app
+
+
+def serve(mode: str, workers: int, port: int, model_mb: int):
+    """Server process: master of the forked or spawned workers."""
+    if mode == 'prefork':
+        PreforkServer(make_app(model_mb), host='127.0.0.1', port=port, workers=workers,
+                      preload=lambda: {'weights': load_weights(model_mb)}, log_level='warning').run()
+    else:
+        import uvicorn
+        os.environ['BENCH_MODEL_MB'] = str(model_mb)
+        uvicorn.run('bench_prefork_memory:separate_app', factory=True, host='127.0.0.1', port=port,
+                    workers=workers, log_level='warning', app_dir=os.path.dirname(os.path.abspath(__file__)))
+
+
+def separate_app():
+    """App factory for the spawned uvicorn workers."""
+    return make_app(int(os.environ.get('BENCH_MODEL_MB', 200)))
+
+
+def descendants(pid: int):
+    """Pids of all processes below ``pid`` (Linux /proc)."""
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    parents[int(entry)] = int(f.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                pass
+    found, frontier = [], [pid]
+    while frontier:
+        parent = frontier.pop()
+        children = [child for child, ppid in parents.items() if ppid == parent]
+        found.extend(children)
+        frontier.extend(children)
+    return found
+
+
+def measure(mode: str, workers: int, model_mb: int):
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', mode,
+                               '--workers', str(workers), '--port', str(port), '--model-mb', str(model_mb)])
+    try:
+        url = f"http://127.0.0.1:{port}/"
+        deadline = time.time() + 300
+        seen = set()
+        with ThreadPoolExecutor(max_workers=workers * 2) as pool:
+            while len(seen) < workers and time.time() < deadline:
+                try:
+                    replies = list(pool.map(lambda _: urllib.request.urlopen(url, timeout=60).read(),
+                                            range(workers * 4)))
+                    seen.update(int(reply.split()[0]) for reply in replies)
+                except OSError:
+                    time.sleep(0.5)
+        time.sleep(1)
+        # Workers that never answered keep their full startup footprint, measure all the same
+        pids = [server.pid] + descendants(server.pid)
+        report = memory_report(pids)
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+    worker_rss = [usage['rss'] for pid, usage in report['processes'].items() if pid != server.pid and usage]
+    return {
+        'answered': len(seen),
+        'worker_rss': sum(worker_rss) / max(1, len(worker_rss)) / 1024,
+        'total_rss': report['total_rss'] / 1024,
+        'total_pss': report['total_pss'] / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', default='4,8', help="Comma-separated worker counts")
+    parser.add_argument('--model-mb', type=int, default=200, help="Size of the stand-in model weights")
+    parser.add_argument('--serve', choices=['prefork', 'separate'], help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, int(args.workers), args.port, args.model_mb)
+        return
+
+    print(f"Stand-in model: {args.model_mb} MB of float32 weights, read on every request\n")
+    print(f"  {'workers':>7s} {'layout':9s} {'answered':>8s} {'RSS/worker':>11s} {'sum RSS':>9s} {'total PSS':>10s}")
+    for workers in (int(n) for n in args.workers.split(',')):
+        for mode in ('separate', 'prefork'):
+            result = measure(mode, workers, args.model_mb)
+            print(f"  {workers:7d} {mode:9s} {result['answered']:8d} {result['worker_rss']:9.0f}MB "
+                  f"{result['total_rss']:7.0f}MB {result['total_pss']:8.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
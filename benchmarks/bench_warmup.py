@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: first-caller latency of the ai-module with and without the startup warm-up.
+
+Starts the ai-module with uvicorn in a subprocess (mock STT/TTS, no LLM key)
+and, once the port accepts connections, polls /ready and sends the first
+/process-call, then a few more. Without warm-up /ready answers at once and
+the first request pays for service construction and the first TTS run;
+with warm-up the request waits for /ready and is served by a warm replica.
+Reported: time from process start to ready, and the latency of the first
+and of the following requests. Real Whisper/Coqui models make the cold
+first request much slower than the mock engines here.
+
+Usage:
+    python benchmarks/bench_warmup.py [--runs 3] [--requests 5]
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import socket
+import argparse
+import subprocess
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def request(url: str, body: bytes = None) -> int:
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def run(warmup: bool, requests: int):
+    port = free_port()
+    env = dict(os.environ, WARMUP_ON_STARTUP='1' if warmup else '0', WARMUP_REMOTE='0',
+               OPENAI_API_KEY='', LLM_HEDGE_ENGINE='')
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--app-dir', os.path.join(ROOT, 'ai-module'),
+         '--port', str(port), '--log-level', 'warning'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base = f"http://127.0.0.1:{port}"
+    body = json.dumps({"sessionId": "bench", "audioData": base64.b64encode(b'\0' * 32000).decode()}).encode()
+    try:
+        while True:
+            try:
+                if request(f"{base}/ready") == 200:
+                    break
+            except (urllib.error.URLError, ConnectionError):
+                pass
+            if time.perf_counter() - started > 60:
+                raise RuntimeError("ai-module did not become ready")
+            time.sleep(0.05)
+        ready = time.perf_counter() - started
+
+        latencies = []
+        for _ in range(requests):
+            sent = time.perf_counter()
+            request(f"{base}/process-call", body)
+            latencies.append(time.perf_counter() - sent)
+        return ready, latencies
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3, help="Server restarts per mode")
+    parser.add_argument('--requests', type=int, default=5, help="Requests after each start")
+    args = parser.parse_args()
+
+    print(f"  {'mode':10s} {'ready s':>8s} {'first req':>10s} {'later reqs':>11s}")
+    for warmup in (False, True):
+        readies, firsts, laters = [], [], []
+        for _ in range(args.runs):
+            ready, latencies = run(warmup, args.requests)
+            readies.append(ready)
+            firsts.append(latencies[0])
+            laters.extend(latencies[1:])
+        print(f"  {'warm-up' if warmup else 'lazy':10s} {sum(readies) / len(readies):8.2f} "
+              f"{sum(firsts) / len(firsts) * 1000:8.0f}ms {sum(laters) / max(1, len(laters)) * 1000:9.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Load test: concurrent call sessions over the ai-module WebSocket stream vs. /process-call.
+
+Starts the ai-module with uvicorn in a subprocess (mock STT/TTS, no LLM
+key) and runs N concurrent callers. Each caller speaks a few 2 s
+utterances; the WebSocket client streams 20 ms PCM frames in real time
+and sends "flush" at the end of speech, the HTTP client posts the whole
+utterance as base64 JSON when it ends, as the NestJS backend does today.
+Reported per turn: time from end of speech to the response event and to
+the end of the response audio, failed turns (shed or connection errors),
+and bytes sent per utterance.
+
+Usage:
+    python benchmarks/bench_ws_sessions.py [--sessions 200] [--utterances 3] [--mode both]
+"""
+
+import os
+import sys
+import json
+import time
+import math
+import socket
+import asyncio
+import argparse
+import subprocess
+from array import array
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_RATE = 16000
+FRAME_MS = 20
+SPEECH_SECONDS = 2.0
+PAUSE_SECONDS = 1.0
+
+
+def speech_frames():
+    samples = SAMPLE_RATE * FRAME_MS // 1000
+    frame = array('h', (int(3000 * math.sin(i * 0.35)) for i in range(samples))).tobytes()
+    return [frame] * int(SPEECH_SECONDS * 1000 / FRAME_MS)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, workers: int) -> subprocess.Popen:
+    env = dict(os.environ, CALL_WORKERS=str(workers), CALL_QUEUE_SIZE='256', VAD_ENGINE='energy',
+               OPENAI_API_KEY='', LLM_HEDGE_ENGINE='')
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--app-dir', os.path.join(ROOT, 'ai-module'),
+         '--port', str(port), '--log-level', 'warning', '--ws-max-size', str(4 * 1024 * 1024)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("ai-module did not start")
+
+
+async def ws_caller(port: int, index: int, utterances: int, frames, stats):
+    import websockets
+
+    async with websockets.connect(f"ws://127.0.0.1:{port}/ws/call/bench-{index}", max_size=None) as ws:
+        await ws.send(json.dumps({"type": "start", "sampleRate": SAMPLE_RATE, "language": "ru", "vad": False}))
+        for _ in range(utterances):
+            started = time.perf_counter()
+            for number, frame in enumerate(frames):
+                delay = started + number * FRAME_MS / 1000 - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await ws.send(frame)
+                stats['bytes'] += len(frame) + 6  # WebSocket frame header
+            await ws.send(json.dumps({"type": "flush"}))
+            speech_end = time.perf_counter()
+
+            while True:
+                message = await ws.recv()
+                if isinstance(message, bytes):
+                    continue
+                event = json.loads(message)
+                if event['type'] == 'response':
+                    stats['response'].append(time.perf_counter() - speech_end)
+                elif event['type'] == 'audio_end':
+                    stats['audio'].append(time.perf_counter() - speech_end)
+                    break
+                elif event['type'] == 'error':
+                    stats['failed'] += 1
+                    break
+            await asyncio.sleep(PAUSE_SECONDS)
+        await ws.send(json.dumps({"type": "stop"}))
+
+
+async def http_caller(client, port: int, index: int, utterances: int, frames, stats):
+    import base64
+    import httpx
+
+    for _ in range(utterances):
+        await asyncio.sleep(SPEECH_SECONDS)  # The caller speaks, audio is buffered client-side
+        body = json.dumps({"sessionId": f"bench-{index}",
+                           "audioData": base64.b64encode(b''.join(frames)).decode()})
+        stats['bytes'] += len(body)
+        speech_end = time.perf_counter()
+        try:
+            response = await client.post(f"http://127.0.0.1:{port}/process-call", content=body,
+                                         headers={"Content-Type": "application/json"})
+        except httpx.HTTPError:
+            stats['failed'] += 1
+            continue
+        if response.status_code != 200:
+            stats['failed'] += 1
+        else:
+            elapsed = time.perf_counter() - speech_end
+            stats['response'].append(elapsed)
+            stats['audio'].append(elapsed)
+        await asyncio.sleep(PAUSE_SECONDS)
+
+
+async def run(mode: str, port: int, sessions: int, utterances: int):
+    frames = speech_frames()
+    stats = {'response': [], 'audio': [], 'failed': 0, 'bytes': 0}
+    started = time.perf_counter()
+    if mode == 'ws':
+        await asyncio.gather(*(ws_caller(port, i, utterances, frames, stats) for i in range(sessions)))
+    else:
+        import httpx
+        limits = httpx.Limits(max_connections=sessions)
+        async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+            await asyncio.gather(*(http_caller(client, port, i, utterances, frames, stats)
+                                   for i in range(sessions)))
+    stats['wall'] = time.perf_counter() - started
+    return stats
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--utterances', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=16, help="CALL_WORKERS of the ai-module")
+    parser.add_argument('--mode', choices=['ws', 'http', 'both'], default='both')
+    args = parser.parse_args()
+
+    modes = ['http', 'ws'] if args.mode == 'both' else [args.mode]
+    print(f"{args.sessions} concurrent sessions x {args.utterances} utterances of {SPEECH_SECONDS:.0f} s "
+          f"({SAMPLE_RATE} Hz PCM), {args.workers} scheduler workers\n")
+    print(f"  {'transport':10s} {'turns':>6s} {'failed':>7s} {'resp p50':>9s} {'resp p95':>9s} "
+          f"{'audio p95':>10s} {'KB/utt':>7s} {'wall s':>7s}")
+
+    for mode in modes:
+        port = free_port()
+        server = start_server(port, args.workers)
+        try:
+            stats = asyncio.run(run(mode, port, args.sessions, args.utterances))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+        turns = len(stats['response'])
+        sent = args.sessions * args.utterances
+        print(f"  {mode:10s} {turns:6d} {stats['failed']:7d} {percentile(stats['response'], 0.5) * 1000:7.0f}ms "
+              f"{percentile(stats['response'], 0.95) * 1000:7.0f}ms {percentile(stats['audio'], 0.95) * 1000:8.0f}ms "
+              f"{stats['bytes'] / sent / 1024:7.1f} {stats['wall']:7.1f}")
+
+
+if __name__ == "__main__":
+    main()
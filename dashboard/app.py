@@ -6,7 +6,8 @@ Provides web interface for viewing calls, statistics, and management.
 import os
 import json
 from datetime import datetime, timedelta
-from flask import Flask, render_template, request, jsonify, send_file
+from functools import wraps
+from flask import Flask, Response, render_template, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 import logging
 
@@ -14,7 +15,9 @@ import logging
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from services.logger import CallLogger
+from services.logger import CallLogger, CALL_COLUMNS
+from services.call_events import CallFeedWatcher, call_event_bus
+from services.response_cache import ResponseCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -33,6 +36,79 @@ call_logger = CallLogger(db_path)
 # Configuration
 app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY', 'ai-call-intake-secret-key-2025')
 app.config['PER_PAGE'] = 20
+app.config['STREAM_KEEPALIVE'] = 15
+
+# Live feed: calls are written by AGI/API processes, one watcher polls for all clients
+feed_watcher = CallFeedWatcher(call_logger, call_event_bus,
+                               interval=float(os.getenv('STREAM_POLL_INTERVAL', 1.0)))
+feed_watcher.start()
+
+# Rendered read responses, invalidated by CallLogger.data_version
+response_cache = ResponseCache(
+    max_entries=int(os.getenv('RESPONSE_CACHE_SIZE', 512)),
+    ttl=float(os.getenv('RESPONSE_CACHE_TTL', 60))
+)
+
+
+def parse_fields_arg(default=None):
+    """Parse the optional ``fields`` query parameter into a column projection."""
+    fields = request.args.get('fields')
+    if not fields:
+        return default
+    
+    columns = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [column for column in columns if column not in CALL_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return columns
+
+
+def call_json_response(call):
+    """
+    Build JSON response for a single call, embedding the stored AI response verbatim.
+    
+    ``ai_response_json`` is written by CallLogger with json.dumps, so it is spliced
+    into the body as the ``ai_response`` object instead of being parsed and re-serialized.
+    """
+    ai_response_json = call.pop('ai_response_json', None) or '{}'
+    call_body = json.dumps(call, ensure_ascii=False, default=str)
+    separator = ', ' if call else ''
+    body = (
+        '{"success": true, "call": '
+        + call_body[:-1] + separator + '"ai_response": ' + ai_response_json + '}'
+        + '}'
+    )
+    return app.response_class(body, mimetype='application/json')
+
+
+def cached_response(view):
+    """
+    Serve successful responses from the versioned response cache.
+    
+    Conditional requests whose If-None-Match matches the cached ETag are
+    answered with 304 without running the view or touching SQLite.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = (request.path, tuple(sorted(request.args.items(multi=True))))
+        version = call_logger.data_version
+        
+        entry = response_cache.get(key, version)
+        if entry is None:
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            entry = response_cache.put(key, version, response.get_data(), response.content_type)
+        
+        if request.if_none_match.contains(entry.etag.strip('"')):
+            response = app.response_class(status=304)
+        else:
+            response = app.response_class(entry.body, content_type=entry.content_type)
+        response.headers['ETag'] = entry.etag
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    
+    return wrapper
 
 
 @app.route('/')
@@ -42,6 +118,7 @@ def index():
 
 
 @app.route('/api/calls')
+@cached_response
 def get_calls():
     """Get paginated list of calls."""
     try:
@@ -51,11 +128,16 @@ def get_calls():
         # Calculate offset
         offset = (page - 1) * per_page
         
-        # Get calls
-        calls = call_logger.get_recent_calls(limit=per_page, offset=offset)
+        # Get calls (only the columns the table renders, no AI response parsing)
+        columns = parse_fields_arg()
+        if columns:
+            calls = call_logger.get_recent_calls(limit=per_page, offset=offset,
+                                                 parse_json=False, columns=columns)
+        else:
+            calls = [summary.to_dict() for summary in call_logger.get_call_summaries(per_page, offset)]
         
         # Get total count for pagination
-        total_calls = call_logger.get_statistics(days=365).get('total_calls', 0)
+        total_calls = call_logger.get_total_calls()
         
         return jsonify({
             'success': True,
@@ -67,18 +149,21 @@ def get_calls():
                 'pages': (total_calls + per_page - 1) // per_page
             }
         })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error getting calls: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @app.route('/api/calls/<call_id>')
+@cached_response
 def get_call(call_id):
     """Get details of a specific call."""
     try:
-        call = call_logger.get_call(call_id)
+        call = call_logger.get_call(call_id, parse_json=False)
         if call:
-            return jsonify({'success': True, 'call': call})
+            return call_json_response(call)
         else:
             return jsonify({'success': False, 'error': 'Call not found'}), 404
     except Exception as e:
@@ -105,17 +190,23 @@ def search_calls():
             filters['date_from'] = request.args['date_from']
         if 'date_to' in request.args:
             filters['date_to'] = request.args['date_to']
+        if 'incident_id' in request.args:
+            filters['incident_id'] = request.args['incident_id']
         
         limit = int(request.args.get('limit', 100))
+        columns = parse_fields_arg()
         
-        calls = call_logger.search_calls(filters, limit)
+        calls = call_logger.search_calls(filters, limit, parse_json=columns is None, columns=columns)
         return jsonify({'success': True, 'calls': calls, 'count': len(calls)})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error searching calls: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @app.route('/api/statistics')
+@cached_response
 def get_statistics():
     """Get system statistics."""
     try:
@@ -130,13 +221,13 @@ def get_statistics():
         today_stats = call_logger.search_calls({
             'date_from': today.isoformat(),
             'date_to': (today + timedelta(days=1)).isoformat()
-        }, limit=1000)
+        }, limit=1000, parse_json=False, columns=['id'])
         
         # Yesterday's calls
         yesterday_stats = call_logger.search_calls({
             'date_from': yesterday.isoformat(),
             'date_to': today.isoformat()
-        }, limit=1000)
+        }, limit=1000, parse_json=False, columns=['id'])
         
         stats['today_calls'] = len(today_stats)
         stats['yesterday_calls'] = len(yesterday_stats)
@@ -150,7 +241,8 @@ def get_statistics():
             stats['change_percentage'] = 0
         
         # Get recent critical calls
-        critical_calls = call_logger.search_calls({'urgency': 'critical'}, limit=5)
+        critical_calls = call_logger.search_calls({'urgency': 'critical'}, limit=5,
+                                                  parse_json=False, columns=['id'])
         stats['recent_critical'] = len(critical_calls)
         
         return jsonify({'success': True, 'statistics': stats})
@@ -159,6 +251,42 @@ def get_statistics():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/api/stream')
+def stream_events():
+    """
+    Server-Sent Events feed of new calls and live statistics.
+    
+    Every client reads from the shared in-process event bus; connecting
+    clients cost no database queries.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    
+    def generate():
+        yield "retry: 3000\n\n"
+        
+        # A stale id (e.g. from before a restart) is treated like a fresh connection
+        if last_event_id and last_event_id.isdigit() and int(last_event_id) <= call_event_bus.last_seq:
+            last_seq = int(last_event_id)
+        else:
+            last_seq, stats = call_event_bus.snapshot_statistics()
+            yield f"id: {last_seq}\nevent: statistics\ndata: {json.dumps(stats, ensure_ascii=False)}\n\n"
+        
+        while True:
+            frames = call_event_bus.wait_for_events(last_seq, timeout=app.config['STREAM_KEEPALIVE'])
+            if not frames:
+                yield ": keepalive\n\n"
+                continue
+            
+            for last_seq, frame in frames:
+                yield frame
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @app.route('/api/export/csv')
 def export_csv():
     """Export calls to CSV."""
@@ -204,7 +332,7 @@ def health_check():
     """Health check endpoint."""
     try:
         # Check database connection
-        test_call = call_logger.get_recent_calls(limit=1)
+        test_call = call_logger.get_recent_calls(limit=1, parse_json=False, columns=['id'])
         
         return jsonify({
             'status': 'healthy',
@@ -264,4 +392,4 @@ if __name__ == '__main__':
     debug = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
     
     logger.info(f"Starting Flask dashboard on {host}:{port}")
-    app.run(host=host, port=port, debug=debug)
\ No newline at end of file
+    app.run(host=host, port=port, debug=debug, threaded=True)
\ No newline at end of file
@@ -5,8 +5,11 @@ FastAPI приложение для обработки звонков через
 
 import os
 import logging
-from fastapi import FastAPI, HTTPException
+from concurrent.futures import ThreadPoolExecutor
+import json
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from contextlib import asynccontextmanager
 
 from services.stt_service import STTService
@@ -14,6 +17,13 @@ from services.llm_service import LLMService
 from services.tts_service import TTSService
 from services.classifier import IncidentClassifier
 from services.logger import CallLogger
+from services.call_scheduler import PriorityCallScheduler, SchedulerOverloaded, prescore_call
+from services.duplicate_detector import DuplicateDetector
+from services.caller_profiles import CallerProfileCache
+from services.call_events import call_event_bus
+from services.circuit_breaker import breaker_states
+from services.prefork import preloaded_models, run_prefork
+from services.inference_pool import get_inference_pool, inference_pool_enabled, start_inference_pool
 
 # Настройка логирования
 logging.basicConfig(
@@ -32,6 +42,47 @@ llm_service = None
 tts_service = None
 classifier = None
 call_logger = None
+call_scheduler = None
+duplicate_detector = None
+caller_profiles = None
+
+# Синтез ответа по предварительной срочности, пока LLM дописывает анализ
+tts_prefetch = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tts-prefetch")
+# Пауза keepalive в ленте событий /api/stream
+STREAM_KEEPALIVE_SECONDS = 15
+
+def create_stt_service(**options) -> STTService:
+    return STTService(
+        engine=os.getenv("STT_ENGINE", "whisper"),
+        language=os.getenv("DEFAULT_LANGUAGE", "kk"),
+        **options
+    )
+
+def create_tts_service(**options) -> TTSService:
+    return TTSService(
+        engine=os.getenv("TTS_ENGINE", "coqui"),
+        language=os.getenv("DEFAULT_LANGUAGE", "kk"),
+        **options
+    )
+
+def preload_models():
+    """
+    Локальные модели (Whisper, Coqui) для pre-fork режима: загружаются один раз
+    в master-процессе и общие для всех воркеров (copy-on-write).
+    Облачные движки создаются в каждом воркере после fork.
+    С $INFERENCE_WORKERS master вместо этого запускает один общий пул инференса
+    (модели грузят только его процессы), а веб-воркеры подключаются к нему как клиенты.
+    """
+    if inference_pool_enabled():
+        start_inference_pool(clients=int(os.getenv("WEB_WORKERS", 1)))
+        return {}
+    
+    models = {}
+    if os.getenv("STT_ENGINE", "whisper").lower() == "whisper":
+        models["stt"] = create_stt_service(use_inference_pool=False)
+    if os.getenv("TTS_ENGINE", "coqui").lower() == "coqui":
+        models["tts"] = create_tts_service(use_inference_pool=False)
+    return models
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -41,29 +92,42 @@ async def lifespan(app: FastAPI):
     # Инициализация при запуске
     logger.info("Инициализация AI Call Intake System...")
     
-    global stt_service, llm_service, tts_service, classifier, call_logger
+    global stt_service, llm_service, tts_service, classifier, call_logger, call_scheduler, duplicate_detector, caller_profiles
     
     try:
-        # Инициализация сервисов
-        stt_service = STTService(
-            engine=os.getenv("STT_ENGINE", "whisper"),
-            language=os.getenv("DEFAULT_LANGUAGE", "kk")
-        )
+        # Инициализация сервисов (в pre-fork режиме модели уже загружены master-процессом;
+        # с пулом инференса они нужны только процессам пула, здесь — тонкие клиенты)
+        models = {} if inference_pool_enabled() else preloaded_models()
+        if inference_pool_enabled():
+            get_inference_pool()  # Подключение к пулу master-процесса (или запуск своего) сейчас, а не на первом звонке
+        stt_service = models.get("stt") or create_stt_service()
         
         llm_service = LLMService(
             engine=os.getenv("LLM_ENGINE", "openai"),
             api_key=os.getenv("OPENAI_API_KEY")
         )
         
-        tts_service = TTSService(
-            engine=os.getenv("TTS_ENGINE", "coqui"),
-            language=os.getenv("DEFAULT_LANGUAGE", "kk")
-        )
+        tts_service = models.get("tts") or create_tts_service()
         
         classifier = IncidentClassifier()
         
+        # История номеров в памяти: прогрев из БД, обновление при каждом log_call
+        caller_profiles = CallerProfileCache()
         call_logger = CallLogger(
-            db_path=os.getenv("DATABASE_URL", "calls.db")
+            db_path=os.getenv("DATABASE_URL", "calls.db"),
+            caller_profiles=caller_profiles
+        )
+        caller_profiles.warm(call_logger)
+        
+        # Группировка повторных звонков об одном инциденте (общая для всех процессов через БД)
+        try:
+            duplicate_detector = DuplicateDetector(call_logger.db_path)
+        except Exception as e:
+            logger.warning(f"Обнаружение дубликатов отключено: {e}")
+        
+        call_scheduler = PriorityCallScheduler(
+            max_concurrency=int(os.getenv("CALL_WORKERS", 4)),
+            max_queue=int(os.getenv("CALL_QUEUE_SIZE", 64))
         )
         
         logger.info("Сервисы успешно инициализированы")
@@ -76,7 +140,10 @@ async def lifespan(app: FastAPI):
     
     # Очистка при завершении
     logger.info("Очистка ресурсов AI Call Intake System...")
-    # Здесь можно добавить очистку ресурсов
+    if call_scheduler:
+        await call_scheduler.stop()
+    if inference_pool_enabled():
+        get_inference_pool().close()  # В pre-fork воркере только отключается от общего пула
 
 # Создание FastAPI приложения
 app = FastAPI(
@@ -122,11 +189,16 @@ async def health_check():
         "call_logger": call_logger is not None
     }
     
-    all_healthy = all(services_status.values())
+    # Открытый предохранитель: внешний движок недоступен, звонки идут на локальный fallback
+    breakers = breaker_states()
+    all_healthy = all(services_status.values()) and all(b["state"] == "closed" for b in breakers.values())
     
     return {
         "status": "healthy" if all_healthy else "degraded",
+        "circuit_breakers": breakers,
         "services": services_status,
+        "scheduler": call_scheduler.get_stats() if call_scheduler else None,
+        "llm": llm_service.get_engine_info() if llm_service else None,
         "timestamp": "2025-12-30T10:00:00Z"  # В production использовать datetime.now()
     }
 
@@ -140,12 +212,43 @@ async def process_call(call_data: dict):
     - language: язык (kk/ru)
     - audio_data: аудио данные в base64 (опционально)
     - transcript: текстовый транскрипт (опционально)
+    
+    При перегрузке звонки обслуживаются по приоритету: предварительная оценка
+    (ключевые слова + история номера) ставит критические звонки вперед,
+    а низкоприоритетные отклоняются с 503 и Retry-After.
     """
+    if not call_scheduler:
+        return _process_call_sync(call_data)
+    
+    # Дешевая предварительная оценка приоритета до STT/LLM
+    caller_number = call_data.get("caller_number")
+    caller_history = caller_profiles.get(caller_number) if caller_profiles else None
+    priority = prescore_call(call_data.get("transcript", ""), classifier, caller_history)
+    
+    try:
+        return await call_scheduler.submit(priority, _process_call_sync, call_data)
+    except SchedulerOverloaded as e:
+        logger.warning(f"Звонок от {caller_number} отклонен ({priority.name}): система перегружена")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Ошибка обработки звонка: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _process_call_sync(call_data: dict) -> dict:
+    """Блокирующая обработка звонка (STT -> LLM -> TTS -> лог), выполняется воркером планировщика"""
     try:
         caller_number = call_data.get("caller_number")
         language = call_data.get("language", "kk")
+        # Идентификатор известен до лога: им помечаются предварительные события звонка
+        call_id = call_data.get("call_id") or (call_logger.generate_call_id(caller_number) if call_logger else "no_logger")
         
-        logger.info(f"Обработка звонка от {caller_number} на языке {language}")
+        logger.info(f"Обработка звонка {call_id} от {caller_number} на языке {language}")
         
         # Если есть аудио данные, преобразуем в текст
         audio_data = call_data.get("audio_data")
@@ -157,9 +260,35 @@ async def process_call(call_data: dict):
             transcript = call_data.get("transcript", "")
             confidence = 1.0
         
+        # Звонок об уже открытом инциденте: используем его анализ без повторного вызова LLM
+        incident = None
+        if duplicate_detector and transcript:
+            address = classifier.extractor.extract(transcript).address if classifier else None
+            category = classifier.detect_category(transcript) if classifier else None
+            incident = duplicate_detector.match(transcript, address, category)
+        
+        # Известный номер ложных вызовов: без критических признаков обходимся правилами, без LLM
+        suspected_hoax = bool(
+            caller_profiles and classifier and transcript
+            and caller_profiles.is_suspected_hoax(caller_number)
+            and classifier.prescore(transcript) != "critical"
+        )
+        
         # Анализ транскрипта с помощью LLM
-        if llm_service and transcript:
-            analysis = llm_service.analyze_incident(transcript, language)
+        early_response = {}
+        if incident:
+            analysis = dict(incident.analysis)
+            incident_id = incident.incident_id
+            logger.info(f"Звонок относится к открытому инциденту {incident_id}, анализ LLM пропущен")
+        elif suspected_hoax:
+            analysis = classifier.classify({"summary": transcript, "transcript": transcript})
+            analysis["suspected_false_call"] = True
+            logger.info(f"Номер {caller_number} с историей ложных вызовов, анализ LLM пропущен")
+        elif llm_service and transcript:
+            analysis = llm_service.analyze_incident(
+                transcript, language,
+                on_provisional=lambda fields: _on_provisional_analysis(fields, call_id, caller_number, language, early_response)
+            )
         else:
             # Fallback анализ
             analysis = classifier.classify(transcript) if classifier else {
@@ -168,32 +297,41 @@ async def process_call(call_data: dict):
                 "summary": transcript[:100] if transcript else "Нет транскрипта"
             }
         
+        if not incident:
+            incident_id = duplicate_detector.register(transcript, analysis) if duplicate_detector and transcript else None
+        
         # Генерация ответа TTS
         if tts_service:
             response_text = generate_response(analysis, language)
-            tts_audio = tts_service.synthesize(response_text, language)
+            if early_response.get("text") == response_text:
+                # Окончательная срочность совпала с предварительной: аудио уже синтезируется
+                tts_audio = early_response["audio"].result()
+            else:
+                tts_audio = tts_service.text_to_speech(response_text, language)
         else:
             response_text = "Деректеріңізді қабылдадық. Көмек жолдалады."
             tts_audio = None
         
         # Логирование звонка
         if call_logger:
-            call_id = call_logger.log_call(
-                caller_number=caller_number,
-                language=language,
-                transcript=transcript,
-                ai_analysis=analysis,
-                duration=0,  # В реальной системе рассчитывается
-                status="processed"
-            )
-        else:
-            call_id = "no_logger"
+            call_logger.log_call({
+                "call_id": call_id,
+                "caller_id": caller_number,
+                "language": language,
+                "transcript": transcript,
+                "ai_response": analysis,
+                "duration": 0,  # В реальной системе рассчитывается
+                "status": "processed",
+                "incident_id": incident_id
+            })
         
         return {
             "call_id": call_id,
             "transcript": transcript,
             "confidence": confidence,
             "analysis": analysis,
+            "incident_id": incident_id,
+            "duplicate": incident is not None,
             "response_text": response_text,
             "tts_audio": tts_audio if tts_audio else None,
             "status": "processed"
@@ -208,7 +346,7 @@ async def get_calls(limit: int = 10, offset: int = 0):
     """Получение списка звонков"""
     try:
         if call_logger:
-            calls = call_logger.get_recent_calls(limit=limit, offset=offset)
+            calls = [summary.to_dict() for summary in call_logger.get_call_summaries(limit, offset)]
             total = call_logger.get_total_calls()
         else:
             calls = []
@@ -241,6 +379,65 @@ async def get_call_details(call_id: str):
         logger.error(f"Ошибка получения деталей звонка: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/calls/{call_id}/false-call")
+async def mark_false_call(call_id: str):
+    """Отметка оператора: звонок оказался ложным (учитывается при следующих звонках с номера)"""
+    if not call_logger:
+        raise HTTPException(status_code=503, detail="Сервис логирования недоступен")
+    try:
+        if not call_logger.mark_false_call(call_id):
+            if not call_logger.get_call(call_id, columns=["call_id"]):
+                raise HTTPException(status_code=404, detail="Звонок не найден")
+            return {"call_id": call_id, "status": "false_call", "changed": False}
+        return {"call_id": call_id, "status": "false_call", "changed": True}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Ошибка отметки ложного вызова: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _on_provisional_analysis(fields: dict, call_id: str, caller_number: str, language: str, early_response: dict):
+    """Предварительные срочность и категория из потока LLM, до окончания анализа"""
+    logger.info(f"Предварительная оценка звонка {call_id} от {caller_number}: {fields['urgency']}/{fields['category']}")
+    
+    # Диспетчерская лента (/api/stream) видит срочность, пока генерируются резюме и уточняющие вопросы
+    call_event_bus.publish("provisional", {"call_id": call_id, "caller_id": caller_number, **fields})
+    
+    if tts_service:
+        text = generate_response(fields, language)
+        audio = tts_prefetch.submit(tts_service.text_to_speech, text, language)
+        # Текст и аудио вместе: текст без аудио означал бы KeyError при совпадении с итоговым ответом
+        early_response.update(text=text, audio=audio)
+
+@app.get("/api/stream")
+async def stream_events(request: Request):
+    """
+    Лента событий (SSE) этого процесса: предварительные оценки звонков,
+    новые звонки и счетчики. Формат тот же, что у /api/stream дашборда.
+    Клиенты ждут событий в цикле событий, не занимая потоки пула.
+    """
+    last_event_id = request.headers.get("Last-Event-ID") or request.query_params.get("last_event_id")
+    
+    async def generate():
+        yield "retry: 3000\n\n"
+        
+        if last_event_id and last_event_id.isdigit() and int(last_event_id) <= call_event_bus.last_seq:
+            last_seq = int(last_event_id)
+        else:
+            last_seq, stats = call_event_bus.snapshot_statistics()
+            yield f"id: {last_seq}\nevent: statistics\ndata: {json.dumps(stats, ensure_ascii=False)}\n\n"
+        
+        while not await request.is_disconnected():
+            frames = await call_event_bus.wait_for_events_async(last_seq, timeout=STREAM_KEEPALIVE_SECONDS)
+            if not frames:
+                yield ": keepalive\n\n"
+                continue
+            for last_seq, frame in frames:
+                yield frame
+    
+    return StreamingResponse(generate(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 def generate_response(analysis: dict, language: str) -> str:
     """Генерация текстового ответа на основе анализа"""
     
@@ -297,11 +494,17 @@ async def agi_process(agi_data: dict):
         }
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
\ No newline at end of file
+    # WEB_WORKERS > 1: pre-fork воркеры с общими моделями вместо отдельной копии в каждом
+    web_workers = int(os.getenv("WEB_WORKERS", 1))
+    if web_workers > 1:
+        run_prefork("main:app", workers=web_workers, preload=preload_models,
+                    host="0.0.0.0", port=8000, log_level="info")
+    else:
+        import uvicorn
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=True,
+            log_level="info"
+        )
\ No newline at end of file
@@ -0,0 +1,249 @@
+"""
+Analytics Export Service for AI Call Intake System.
+Writes call history to partitioned Parquet datasets for offline analytics.
+"""
+
+import os
+import json
+import shutil
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from services.logger import CallLogger
+
+logger = logging.getLogger(__name__)
+
+
+# Columns that hold a handful of distinct values and are stored dictionary-encoded
+DICTIONARY_COLUMNS = ['category', 'urgency', 'status']
+
+# AI response fields that are not already materialized as columns of `calls`
+AI_RESPONSE_FIELDS = ['needs_clarification', 'clarification_questions', 'validation_notes']
+
+
+class ParquetExporter:
+    """Batch exporter of the calls table into a Hive-partitioned Parquet dataset."""
+    
+    WATERMARK_FILE = '_watermark.json'
+    
+    def __init__(self, call_logger: CallLogger, output_dir: str, batch_size: int = 50000):
+        """
+        Initialize Parquet exporter.
+        
+        Args:
+            call_logger: Call logger providing access to the calls database
+            output_dir: Root directory of the Parquet dataset
+            batch_size: Number of rows read and written per batch
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            logger.error("pyarrow not installed. Install with: pip install pyarrow")
+            raise
+        
+        self.pa = pa
+        self.pq = pq
+        self.call_logger = call_logger
+        self.output_dir = Path(output_dir)
+        self.batch_size = batch_size
+        self.schema = self._build_schema()
+        
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Initializing ParquetExporter with output directory: {self.output_dir}")
+    
+    def _build_schema(self):
+        """Build Arrow schema for exported calls."""
+        pa = self.pa
+        dictionary_string = pa.dictionary(pa.int32(), pa.string())
+        
+        return pa.schema([
+            ('id', pa.int64()),
+            ('call_id', pa.string()),
+            ('timestamp', pa.timestamp('us')),
+            ('caller_id', pa.string()),
+            ('language', dictionary_string),
+            ('duration', pa.float64()),
+            ('transcript', pa.string()),
+            ('urgency', dictionary_string),
+            ('category', dictionary_string),
+            ('address', pa.string()),
+            ('current_danger', pa.bool_()),
+            ('people_involved', pa.int32()),
+            ('weapons', pa.bool_()),
+            ('recommended_department', dictionary_string),
+            ('summary', pa.string()),
+            ('confidence_score', pa.float64()),
+            ('validated', pa.bool_()),
+            ('status', dictionary_string),
+            ('error_message', pa.string()),
+            ('street_id', pa.int64()),
+            ('latitude', pa.float64()),
+            ('longitude', pa.float64()),
+            ('ai_needs_clarification', pa.bool_()),
+            ('ai_clarification_questions', pa.list_(pa.string())),
+            ('ai_validation_notes', pa.list_(pa.string())),
+            ('year', pa.int16()),
+            ('month', pa.int8()),
+        ])
+    
+    def read_watermark(self) -> int:
+        """Return the highest exported calls.id, or 0 if nothing was exported yet."""
+        watermark_path = self.output_dir / self.WATERMARK_FILE
+        if not watermark_path.exists():
+            return 0
+        
+        try:
+            with open(watermark_path, 'r', encoding='utf-8') as f:
+                return int(json.load(f).get('last_id', 0))
+        except (ValueError, OSError) as e:
+            logger.warning(f"Unreadable watermark {watermark_path}, starting from scratch: {e}")
+            return 0
+    
+    def _write_watermark(self, last_id: int, rows_exported: int):
+        """Persist watermark atomically so an interrupted run resumes after the last full batch."""
+        watermark_path = self.output_dir / self.WATERMARK_FILE
+        tmp_path = watermark_path.with_suffix('.tmp')
+        
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'last_id': last_id,
+                'rows_exported': rows_exported,
+                'updated_at': datetime.now().isoformat()
+            }, f)
+        os.replace(tmp_path, watermark_path)
+    
+    def export(self, incremental: bool = True) -> Dict[str, Any]:
+        """
+        Export calls to the Parquet dataset.
+        
+        Args:
+            incremental: Export only rows newer than the stored watermark.
+                A full export replaces the existing dataset.
+        
+        Returns:
+            Dictionary with export statistics
+        """
+        dataset_dir = self.output_dir / 'calls'
+        
+        if incremental:
+            since_id = self.read_watermark()
+        else:
+            since_id = 0
+            if dataset_dir.exists():
+                logger.info(f"Full export: removing existing dataset {dataset_dir}")
+                shutil.rmtree(dataset_dir)
+        
+        logger.info(f"Exporting calls with id > {since_id} to {dataset_dir}")
+        
+        rows_exported = 0
+        batches = 0
+        last_id = since_id
+        
+        for rows in self.call_logger.iter_calls(since_id=since_id, batch_size=self.batch_size):
+            table = self._rows_to_table(rows)
+            first_id, last_id = rows[0]['id'], rows[-1]['id']
+            
+            self.pq.write_to_dataset(
+                table,
+                root_path=str(dataset_dir),
+                partition_cols=['year', 'month'],
+                basename_template=f'part-{first_id:012d}-{last_id:012d}-{{i}}.parquet',
+                use_dictionary=DICTIONARY_COLUMNS + ['language', 'recommended_department'],
+                compression='zstd'
+            )
+            
+            rows_exported += len(rows)
+            batches += 1
+            self._write_watermark(last_id, rows_exported)
+            logger.info(f"Exported batch {batches}: ids {first_id}-{last_id} ({len(rows)} rows)")
+        
+        if rows_exported == 0:
+            logger.info("No new calls to export")
+        
+        return {
+            'rows_exported': rows_exported,
+            'batches': batches,
+            'since_id': since_id,
+            'last_id': last_id,
+            'dataset_path': str(dataset_dir)
+        }
+    
+    def _rows_to_table(self, rows: List[Dict[str, Any]]):
+        """Convert a batch of call rows into an Arrow table with flattened AI fields."""
+        columns = {name: [] for name in self.schema.names}
+        
+        for row in rows:
+            ai_response = self._parse_ai_response(row.get('ai_response_json'))
+            timestamp = self._parse_timestamp(row.get('timestamp'))
+            
+            for name in ('id', 'call_id', 'caller_id', 'language', 'duration', 'transcript',
+                         'urgency', 'category', 'address', 'people_involved',
+                         'recommended_department', 'summary', 'confidence_score',
+                         'status', 'error_message', 'street_id', 'latitude', 'longitude'):
+                columns[name].append(row.get(name))
+            
+            for name in ('current_danger', 'weapons', 'validated'):
+                value = row.get(name)
+                columns[name].append(None if value is None else bool(value))
+            
+            columns['timestamp'].append(timestamp)
+            columns['year'].append(timestamp.year if timestamp else None)
+            columns['month'].append(timestamp.month if timestamp else None)
+            
+            for field in AI_RESPONSE_FIELDS:
+                value = ai_response.get(field)
+                if field == 'needs_clarification':
+                    value = None if value is None else bool(value)
+                elif value is not None and not isinstance(value, list):
+                    value = [str(value)]
+                columns[f'ai_{field}'].append(value)
+        
+        return self.pa.Table.from_pydict(columns, schema=self.schema)
+    
+    @staticmethod
+    def _parse_ai_response(ai_response_json: Optional[str]) -> Dict[str, Any]:
+        """Parse stored AI response JSON, tolerating empty or corrupt values."""
+        if not ai_response_json:
+            return {}
+        try:
+            parsed = json.loads(ai_response_json)
+            return parsed if isinstance(parsed, dict) else {}
+        except json.JSONDecodeError:
+            return {}
+    
+    @staticmethod
+    def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+        """Parse ISO timestamp stored by CallLogger."""
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+
+
+# Factory function for easy instantiation
+def create_parquet_exporter(db_path: str = None, output_dir: str = None, batch_size: int = 50000):
+    """Create and return Parquet exporter instance."""
+    output_dir = output_dir or os.getenv('ANALYTICS_EXPORT_DIR', '/var/lib/ai-call-intake/analytics')
+    return ParquetExporter(CallLogger(db_path), output_dir, batch_size)
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    logging.basicConfig(level=logging.INFO)
+    
+    parser = argparse.ArgumentParser(description="Export call history to a partitioned Parquet dataset")
+    parser.add_argument('--db', default=None, help="Path to calls SQLite database (default: $CALL_LOG_DB)")
+    parser.add_argument('--output', default=None, help="Dataset directory (default: $ANALYTICS_EXPORT_DIR)")
+    parser.add_argument('--batch-size', type=int, default=50000, help="Rows per batch")
+    parser.add_argument('--full', action='store_true', help="Re-export everything instead of only new rows")
+    args = parser.parse_args()
+    
+    exporter = create_parquet_exporter(args.db, args.output, args.batch_size)
+    stats = exporter.export(incremental=not args.full)
+    print(json.dumps(stats, indent=2, ensure_ascii=False))
@@ -0,0 +1,300 @@
+"""
+Call Event Bus for AI Call Intake System.
+In-process publish/subscribe of new calls and live counters for dashboard streaming.
+"""
+
+import json
+import asyncio
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LiveStatistics:
+    """Incrementally maintained call counters shown on the dashboard cards."""
+    
+    def __init__(self):
+        """Initialize empty counters."""
+        self.total_calls = 0
+        self.today_calls = 0
+        self.by_urgency: Dict[str, int] = {}
+        self.by_category: Dict[str, int] = {}
+        self.danger_calls = 0
+        self.weapon_calls = 0
+        self.day = datetime.now().date()
+    
+    def seed(self, stats: Dict[str, Any], today_calls: int = 0):
+        """Reset counters from a full statistics snapshot (CallLogger.get_statistics)."""
+        self.total_calls = stats.get('total_calls', 0)
+        self.today_calls = today_calls
+        self.by_urgency = dict(stats.get('by_urgency', {}))
+        self.by_category = dict(stats.get('by_category', {}))
+        self.danger_calls = stats.get('danger_calls', 0)
+        self.weapon_calls = stats.get('weapon_calls', 0)
+        self.day = datetime.now().date()
+    
+    def apply(self, call: Dict[str, Any]):
+        """Account for one newly logged call."""
+        today = datetime.now().date()
+        if today != self.day:
+            self.day = today
+            self.today_calls = 0
+        
+        self.total_calls += 1
+        if str(call.get('timestamp', ''))[:10] == today.isoformat():
+            self.today_calls += 1
+        
+        urgency = call.get('urgency') or 'medium'
+        category = call.get('category') or 'other'
+        self.by_urgency[urgency] = self.by_urgency.get(urgency, 0) + 1
+        self.by_category[category] = self.by_category.get(category, 0) + 1
+        
+        if call.get('current_danger'):
+            self.danger_calls += 1
+        if call.get('weapons'):
+            self.weapon_calls += 1
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Return counters as a JSON-serializable dictionary."""
+        return {
+            'total_calls': self.total_calls,
+            'today_calls': self.today_calls,
+            'by_urgency': dict(self.by_urgency),
+            'by_category': dict(self.by_category),
+            'danger_calls': self.danger_calls,
+            'weapon_calls': self.weapon_calls
+        }
+
+
+class CallEventBus:
+    """
+    Broadcast hub for call events.
+    
+    Events are kept in a bounded ring with increasing sequence numbers and are
+    serialized once, at publish time. Subscribers block on a shared condition
+    (or, in async servers, await a future resolved on their event loop) and
+    read everything after the last sequence they saw, so the cost of a
+    publish does not depend on the number of connected clients and clients
+    never query the database.
+    """
+    
+    def __init__(self, history_size: int = 500):
+        """
+        Initialize event bus.
+        
+        Args:
+            history_size: Number of recent events kept for reconnecting clients
+        """
+        self._condition = threading.Condition()
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._events = deque(maxlen=history_size)
+        self._seq = 0
+        self._published_rows = deque(maxlen=history_size)
+        self.statistics = LiveStatistics()
+    
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the most recent event."""
+        return self._seq
+    
+    def publish(self, event_type: str, data: Dict[str, Any]) -> int:
+        """
+        Publish event to all subscribers.
+        
+        Args:
+            event_type: Event name (call, statistics, ...)
+            data: JSON-serializable payload
+        
+        Returns:
+            Sequence number of the event
+        """
+        payload = json.dumps(data, ensure_ascii=False, default=str)
+        with self._condition:
+            self._publish_locked(event_type, payload)
+            self._notify_locked()
+            return self._seq
+    
+    def _publish_locked(self, event_type: str, payload: str):
+        """Append pre-serialized event; caller holds the condition lock."""
+        self._seq += 1
+        frame = f"id: {self._seq}\nevent: {event_type}\ndata: {payload}\n\n"
+        self._events.append((self._seq, frame))
+    
+    def _notify_locked(self):
+        """Wake blocked and async subscribers; caller holds the condition lock."""
+        self._condition.notify_all()
+        for loop, waiter in self._async_waiters:
+            loop.call_soon_threadsafe(_resolve, waiter)
+        self._async_waiters.clear()
+    
+    def publish_call(self, row_id: Optional[int], call: Dict[str, Any]):
+        """
+        Publish a newly logged call followed by the updated counters.
+        
+        Rows already published (same ``calls.id``) are ignored, so the in-process
+        publisher and a CallFeedWatcher can feed the same bus.
+        
+        Args:
+            row_id: ``calls.id`` of the logged row
+            call: Call fields (CallSummary fields plus current_danger and weapons)
+        """
+        with self._condition:
+            if row_id is not None:
+                if row_id in self._published_rows:
+                    return
+                self._published_rows.append(row_id)
+            
+            self.statistics.apply(call)
+            self._publish_locked('call', json.dumps(call, ensure_ascii=False, default=str))
+            self._publish_locked('statistics', json.dumps(self.statistics.snapshot(), ensure_ascii=False))
+            self._notify_locked()
+    
+    def seed_statistics(self, stats: Dict[str, Any], today_calls: int = 0):
+        """Reset live counters from a database snapshot and publish them."""
+        with self._condition:
+            self.statistics.seed(stats, today_calls)
+            self._publish_locked('statistics', json.dumps(self.statistics.snapshot(), ensure_ascii=False))
+            self._notify_locked()
+    
+    def snapshot_statistics(self) -> Tuple[int, Dict[str, Any]]:
+        """Return current sequence number and live counters, consistent with each other."""
+        with self._condition:
+            return self._seq, self.statistics.snapshot()
+    
+    def wait_for_events(self, last_seq: int, timeout: float = 15.0) -> List[Tuple[int, str]]:
+        """
+        Block until events newer than ``last_seq`` exist or the timeout expires.
+        
+        Args:
+            last_seq: Sequence number of the last event the subscriber received
+            timeout: Maximum time to wait in seconds
+        
+        Returns:
+            (sequence number, serialized SSE frame) pairs, oldest first. If the
+            subscriber fell behind the retained history a single ``resync``
+            frame is returned instead.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._seq > last_seq, timeout=timeout)
+            
+            if self._seq <= last_seq:
+                return []
+            
+            oldest_seq = self._events[0][0] if self._events else self._seq + 1
+            if last_seq + 1 < oldest_seq:
+                return [(self._seq, f"id: {self._seq}\nevent: resync\ndata: {{}}\n\n")]
+            
+            return [(seq, frame) for seq, frame in self._events if seq > last_seq]
+    
+    async def wait_for_events_async(self, last_seq: int, timeout: float = 15.0) -> List[Tuple[int, str]]:
+        """
+        Like ``wait_for_events``, but waits on the running event loop instead of a thread.
+        
+        Async servers use this so that every connected client does not hold
+        a threadpool thread while it waits.
+        """
+        loop = asyncio.get_running_loop()
+        with self._condition:
+            if self._seq > last_seq:
+                waiter = None
+            else:
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+        
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(waiter, timeout)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                with self._condition:
+                    if (loop, waiter) in self._async_waiters:
+                        self._async_waiters.remove((loop, waiter))
+        
+        return self.wait_for_events(last_seq, timeout=0)
+
+
+def _resolve(waiter: asyncio.Future):
+    """Wake an async subscriber (runs on its event loop)."""
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class CallFeedWatcher:
+    """
+    Background poller that feeds calls logged by other processes into the bus.
+    
+    AGI handlers and the API write to the shared SQLite file from separate
+    processes, so the dashboard process cannot rely on in-process publishing
+    alone. One lightweight query per interval serves every connected client.
+    """
+    
+    def __init__(self, call_logger, event_bus: CallEventBus, interval: float = 1.0,
+                 reseed_interval: float = 300.0):
+        """
+        Initialize watcher.
+        
+        Args:
+            call_logger: CallLogger to read new calls from
+            event_bus: Bus to publish to
+            interval: Polling interval in seconds
+            reseed_interval: How often counters are recomputed from the database
+        """
+        self.call_logger = call_logger
+        self.event_bus = event_bus
+        self.interval = interval
+        self.reseed_interval = reseed_interval
+        self.last_id = 0
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        """Start polling thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        
+        self.last_id = self.call_logger.get_max_call_id()
+        self._reseed()
+        
+        self._thread = threading.Thread(target=self._run, name='call-feed-watcher', daemon=True)
+        self._thread.start()
+        logger.info(f"CallFeedWatcher started (interval {self.interval}s, last id {self.last_id})")
+    
+    def stop(self):
+        """Stop polling thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval * 2)
+    
+    def _reseed(self):
+        """Recompute counters from the database."""
+        stats = self.call_logger.get_statistics(days=7)
+        today = datetime.now().date().isoformat()
+        today_calls = self.call_logger.count_calls_since(today)
+        self.event_bus.seed_statistics(stats, today_calls)
+    
+    def _run(self):
+        """Polling loop."""
+        elapsed_since_seed = 0.0
+        while not self._stop.wait(self.interval):
+            try:
+                new_calls = self.call_logger.get_new_calls(self.last_id)
+                for call in new_calls:
+                    row_id = call.pop('id')
+                    self.last_id = max(self.last_id, row_id)
+                    self.event_bus.publish_call(row_id, call)
+                
+                elapsed_since_seed += self.interval
+                if elapsed_since_seed >= self.reseed_interval:
+                    elapsed_since_seed = 0.0
+                    self._reseed()
+            except Exception as e:
+                logger.error(f"CallFeedWatcher poll failed: {e}")
+
+
+# Process-wide bus that CallLogger publishes to by default
+call_event_bus = CallEventBus()
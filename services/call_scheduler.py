@@ -0,0 +1,205 @@
+"""
+Call Scheduler for AI Call Intake System.
+Priority-aware admission control and dispatch of call processing work.
+"""
+
+import heapq
+import asyncio
+import logging
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CallPriority(IntEnum):
+    """Scheduling priority; lower value is served first."""
+    CRITICAL = 0
+    HIGH = 1
+    MEDIUM = 2
+    LOW = 3
+    
+    @classmethod
+    def from_urgency(cls, urgency: str) -> 'CallPriority':
+        """Map urgency label (critical/high/medium/low) to priority."""
+        return cls.__members__.get(str(urgency).upper(), cls.MEDIUM)
+
+
+class SchedulerOverloaded(Exception):
+    """Raised when a call is shed because the scheduler is saturated."""
+    
+    def __init__(self, priority: CallPriority, retry_after: int = 5):
+        super().__init__(f"Scheduler overloaded, {priority.name.lower()} priority call shed")
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+def prescore_call(text: str, classifier, caller_history: Optional[Dict[str, Any]] = None) -> CallPriority:
+    """
+    Cheap priority estimate made before any expensive processing.
+    
+    Args:
+        text: Transcript or partial transcript (may be empty)
+        classifier: IncidentClassifier used for the keyword scan
+        caller_history: Optional caller profile with ``recent_calls`` and ``false_calls``
+    
+    Returns:
+        Estimated priority
+    """
+    priority = CallPriority.from_urgency(classifier.prescore(text)) if text else CallPriority.MEDIUM
+    
+    if caller_history:
+        if caller_history.get('false_calls', 0) > 0 and priority > CallPriority.CRITICAL:
+            # Known hoax numbers never outrank genuine reports unless the text is critical
+            priority = CallPriority.LOW
+        elif caller_history.get('recent_calls', 0) > 1 and priority > CallPriority.HIGH:
+            # Repeated calls within the window usually mean the situation is escalating
+            priority = CallPriority(priority - 1)
+    
+    return priority
+
+
+class PriorityCallScheduler:
+    """
+    Bounded priority queue in front of a fixed pool of workers.
+    
+    Blocking work is executed in a thread pool of ``max_concurrency`` threads
+    so that async handlers stay responsive (the loop's default executor can
+    be smaller than the number of workers on machines with few CPUs);
+    coroutine functions are awaited on the loop and hold their worker slot
+    until they finish. When the queue is full a new call either
+    evicts the lowest-priority queued call (if it is more urgent) or is shed
+    itself; critical calls are never shed in favour of less urgent ones.
+    """
+    
+    def __init__(self, max_concurrency: int = 4, max_queue: int = 64):
+        """
+        Initialize scheduler.
+        
+        Args:
+            max_concurrency: Number of calls processed at the same time
+            max_queue: Maximum number of calls waiting for a worker
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._queue = []
+        self._counter = itertools.count()
+        self._condition = None
+        self._workers = []
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='call-worker')
+        self.running = 0
+        self.processed = {priority: 0 for priority in CallPriority}
+        self.shed = {priority: 0 for priority in CallPriority}
+        
+        logger.info(f"PriorityCallScheduler initialized: {max_concurrency} workers, queue {max_queue}")
+    
+    def _ensure_workers(self):
+        """Start worker tasks on the running loop on first use."""
+        if self._workers:
+            return
+        
+        self._condition = asyncio.Condition()
+        self._workers = [
+            asyncio.get_running_loop().create_task(self._worker(i))
+            for i in range(self.max_concurrency)
+        ]
+    
+    async def submit(self, priority: CallPriority, func: Callable, *args) -> Any:
+        """
+        Queue work and wait for its result.
+        
+        Args:
+            priority: Call priority
+            func: Blocking callable or coroutine function processing the call
+            *args: Arguments for ``func``
+        
+        Returns:
+            Result of ``func``
+        
+        Raises:
+            SchedulerOverloaded: The call was shed (on admission or evicted while queued)
+        """
+        self._ensure_workers()
+        future = asyncio.get_running_loop().create_future()
+        
+        async with self._condition:
+            if len(self._queue) >= self.max_queue:
+                # Calls whose client went away (future cancelled) do not hold queue places
+                live = [item for item in self._queue if not item[2].done()]
+                if len(live) < len(self._queue):
+                    self._queue = live
+                    heapq.heapify(self._queue)
+            
+            if len(self._queue) >= self.max_queue:
+                lowest = max(self._queue)
+                if lowest[0] <= priority:
+                    self.shed[priority] += 1
+                    logger.warning(f"Shedding {priority.name} call: queue full ({len(self._queue)})")
+                    raise SchedulerOverloaded(priority)
+                
+                # Evict the least urgent, most recently queued call
+                self._queue.remove(lowest)
+                heapq.heapify(self._queue)
+                evicted_priority = CallPriority(lowest[0])
+                self.shed[evicted_priority] += 1
+                if not lowest[2].done():
+                    lowest[2].set_exception(SchedulerOverloaded(evicted_priority))
+                logger.warning(f"Evicted queued {evicted_priority.name} call for {priority.name} call")
+            
+            heapq.heappush(self._queue, (int(priority), next(self._counter), future, func, args))
+            self._condition.notify()
+        
+        return await future
+    
+    async def _worker(self, index: int):
+        """Take the most urgent call from the queue and run it."""
+        loop = asyncio.get_running_loop()
+        while True:
+            async with self._condition:
+                await self._condition.wait_for(lambda: self._queue)
+                priority, _, future, func, args = heapq.heappop(self._queue)
+            
+            if future.done():
+                continue
+            
+            self.running += 1
+            try:
+                if asyncio.iscoroutinefunction(func):
+                    result = await func(*args)
+                else:
+                    result = await loop.run_in_executor(self._executor, func, *args)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.running -= 1
+                self.processed[CallPriority(priority)] += 1
+    
+    async def stop(self):
+        """Cancel workers and fail queued calls."""
+        for task in self._workers:
+            task.cancel()
+        for _, _, future, _, _ in self._queue:
+            if not future.done():
+                future.set_exception(SchedulerOverloaded(CallPriority.LOW))
+        self._queue.clear()
+        self._workers = []
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduler statistics."""
+        queued = {priority.name.lower(): 0 for priority in CallPriority}
+        for item in self._queue:
+            queued[CallPriority(item[0]).name.lower()] += 1
+        
+        return {
+            'running': self.running,
+            'queued': queued,
+            'processed': {p.name.lower(): n for p, n in self.processed.items()},
+            'shed': {p.name.lower(): n for p, n in self.shed.items()},
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue
+        }
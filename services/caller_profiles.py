@@ -0,0 +1,208 @@
+"""
+Caller Profile Cache for AI Call Intake System.
+In-memory per-number call history used for pre-scoring and false-call screening.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CallerProfile:
+    """Recent activity of one caller number."""
+    
+    __slots__ = ('recent', 'false_calls', 'last_category', 'last_call')
+    
+    def __init__(self):
+        self.recent = deque()
+        self.false_calls = 0
+        self.last_category: Optional[str] = None
+        self.last_call: Optional[float] = None
+    
+    def prune(self, cutoff: float):
+        """Forget calls made before ``cutoff`` (epoch seconds)."""
+        recent = self.recent
+        while recent and recent[0] < cutoff:
+            recent.popleft()
+
+
+class CallerProfileCache:
+    """
+    Thread-safe caller history keyed by phone number.
+    
+    Warmed once from the calls database and updated by CallLogger on every
+    logged call, so looking up a caller at call time costs a dictionary
+    access instead of an aggregate query. Only numbers seen within the
+    window or with false calls on record are kept; the least recently seen
+    numbers are evicted beyond ``max_callers``.
+    """
+    
+    def __init__(self, window_hours: float = 24, hoax_threshold: int = None,
+                 max_callers: int = 100000):
+        """
+        Initialize cache.
+        
+        Args:
+            window_hours: Look-back window for ``recent_calls``
+            hoax_threshold: False calls after which a number is treated as a hoax caller
+                ($HOAX_CALLER_THRESHOLD, 2 by default)
+            max_callers: Maximum number of profiles kept in memory
+        """
+        self.window = window_hours * 3600
+        self.window_hours = window_hours
+        self.hoax_threshold = hoax_threshold if hoax_threshold is not None \
+            else int(os.getenv('HOAX_CALLER_THRESHOLD', 2))
+        self.max_callers = max_callers
+        self._profiles: 'OrderedDict[str, CallerProfile]' = OrderedDict()
+        self._lock = threading.Lock()
+        
+        logger.info(f"CallerProfileCache initialized: window {window_hours}h, "
+                    f"hoax threshold {self.hoax_threshold}")
+    
+    def warm(self, call_logger) -> int:
+        """
+        Load recent activity and false-call counts from the calls database.
+        
+        Args:
+            call_logger: CallLogger to read from
+        
+        Returns:
+            Number of caller profiles loaded
+        """
+        activity = call_logger.get_caller_activity(hours=self.window_hours)
+        with self._lock:
+            self._profiles.clear()
+            for caller_id, info in activity.items():
+                profile = CallerProfile()
+                profile.recent.extend(sorted(info['timestamps']))
+                profile.false_calls = info['false_calls']
+                profile.last_category = info['last_category']
+                profile.last_call = profile.recent[-1] if profile.recent else None
+                self._profiles[caller_id] = profile
+            self._evict()
+        
+        logger.info(f"Caller profiles warmed: {len(activity)} numbers")
+        return len(activity)
+    
+    def record(self, caller_id: Optional[str], category: Optional[str] = None,
+               false_call: bool = False, timestamp: Optional[datetime] = None):
+        """
+        Account for a logged call.
+        
+        Args:
+            caller_id: Caller phone number (ignored if empty)
+            category: Incident category of the call
+            false_call: Whether the call was confirmed as a false call
+            timestamp: Call time (now by default)
+        """
+        if not caller_id:
+            return
+        
+        at = timestamp.timestamp() if timestamp else time.time()
+        with self._lock:
+            profile = self._profiles.get(caller_id)
+            if profile is None:
+                profile = self._profiles[caller_id] = CallerProfile()
+            else:
+                self._profiles.move_to_end(caller_id)
+            
+            profile.recent.append(at)
+            profile.prune(at - self.window)
+            profile.last_call = at
+            if category:
+                profile.last_category = category
+            if false_call:
+                profile.false_calls += 1
+            self._evict()
+    
+    def record_false_call(self, caller_id: Optional[str]):
+        """
+        Count an already logged call as false after the fact.
+        
+        Unlike ``record`` this does not add a call to the recent activity.
+        
+        Args:
+            caller_id: Caller phone number (ignored if empty)
+        """
+        if not caller_id:
+            return
+        
+        with self._lock:
+            profile = self._profiles.get(caller_id)
+            if profile is None:
+                profile = self._profiles[caller_id] = CallerProfile()
+            else:
+                self._profiles.move_to_end(caller_id)
+            profile.false_calls += 1
+            self._evict()
+    
+    def get(self, caller_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Get caller history in the format of CallLogger.get_caller_history.
+        
+        Args:
+            caller_id: Caller phone number
+        
+        Returns:
+            Dictionary with ``recent_calls``, ``false_calls``, ``last_category``,
+            ``last_call`` (epoch seconds) and ``suspected_hoax``, or None for
+            unknown numbers
+        """
+        if not caller_id:
+            return None
+        
+        with self._lock:
+            profile = self._profiles.get(caller_id)
+            if profile is None:
+                return None
+            profile.prune(time.time() - self.window)
+            return {
+                'recent_calls': len(profile.recent),
+                'false_calls': profile.false_calls,
+                'last_category': profile.last_category,
+                'last_call': profile.last_call,
+                'suspected_hoax': profile.false_calls >= self.hoax_threshold
+            }
+    
+    def is_suspected_hoax(self, caller_id: Optional[str]) -> bool:
+        """Whether the number has reached the false-call threshold."""
+        with self._lock:
+            profile = self._profiles.get(caller_id) if caller_id else None
+            return profile is not None and profile.false_calls >= self.hoax_threshold
+    
+    def __len__(self) -> int:
+        return len(self._profiles)
+    
+    def _evict(self):
+        """Drop least recently seen profiles above the size limit; caller holds the lock."""
+        while len(self._profiles) > self.max_callers:
+            self._profiles.popitem(last=False)
+
+
+# Factory function for easy instantiation
+def create_caller_profile_cache(call_logger=None, window_hours: float = 24):
+    """Create caller profile cache, warmed from ``call_logger`` if given."""
+    cache = CallerProfileCache(window_hours)
+    if call_logger is not None:
+        cache.warm(call_logger)
+    return cache
+
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
+    cache = CallerProfileCache(hoax_threshold=2)
+    cache.record('+77011234567', 'violence')
+    cache.record('+77011234567', 'violence')
+    cache.record('+77019999999', 'other', false_call=True)
+    cache.record('+77019999999', 'other', false_call=True)
+    
+    for number in ['+77011234567', '+77019999999', '+77010000000']:
+        print(f"{number}: {cache.get(number)}")
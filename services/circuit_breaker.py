@@ -0,0 +1,300 @@
+"""
+Circuit Breaker for AI Call Intake System.
+Shared failure and latency tracking for external AI engines with adaptive timeouts.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+from services.latency import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an engine whose circuit is open."""
+    
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Circuit {name} is open, retry in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker over a rolling time window.
+    
+    Every call is recorded with its outcome and duration. When the window
+    holds at least ``min_calls`` and either the failure rate or the share
+    of calls slower than ``slow_call_seconds`` reaches its threshold, the
+    circuit opens and calls fail immediately with CircuitOpenError, so
+    callers go straight to their fallback instead of waiting for timeouts.
+    After ``open_seconds`` a limited number of probe calls is let through
+    (half-open); a successful probe closes the circuit, a failed one opens
+    it again.
+    
+    Successful call durations also feed a latency histogram from which
+    ``timeout()`` derives the per-request timeout: a multiple of the p99,
+    clamped to [min_timeout, max_timeout].
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, name: str, window_seconds: float = 60.0, min_calls: int = 10,
+                 failure_rate: float = 0.5, slow_call_seconds: float = 10.0, slow_call_rate: float = 0.8,
+                 open_seconds: float = 30.0, half_open_probes: int = 1,
+                 min_timeout: float = 2.0, max_timeout: float = 30.0, timeout_multiplier: float = 2.0,
+                 latency: Optional[LatencyHistogram] = None):
+        """
+        Initialize breaker.
+        
+        Args:
+            name: Engine name shown in logs and on /health
+            window_seconds: Length of the rolling window
+            min_calls: Calls in the window required before the rates are evaluated
+            failure_rate: Failure share that opens the circuit
+            slow_call_seconds: Duration above which a call counts as slow
+            slow_call_rate: Slow call share that opens the circuit
+            open_seconds: Time the circuit stays open before probing
+            half_open_probes: Concurrent probe calls allowed while half-open
+            min_timeout: Lower bound of the adaptive timeout in seconds
+            max_timeout: Upper bound (and initial value) of the adaptive timeout
+            timeout_multiplier: Adaptive timeout as a multiple of the p99 latency
+            latency: Histogram of successful call durations (new one by default)
+        """
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.latency = latency or LatencyHistogram()
+        
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._window = deque()
+        self._failures = 0
+        self._slow = 0
+        self._probes = 0
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        """
+        Check whether a call may be made now; reserves a probe slot when half-open.
+        
+        Every allowed call must be followed by ``record`` or ``release``.
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    self.rejected += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self._probes = 0
+                logger.info(f"Circuit {self.name} half-open, probing")
+            
+            if self.state == self.HALF_OPEN:
+                if self._probes >= self.half_open_probes:
+                    self.rejected += 1
+                    return False
+                self._probes += 1
+            return True
+    
+    def record(self, success: bool, duration: float):
+        """
+        Record the outcome of an allowed call.
+        
+        Args:
+            success: Whether the call produced a usable result
+            duration: Call duration in seconds
+        """
+        now = time.monotonic()
+        slow = duration >= self.slow_call_seconds
+        if success:
+            self.latency.record(duration)
+        
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                if success and not slow:
+                    self._close()
+                else:
+                    self._open(now, 'probe failed')
+                return
+            
+            self._window.append((now, success, slow))
+            self._failures += not success
+            self._slow += slow
+            self._prune(now)
+            
+            calls = len(self._window)
+            if self.state == self.CLOSED and calls >= self.min_calls:
+                if self._failures / calls >= self.failure_rate:
+                    self._open(now, f"failure rate {self._failures / calls:.0%}")
+                elif self._slow / calls >= self.slow_call_rate:
+                    self._open(now, f"slow call rate {self._slow / calls:.0%}")
+    
+    def release(self):
+        """Give back an allowed call that was abandoned without an outcome (e.g. cancelled)."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+    
+    def call(self, func: Callable, *args, is_failure: Optional[Callable[[Any], bool]] = None, **kwargs) -> Any:
+        """
+        Call ``func`` through the breaker.
+        
+        Args:
+            func: Engine call
+            *args: Positional arguments for ``func``
+            is_failure: Optional predicate marking a returned value as failure
+                (for engines that swallow their errors and return None)
+            **kwargs: Keyword arguments for ``func``
+        
+        Returns:
+            Result of ``func``
+        
+        Raises:
+            CircuitOpenError: The circuit is open
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_in())
+        
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record(False, time.perf_counter() - started)
+            raise
+        
+        self.record(not (is_failure and is_failure(result)), time.perf_counter() - started)
+        return result
+    
+    def timeout(self) -> float:
+        """Adaptive request timeout in seconds."""
+        p99 = self.latency.quantile(0.99) if self.latency.count >= self.min_calls else None
+        if p99 is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, p99 * self.timeout_multiplier))
+    
+    def retry_in(self) -> float:
+        """Seconds until an open circuit starts probing (0 otherwise)."""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Return state, window rates, timeout and latency as a JSON-serializable dictionary."""
+        with self._lock:
+            self._prune(time.monotonic())
+            calls = len(self._window)
+            snapshot = {
+                'state': self.state,
+                'calls': calls,
+                'failure_rate': round(self._failures / calls, 3) if calls else 0.0,
+                'slow_call_rate': round(self._slow / calls, 3) if calls else 0.0,
+                'times_opened': self.times_opened,
+                'rejected': self.rejected
+            }
+        snapshot['retry_in'] = round(self.retry_in(), 1)
+        snapshot['timeout'] = round(self.timeout(), 2)
+        snapshot['latency'] = self.latency.snapshot()
+        return snapshot
+    
+    def _prune(self, now: float):
+        """Drop calls older than the window; caller holds the lock."""
+        window = self._window
+        cutoff = now - self.window_seconds
+        while window and window[0][0] < cutoff:
+            _, success, slow = window.popleft()
+            self._failures -= not success
+            self._slow -= slow
+    
+    def _open(self, now: float, reason: str):
+        """Open the circuit; caller holds the lock."""
+        self.state = self.OPEN
+        self.opened_at = now
+        self.times_opened += 1
+        logger.warning(f"Circuit {self.name} opened ({reason}), using fallback for {self.open_seconds:.0f}s")
+    
+    def _close(self):
+        """Close the circuit with a fresh window; caller holds the lock."""
+        self.state = self.CLOSED
+        self._window.clear()
+        self._failures = 0
+        self._slow = 0
+        logger.info(f"Circuit {self.name} closed")
+
+
+# Process-wide breakers, one per external engine
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, **settings) -> CircuitBreaker:
+    """
+    Get the shared breaker of an engine, creating it on first use.
+    
+    Settings only apply on creation. Window, thresholds and open time can
+    be overridden for all breakers with $BREAKER_WINDOW_SECONDS,
+    $BREAKER_FAILURE_RATE and $BREAKER_OPEN_SECONDS.
+    
+    Args:
+        name: Engine name, e.g. ``llm.openai``
+        **settings: CircuitBreaker keyword arguments
+    
+    Returns:
+        Circuit breaker shared by all services of this process
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            for setting, variable in (('window_seconds', 'BREAKER_WINDOW_SECONDS'),
+                                      ('failure_rate', 'BREAKER_FAILURE_RATE'),
+                                      ('open_seconds', 'BREAKER_OPEN_SECONDS')):
+                if os.getenv(variable):
+                    settings[setting] = float(os.getenv(variable))
+            breaker = _breakers[name] = CircuitBreaker(name, **settings)
+        return breaker
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every breaker of this process, for health endpoints."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
+    breaker = CircuitBreaker('demo', min_calls=5, open_seconds=0.5)
+    
+    def flaky(ok: bool):
+        if not ok:
+            raise ConnectionError("engine unavailable")
+        return "ok"
+    
+    for ok in [True, False, False, False, False, False, True]:
+        try:
+            breaker.call(flaky, ok)
+        except CircuitOpenError as e:
+            print(f"rejected: {e}")
+        except ConnectionError:
+            pass
+    time.sleep(0.6)
+    print(breaker.call(flaky, True), breaker.snapshot())
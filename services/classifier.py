@@ -6,7 +6,9 @@ Provides rule-based classification and validation of LLM analysis.
 import json
 import logging
 from typing import Dict, Any, List, Tuple
-import re
+
+from services.keyword_matcher import KeywordMatcher
+from services.incident_extractor import IncidentExtractor
 
 logger = logging.getLogger(__name__)
 
@@ -92,17 +94,45 @@ class IncidentClassifier:
             'бита', 'дубинка', 'топор', 'молоток', 'кастет'
         ]
         
-        # Address patterns
-        self.address_patterns = [
-            r'улица\s+([\w\s]+)\s*,\s*(?:дом|д\.?)\s*(\d+)',
-            r'ул\.\s*([\w\s]+)\s*,\s*(?:дом|д\.?)\s*(\d+)',
-            r'([\w\s]+)\s*улица\s*,\s*(?:дом|д\.?)\s*(\d+)',
-            r'дом\s*(\d+)\s*по\s*улице\s*([\w\s]+)',
-            r'(\d+)\s*дом\s*на\s*([\w\s]+)'
-        ]
+        # Immediate danger indicators (only count together with a danger indicator)
+        self.immediate_indicators = ['сейчас', 'немедленно', 'сию минуту', 'прямо сейчас', 'в данный момент']
+        
+        # Street, house, landmark and head count extraction
+        self.extractor = IncidentExtractor()
+        
+        self.build_keyword_matcher()
         
         logger.info("IncidentClassifier initialized with %d categories", len(self.categories))
     
+    def build_keyword_matcher(self):
+        """
+        Compile all keyword sets into one matcher.
+        
+        Must be called again after changing categories or indicator lists.
+        """
+        keywords = [
+            (keyword, ('category', category))
+            for category, info in self.categories.items()
+            for keyword in info['keywords']
+        ]
+        keywords += [(keyword, 'danger') for keyword in self.danger_indicators]
+        keywords += [(keyword, 'weapon') for keyword in self.weapon_indicators]
+        keywords += [(keyword, 'immediate') for keyword in self.immediate_indicators]
+        self.keyword_matcher = KeywordMatcher(keywords)
+        self._label_matrix_cache = None
+    
+    def scan_keywords(self, text: str) -> Dict[Any, int]:
+        """
+        Find category, danger, weapon and immediacy keywords in a single pass.
+        
+        Args:
+            text: Text to scan (lowercased here)
+        
+        Returns:
+            Hit counts per label: ('category', name), 'danger', 'weapon', 'immediate'
+        """
+        return self.keyword_matcher.count(text.lower())
+    
     def classify(self, llm_result: Dict[str, Any]) -> Dict[str, Any]:
         """
         Validate and enhance LLM classification with rule-based logic.
@@ -118,23 +148,144 @@ class IncidentClassifier:
         # Create a copy to avoid modifying original
         result = llm_result.copy()
         
-        # Extract text for keyword analysis (if available)
-        text = result.get('summary', '').lower() + ' ' + result.get('transcript', '').lower()
+        # Extract text for keyword analysis (if available); the extractor needs the original case
+        source = result.get('summary', '') + ' ' + result.get('transcript', '')
+        text = source.lower()
+        hits = self.keyword_matcher.count(text)
+        
+        return self._apply_rules(
+            result, source,
+            detected_category=self._detect_category_from_text(text, hits),
+            danger=self._has_danger_indicators(text, hits),
+            immediate_danger=self._has_immediate_danger_indicators(text, hits),
+            weapons_mentioned=self._has_weapon_indicators(text, hits)
+        )
+    
+    def classify_batch(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Classify many LLM results at once.
         
+        Equivalent to calling ``classify`` on every record, but keyword scoring
+        is vectorized: each text is scanned once into a sparse record x keyword
+        matrix, which is multiplied by the keyword x label matrix to score all
+        categories and indicator sets for all records in one operation.
+        
+        Args:
+            records: LLM analysis results (with ``summary`` and/or ``transcript``)
+        
+        Returns:
+            Enhanced classification results, in input order
+        """
+        try:
+            import numpy as np
+            from scipy import sparse
+        except ImportError:
+            logger.error("numpy/scipy not installed. Install with: pip install numpy scipy")
+            raise
+        
+        if not records:
+            return []
+        
+        sources = [r.get('summary', '') + ' ' + r.get('transcript', '') for r in records]
+        texts = [source.lower() for source in sources]
+        
+        vocabulary = self.keyword_matcher.vocabulary
+        rows, columns = [], []
+        for i, text in enumerate(texts):
+            for keyword in self.keyword_matcher.match(text):
+                rows.append(i)
+                columns.append(vocabulary[keyword])
+        
+        term_matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, columns)),
+            shape=(len(texts), len(vocabulary))
+        )
+        label_columns, label_matrix = self._label_matrix()
+        scores = (term_matrix @ label_matrix).toarray()
+        
+        # Category columns come first, in self.categories order, so argmax keeps first-wins ties
+        categories = list(self.categories)
+        category_scores = scores[:, :len(categories)]
+        best = category_scores.argmax(axis=1)
+        has_category = category_scores.max(axis=1) > 0
+        
+        danger = scores[:, label_columns.index('danger')] > 0
+        immediate = (scores[:, label_columns.index('immediate')] > 0) & danger
+        weapons = scores[:, label_columns.index('weapon')] > 0
+        
+        results = []
+        for i, record in enumerate(records):
+            results.append(self._apply_rules(
+                record.copy(), sources[i],
+                detected_category=categories[best[i]] if has_category[i] else 'other',
+                danger=bool(danger[i]),
+                immediate_danger=bool(immediate[i]),
+                weapons_mentioned=bool(weapons[i])
+            ))
+        
+        logger.info(f"Batch classification complete: {len(records)} records")
+        return results
+    
+    def _label_matrix(self):
+        """
+        Sparse keyword x label matrix for the current keyword matcher.
+        
+        Returns:
+            Tuple of (label column names, CSR matrix of keyword counts per label)
+        """
+        if self._label_matrix_cache is not None:
+            return self._label_matrix_cache
+        
+        import numpy as np
+        from scipy import sparse
+        
+        label_columns = [('category', category) for category in self.categories] + ['danger', 'immediate', 'weapon']
+        column_index = {label: i for i, label in enumerate(label_columns)}
+        
+        rows, columns, counts = [], [], []
+        for keyword, row in self.keyword_matcher.vocabulary.items():
+            for label, count in self.keyword_matcher.labels([keyword]).items():
+                rows.append(row)
+                columns.append(column_index[label])
+                counts.append(count)
+        
+        matrix = sparse.csr_matrix(
+            (np.array(counts, dtype=np.int32), (rows, columns)),
+            shape=(len(self.keyword_matcher.vocabulary), len(label_columns))
+        )
+        self._label_matrix_cache = (label_columns, matrix)
+        return self._label_matrix_cache
+    
+    def _apply_rules(self, result: Dict[str, Any], text: str, detected_category: str,
+                     danger: bool, immediate_danger: bool, weapons_mentioned: bool) -> Dict[str, Any]:
+        """
+        Apply validation rules to one result, given its keyword findings.
+        
+        Args:
+            result: Copy of the LLM result, modified in place
+            text: Summary and transcript in their original case (the extractor
+                tells multi-word names by capitalization)
+            detected_category: Category inferred from keywords
+            danger: Text contains danger indicators
+            immediate_danger: Text contains immediate danger indicators
+            weapons_mentioned: Text contains weapon indicators
+        
+        Returns:
+            Enhanced classification result
+        """
         # 1. Validate category
-        category = result.get('category', 'other')
+        category = result.get('category')
         if category not in self.categories:
-            # Try to determine category from keywords
-            detected_category = self._detect_category_from_text(text)
+            # Missing or unknown: determine category from keywords
             result['category'] = detected_category
             logger.info(f"Category corrected from '{category}' to '{detected_category}'")
         
         # 2. Validate urgency
-        urgency = result.get('urgency', 'medium')
+        urgency = result.setdefault('urgency', 'medium')
         category_info = self.categories.get(result['category'], self.categories['other'])
         
         # Adjust urgency based on danger indicators
-        if self._has_danger_indicators(text):
+        if danger:
             if urgency != 'critical':
                 result['urgency'] = 'high'
                 logger.info(f"Urgency elevated to 'high' due to danger indicators")
@@ -149,21 +300,26 @@ class IncidentClassifier:
         
         # 3. Validate current_danger
         current_danger = result.get('current_danger', False)
-        if not current_danger and self._has_immediate_danger_indicators(text):
+        if not current_danger and immediate_danger:
             result['current_danger'] = True
             logger.info("Current danger set to True based on indicators")
         
         # 4. Validate weapons
         weapons = result.get('weapons', False)
-        if not weapons and self._has_weapon_indicators(text):
+        if not weapons and weapons_mentioned:
             result['weapons'] = True
             logger.info("Weapons detected from text")
         
-        # 5. Validate people_involved
+        # Details from text are extracted in one pass, only if something is missing
+        address = result.get('address', '')
         people_involved = result.get('people_involved', 0)
+        address_missing = not address or address in ['не указан', 'not specified', 'көрсетілмеген']
+        details = self.extractor.extract(text) if address_missing or people_involved <= 0 else None
+        
+        # 5. Validate people_involved
         if people_involved <= 0:
             # Try to extract from text
-            extracted_people = self._extract_people_count(text)
+            extracted_people = details.people
             if extracted_people > 0:
                 result['people_involved'] = extracted_people
                 logger.info(f"People involved extracted: {extracted_people}")
@@ -175,9 +331,8 @@ class IncidentClassifier:
             logger.info(f"Department set to: {category_info['department']}")
         
         # 7. Extract address if missing
-        address = result.get('address', '')
-        if not address or address in ['не указан', 'not specified', 'көрсетілмеген']:
-            extracted_address = self._extract_address(text)
+        if address_missing:
+            extracted_address = details.address
             if extracted_address:
                 result['address'] = extracted_address
                 logger.info(f"Address extracted: {extracted_address}")
@@ -192,111 +347,89 @@ class IncidentClassifier:
         logger.info(f"Classification complete. Final category: {result['category']}, urgency: {result['urgency']}")
         return result
     
-    def _detect_category_from_text(self, text: str) -> str:
+    def prescore(self, text: str) -> str:
+        """
+        Estimate urgency from keywords alone, before any LLM analysis.
+        
+        Used for scheduling decisions, so it must stay cheap: a single keyword
+        scan, no regex extraction.
+        
+        Args:
+            text: Transcript or partial transcript
+        
+        Returns:
+            Urgency level (critical, high, medium, low)
+        """
+        hits = self.scan_keywords(text)
+        
+        if self._has_weapon_indicators(text, hits) or self._has_immediate_danger_indicators(text, hits):
+            return 'critical'
+        
+        # For scheduling err on the safe side: the most urgent matching category wins
+        urgency_levels = {'critical': 4, 'high': 3, 'medium': 2, 'low': 1}
+        matched = [
+            info['urgency_default'] for category, info in self.categories.items()
+            if hits.get(('category', category))
+        ]
+        # Nothing recognized yet: do not demote below the default
+        urgency = max(matched, key=urgency_levels.get) if matched else 'medium'
+        
+        if urgency in ('medium', 'low') and self._has_danger_indicators(text, hits):
+            return 'high'
+        
+        return urgency
+    
+    def detect_category(self, text: str) -> str:
+        """
+        Estimate category from keywords alone, before any LLM analysis.
+        
+        Args:
+            text: Transcript or partial transcript
+        
+        Returns:
+            Category name ('other' if no category keyword matched)
+        """
+        return self._detect_category_from_text(text)
+    
+    def _detect_category_from_text(self, text: str, hits: Dict[Any, int] = None) -> str:
         """Detect category from text using keyword matching."""
-        text_lower = text.lower()
-        
-        category_scores = {}
-        for category, info in self.categories.items():
-            score = 0
-            for keyword in info['keywords']:
-                if keyword in text_lower:
-                    score += 1
-            
-            # Also check for partial matches
-            for keyword in info['keywords']:
-                if keyword in text_lower:
-                    score += 0.5
-            
-            category_scores[category] = score
+        if hits is None:
+            hits = self.scan_keywords(text)
         
-        # Find category with highest score
-        if category_scores:
-            best_category = max(category_scores.items(), key=lambda x: x[1])[0]
-            if category_scores[best_category] > 0:
-                return best_category
+        # Each matched keyword scores 1.5 (exact plus partial match); first category wins ties
+        best_category, best_score = 'other', 0
+        for category in self.categories:
+            score = hits.get(('category', category), 0) * 1.5
+            if score > best_score:
+                best_category, best_score = category, score
         
-        return 'other'
+        return best_category
     
-    def _has_danger_indicators(self, text: str) -> bool:
+    def _has_danger_indicators(self, text: str, hits: Dict[Any, int] = None) -> bool:
         """Check if text contains danger indicators."""
-        text_lower = text.lower()
-        return any(indicator in text_lower for indicator in self.danger_indicators)
+        if hits is None:
+            hits = self.scan_keywords(text)
+        return bool(hits.get('danger'))
     
-    def _has_immediate_danger_indicators(self, text: str) -> bool:
+    def _has_immediate_danger_indicators(self, text: str, hits: Dict[Any, int] = None) -> bool:
         """Check if text contains immediate danger indicators."""
-        text_lower = text.lower()
-        immediate_indicators = ['сейчас', 'немедленно', 'сию минуту', 'прямо сейчас', 'в данный момент']
-        return any(indicator in text_lower for indicator in immediate_indicators) and self._has_danger_indicators(text)
+        if hits is None:
+            hits = self.scan_keywords(text)
+        return bool(hits.get('immediate')) and bool(hits.get('danger'))
     
-    def _has_weapon_indicators(self, text: str) -> bool:
+    def _has_weapon_indicators(self, text: str, hits: Dict[Any, int] = None) -> bool:
         """Check if text contains weapon indicators."""
-        text_lower = text.lower()
-        return any(indicator in text_lower for indicator in self.weapon_indicators)
+        if hits is None:
+            hits = self.scan_keywords(text)
+        return bool(hits.get('weapon'))
     
     def _extract_people_count(self, text: str) -> int:
-        """Extract number of people involved from text."""
-        text_lower = text.lower()
-        
-        # Patterns for numbers
-        patterns = [
-            r'(\d+)\s*(?:человек|людей|люди|чел)',
-            r'(\d+)\s*(?:мужчин|женщин|детей)',
-            r'около\s*(\d+)\s*(?:человек|людей)',
-            r'несколько\s*(?:человек|людей)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                try:
-                    return int(match.group(1))
-                except (ValueError, IndexError):
-                    pass
-        
-        # Check for specific words
-        if 'один' in text_lower or '1' in text:
-            return 1
-        elif 'два' in text_lower or '2' in text or 'пара' in text_lower:
-            return 2
-        elif 'несколько' in text_lower:
-            return 3
-        elif 'много' in text_lower or 'толпа' in text_lower:
-            return 5
-        
-        return 0
+        """Extract number of people involved from text (original case)."""
+        return self.extractor.extract(text).people
     
     def _extract_address(self, text: str) -> str:
-        """Extract address from text."""
-        text_lower = text.lower()
-        
-        for pattern in self.address_patterns:
-            match = re.search(pattern, text_lower, re.IGNORECASE)
-            if match:
-                try:
-                    street = match.group(1).strip()
-                    house = match.group(2).strip()
-                    return f"ул. {street}, д. {house}"
-                except (IndexError, AttributeError):
-                    continue
-        
-        # Try simpler patterns
-        simple_patterns = [
-            r'на\s+улице\s+([\w\s]+)',
-            r'в\s+доме\s+(\d+)',
-            r'возле\s+([\w\s]+)'
-        ]
-        
-        for pattern in simple_patterns:
-            match = re.search(pattern, text_lower, re.IGNORECASE)
-            if match:
-                try:
-                    location = match.group(1).strip()
-                    return f"около {location}"
-                except (IndexError, AttributeError):
-                    continue
-        
-        return 'не указан'
+        """Extract address from text (original case, not lowercased)."""
+        return self.extractor.extract(text).address
     
     def _calculate_confidence(self, result: Dict[str, Any], text: str) -> float:
         """Calculate confidence score for classification (0.0 to 1.0)."""
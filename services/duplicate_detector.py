@@ -0,0 +1,352 @@
+"""
+Duplicate Incident Detector for AI Call Intake System.
+Groups calls about the same incident using MinHash/LSH over transcripts, a time window and the address.
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import zlib
+import sqlite3
+import hashlib
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from services.gazetteer import split_address
+
+logger = logging.getLogger(__name__)
+
+
+# Mersenne prime of the universal hash family (a * x + b) mod p used as permutations
+_PRIME = (1 << 31) - 1
+_NON_WORD_PATTERN = re.compile(r'[^\w]+')
+_UNKNOWN_ADDRESSES = ('', 'не указан', 'not specified', 'көрсетілмеген')
+# What is left of a house-only address ("д. 15", "в доме 15", "15") after the house number is split off
+_NOT_A_STREET = re.compile(r'^(?:(?:в|во|на|у)\s+)?(?:дом\w*|д|үй\w*|кв\w*|квартир\w*|\d[\w/]*)?$')
+# Landmark addresses as written by ExtractedDetails.address ("около рынка")
+_LANDMARK_PREFIX = re.compile(r'^\s*(?:около|возле|рядом|напротив)\b', re.IGNORECASE)
+
+
+class IncidentMatch(NamedTuple):
+    """Open incident a new call was matched to."""
+    incident_id: str
+    similarity: float
+    same_address: bool
+    analysis: Dict[str, Any]
+    call_count: int
+
+
+class MinHasher:
+    """MinHash signatures over character shingles of normalized text."""
+    
+    def __init__(self, num_perm: int = 64, shingle_size: int = 4, seed: int = 102):
+        """
+        Initialize hasher.
+        
+        Args:
+            num_perm: Signature length
+            shingle_size: Characters per shingle
+            seed: Seed of the permutation family; must be the same in every process
+                sharing signatures
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            logger.error("numpy not installed. Install with: pip install numpy")
+            raise
+        
+        self.np = np
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _PRIME, size=(num_perm, 1)).astype(np.uint64)
+        self._b = rng.randint(0, _PRIME, size=(num_perm, 1)).astype(np.uint64)
+        # Keep arithmetic in uint64 (mixing with a Python int would promote to float)
+        self._prime = np.uint64(_PRIME)
+    
+    def shingles(self, text: str) -> List[bytes]:
+        """Distinct character shingles of lowercased text with punctuation collapsed."""
+        normalized = _NON_WORD_PATTERN.sub(' ', text.lower()).strip()
+        if len(normalized) < self.shingle_size:
+            return [normalized.encode('utf-8')] if normalized else []
+        size = self.shingle_size
+        return list({normalized[i:i + size].encode('utf-8') for i in range(len(normalized) - size + 1)})
+    
+    def signature(self, text: str):
+        """
+        Compute MinHash signature.
+        
+        Returns:
+            uint64 array of length ``num_perm`` (all max values for empty text)
+        """
+        np = self.np
+        shingles = self.shingles(text)
+        if not shingles:
+            return np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        
+        # crc32 is stable across processes, unlike hash()
+        hashes = np.fromiter((zlib.crc32(s) % _PRIME for s in shingles), dtype=np.uint64, count=len(shingles))
+        # a and hash are below 2^31, so the product fits in 64 bits
+        return ((self._a * hashes + self._b) % self._prime).min(axis=1)
+    
+    @staticmethod
+    def similarity(signature_a, signature_b) -> float:
+        """Estimated Jaccard similarity of the underlying shingle sets."""
+        return float((signature_a == signature_b).mean())
+
+
+class DuplicateDetector:
+    """
+    Online detector linking new calls to open incidents.
+    
+    Every incident is indexed by the LSH bands of its transcript signature and
+    by its normalized street. A new call is looked up with one indexed query
+    over its band keys, so the cost does not grow with the number of open
+    incidents. Candidates are confirmed by signature similarity inside the
+    time window; calls at the same street about the same kind of emergency
+    need less textual overlap, calls at different known streets are never
+    merged.
+    
+    State lives in the calls SQLite database, so AGI call processes and the
+    API servers see the same open incidents.
+    """
+    
+    def __init__(self, db_path: str = None, window_minutes: float = None,
+                 threshold: float = 0.5, address_threshold: float = 0.15,
+                 num_perm: int = 64, bands: int = 32):
+        """
+        Initialize detector.
+        
+        Args:
+            db_path: Path to SQLite database (calls database by default)
+            window_minutes: How long an incident stays open after its last call
+            threshold: Minimum similarity for calls with unknown or no address
+            address_threshold: Minimum similarity for calls at the same street and of the
+                same category
+            num_perm: MinHash signature length
+            bands: Number of LSH bands (``num_perm`` must be divisible by it)
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        
+        self.db_path = db_path or os.getenv('CALL_LOG_DB', '/var/lib/ai-call-intake/calls.db')
+        self.window = 60 * (window_minutes if window_minutes is not None
+                            else float(os.getenv('DUPLICATE_WINDOW_MINUTES', 20)))
+        self.threshold = threshold
+        self.address_threshold = address_threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self._last_cleanup = 0.0
+        
+        self._init_database()
+        logger.info(f"DuplicateDetector initialized: window {self.window / 60:.0f} min, "
+                    f"{bands} bands x {self.rows} rows")
+    
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+    
+    def _init_database(self):
+        """Create incident tables."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS incidents (
+                        incident_id TEXT PRIMARY KEY,
+                        created_at REAL NOT NULL,
+                        last_seen REAL NOT NULL,
+                        street_key TEXT,
+                        house TEXT,
+                        signature BLOB NOT NULL,
+                        analysis_json TEXT,
+                        call_count INTEGER DEFAULT 1
+                    )
+                ''')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS incident_bands (
+                        band_key INTEGER NOT NULL,
+                        incident_id TEXT NOT NULL,
+                        PRIMARY KEY (band_key, incident_id)
+                    ) WITHOUT ROWID
+                ''')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_incidents_last_seen ON incidents(last_seen)')
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def address_key(address: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Normalized (street, house) of an address; None for unknown parts.
+        
+        A house number without a street ("д. 15") or a landmark ("около рынка")
+        has no street key: "дом 15" alone says nothing about two calls being
+        at the same place.
+        """
+        if not address or address.strip().lower() in _UNKNOWN_ADDRESSES or _LANDMARK_PREFIX.match(address):
+            return None, None
+        name, house = split_address(address)
+        if _NOT_A_STREET.match(name):
+            return None, house or (name if name[:1].isdigit() else None)
+        return name, house
+    
+    def _band_keys(self, signature, street_key: Optional[str]) -> List[int]:
+        """LSH bucket keys of a signature, plus the street bucket."""
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(band.to_bytes(2, 'little') + chunk.tobytes(), digest_size=8).digest()
+            keys.append(int.from_bytes(digest, 'little', signed=True))
+        if street_key:
+            digest = hashlib.blake2b(b'street:' + street_key.encode('utf-8'), digest_size=8).digest()
+            keys.append(int.from_bytes(digest, 'little', signed=True))
+        return keys
+    
+    def match(self, transcript: str, address: Optional[str] = None,
+              category: Optional[str] = None) -> Optional[IncidentMatch]:
+        """
+        Find an open incident the call belongs to and attach the call to it.
+        
+        A different emergency at the same address (a fight in a house that is
+        on fire) shares the address words of the transcript, so the lower
+        same-address threshold only applies when the call's category is known
+        and equals the incident's.
+        
+        Args:
+            transcript: Call transcript
+            address: Address extracted from the transcript, if any
+            category: Category estimated from the transcript keywords, if any
+        
+        Returns:
+            Best matching incident (with its stored analysis) or None
+        """
+        if not transcript or not transcript.strip():
+            return None
+        
+        signature = self.hasher.signature(transcript)
+        street_key, house = self.address_key(address)
+        keys = self._band_keys(signature, street_key)
+        now = time.time()
+        
+        conn = self._connect()
+        try:
+            rows = conn.execute(f'''
+                SELECT i.incident_id, i.street_key, i.house, i.signature, i.analysis_json, i.call_count
+                FROM incidents i
+                WHERE i.last_seen >= ? AND i.incident_id IN (
+                    SELECT incident_id FROM incident_bands WHERE band_key IN ({','.join('?' * len(keys))})
+                )
+            ''', [now - self.window] + keys).fetchall()
+            
+            best = None
+            for incident_id, incident_street, incident_house, signature_blob, analysis_json, call_count in rows:
+                if street_key and incident_street and street_key != incident_street:
+                    continue
+                # Long streets: the same street only counts as the same place if houses do not conflict
+                same_address = bool(street_key) and street_key == incident_street and \
+                    not (house and incident_house and house != incident_house)
+                similarity = self.hasher.similarity(
+                    signature, self.hasher.np.frombuffer(signature_blob, dtype=self.hasher.np.uint64)
+                )
+                analysis = json.loads(analysis_json or '{}')
+                same_kind = same_address and category not in (None, 'other') and \
+                    category == analysis.get('category')
+                if similarity < (self.address_threshold if same_kind else self.threshold):
+                    continue
+                if best is None or (same_address, similarity) > (best.same_address, best.similarity):
+                    best = IncidentMatch(incident_id, similarity, same_address, analysis, call_count + 1)
+            
+            if best:
+                with conn:
+                    conn.execute(
+                        'UPDATE incidents SET last_seen = ?, call_count = call_count + 1 WHERE incident_id = ?',
+                        (now, best.incident_id)
+                    )
+                logger.info(f"Call matched open incident {best.incident_id} "
+                            f"(similarity {best.similarity:.2f}, same address: {best.same_address})")
+            return best
+        finally:
+            conn.close()
+    
+    def register(self, transcript: str, analysis: Dict[str, Any], address: Optional[str] = None) -> str:
+        """
+        Open a new incident for a call that matched nothing.
+        
+        Args:
+            transcript: Call transcript
+            analysis: Final analysis of the call, reused for later duplicates
+            address: Address of the incident (analysis address if omitted)
+        
+        Returns:
+            New incident ID
+        """
+        incident_id = 'inc_' + uuid.uuid4().hex[:16]
+        signature = self.hasher.signature(transcript or '')
+        street_key, house = self.address_key(address if address is not None else analysis.get('address'))
+        now = time.time()
+        
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('''
+                    INSERT INTO incidents (incident_id, created_at, last_seen, street_key, house,
+                                           signature, analysis_json)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (incident_id, now, now, street_key, house, signature.tobytes(),
+                      json.dumps(analysis, ensure_ascii=False, default=str)))
+                conn.executemany(
+                    'INSERT OR IGNORE INTO incident_bands (band_key, incident_id) VALUES (?, ?)',
+                    [(key, incident_id) for key in self._band_keys(signature, street_key)]
+                )
+            
+            if now - self._last_cleanup > 60:
+                self._last_cleanup = now
+                self._cleanup(conn, now)
+        finally:
+            conn.close()
+        
+        logger.info(f"Opened incident {incident_id}")
+        return incident_id
+    
+    def _cleanup(self, conn: sqlite3.Connection, now: float):
+        """Drop bucket entries of closed incidents; incidents themselves are kept for reference."""
+        with conn:
+            conn.execute('''
+                DELETE FROM incident_bands WHERE incident_id IN (
+                    SELECT incident_id FROM incidents WHERE last_seen < ?
+                )
+            ''', (now - self.window,))
+
+
+# Factory function for easy instantiation
+def create_duplicate_detector(db_path: str = None):
+    """Create and return duplicate detector instance."""
+    return DuplicateDetector(db_path)
+
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+    
+    logging.basicConfig(level=logging.INFO)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        detector = DuplicateDetector(os.path.join(tmp, 'calls.db'))
+        first = "Горит дом на улице Абая 15, сильный дым, люди на балконах"
+        detector.register(first, {'category': 'fire', 'urgency': 'critical'}, 'ул. абая, д. 15')
+        detector.register("Пожар в доме 15, горит квартира, дым из окон",
+                          {'category': 'fire', 'urgency': 'critical'}, 'д. 15')
+        
+        for text, address, category in [
+            ("Пожар! Дом на Абая 15 горит, дым идет из окон", 'ул. абая, д. 15', 'fire'),
+            ("Горит дом на улице Абая 15, много дыма, люди на балконах", None, 'fire'),
+            ("Драка у дома на улице Абая 15, бьют мужчину", 'ул. абая, д. 15', 'assault'),
+            # House number only: not enough to lower the threshold, a different fire
+            ("Пожар в доме 15 на окраине, горит гараж во дворе", 'д. 15', 'fire'),
+            ("У соседа громко играет музыка", None, 'other'),
+        ]:
+            match = detector.match(text, address, category)
+            print(f"{text}\n  -> {match.incident_id if match else 'new incident'}"
+                  f"{f' ({match.similarity:.2f})' if match else ''}")
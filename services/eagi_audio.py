@@ -0,0 +1,216 @@
+"""
+EAGI Audio Stream for AI Call Intake System.
+Reads the caller's audio that Asterisk passes to EAGI scripts on file descriptor 3.
+"""
+
+import os
+import wave
+import logging
+import threading
+from collections import deque
+from typing import Optional
+
+from services.vad import VoiceActivityDetector
+
+logger = logging.getLogger(__name__)
+
+
+# Asterisk sends EAGI audio as 8 kHz 16-bit signed linear mono
+EAGI_FD = 3
+EAGI_SAMPLE_RATE = 8000
+
+
+class EAGIAudioStream:
+    """
+    Real-time caller audio with speech detection for barge-in and turn ends.
+    
+    A reader thread consumes fd 3 continuously (Asterisk drops audio when
+    the pipe is full) and runs the VAD on every frame. After ``arm()`` the
+    first detected speech sets ``speech_started`` (used to stop a prompt
+    that is playing) and the utterance is collected from a short pre-roll
+    before the speech start until the end of speech, so an answer given
+    while the question is still playing is captured completely.
+    """
+    
+    def __init__(self, fd: int = EAGI_FD, vad: Optional[VoiceActivityDetector] = None,
+                 preroll_ms: int = 300):
+        """
+        Initialize stream.
+        
+        Args:
+            fd: File descriptor with the caller's audio
+            vad: Voice activity detector (8 kHz, default settings if None)
+            preroll_ms: Audio kept before the detected speech start
+        """
+        self.fd = fd
+        self.vad = vad or VoiceActivityDetector(sample_rate=EAGI_SAMPLE_RATE)
+        self.frame_bytes = self.vad.frame_bytes
+        self.speech_started = threading.Event()
+        self.utterance_done = threading.Event()
+        self.closed = threading.Event()
+        
+        self._preroll = deque(maxlen=max(1, preroll_ms // self.vad.frame_ms))
+        self._utterance = None
+        self._armed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._read_loop, name='eagi-audio', daemon=True)
+    
+    def start(self) -> 'EAGIAudioStream':
+        """Start reading audio in the background."""
+        self._thread.start()
+        return self
+    
+    def arm(self):
+        """Start listening for a new utterance, discarding anything heard before."""
+        with self._lock:
+            self.vad.reset()
+            self._preroll.clear()
+            self._utterance = None
+            self._armed = True
+            self.speech_started.clear()
+            self.utterance_done.clear()
+    
+    def wait_utterance(self, max_seconds: float, no_input_seconds: float) -> Optional[bytes]:
+        """
+        Wait for the caller's utterance since the last ``arm()``.
+        
+        Args:
+            max_seconds: Longest utterance; it is cut off after this time from its start
+            no_input_seconds: Time to wait for speech to start
+        
+        Returns:
+            PCM audio (8 kHz 16-bit mono), or None if the caller said nothing
+        """
+        with self._lock:
+            armed = self._armed
+        if not armed:
+            self.arm()
+        
+        if not self.speech_started.wait(no_input_seconds):
+            with self._lock:
+                self._armed = False
+            return None
+        
+        self.utterance_done.wait(max_seconds)
+        with self._lock:
+            self._armed = False
+            audio = b''.join(self._utterance or [])
+            self._utterance = None
+        return audio or None
+    
+    def close(self):
+        """Stop collecting; the reader thread ends with the channel."""
+        self.closed.set()
+        self.speech_started.set()
+        self.utterance_done.set()
+    
+    def _read_loop(self):
+        """Read frames from fd 3 until the channel hangs up."""
+        buffer = b''
+        try:
+            while not self.closed.is_set():
+                chunk = os.read(self.fd, self.frame_bytes * 4)
+                if not chunk:
+                    break
+                buffer += chunk
+                while len(buffer) >= self.frame_bytes:
+                    frame, buffer = buffer[:self.frame_bytes], buffer[self.frame_bytes:]
+                    self._process(frame)
+        except OSError as e:
+            logger.warning(f"EAGI audio stream closed: {e}")
+        finally:
+            self.close()
+    
+    def _process(self, frame: bytes):
+        """Run the VAD on one frame and collect the utterance."""
+        with self._lock:
+            if not self._armed:
+                return
+            event = self.vad.process(frame)
+            
+            if self._utterance is not None:
+                if not self.utterance_done.is_set():
+                    self._utterance.append(frame)
+            else:
+                self._preroll.append(frame)
+            
+            if event == VoiceActivityDetector.START and self._utterance is None:
+                self._utterance = list(self._preroll)
+                self.speech_started.set()
+            elif event == VoiceActivityDetector.END and self._utterance is not None:
+                self.utterance_done.set()
+
+
+def is_eagi(agi) -> bool:
+    """Check whether the script was started with EAGI() and has caller audio on fd 3."""
+    try:
+        os.fstat(EAGI_FD)
+        return float(agi.env.get('agi_enhanced') or 0) > 0
+    except (AttributeError, ValueError, OSError):
+        return False
+
+
+def write_wav(path: str, audio: bytes, sample_rate: int = EAGI_SAMPLE_RATE):
+    """Save 16-bit mono PCM as a WAV file."""
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(audio)
+
+
+def split_wav(path: str, segment_ms: int = 400) -> list:
+    """
+    Split a WAV file into short segments so playback can stop between them.
+    
+    Args:
+        path: WAV file
+        segment_ms: Segment length in milliseconds
+    
+    Returns:
+        Segment file paths (next to the original), or [path] if it cannot be split
+    """
+    try:
+        with wave.open(path, 'rb') as wav:
+            params = wav.getparams()
+            frames_per_segment = max(1, params.framerate * segment_ms // 1000)
+            base, _ = os.path.splitext(path)
+            segments = []
+            while True:
+                frames = wav.readframes(frames_per_segment)
+                if not frames:
+                    break
+                segment_path = f"{base}_part{len(segments):03d}.wav"
+                with wave.open(segment_path, 'wb') as segment:
+                    segment.setparams(params)
+                    segment.writeframes(frames)
+                segments.append(segment_path)
+        return segments or [path]
+    except (wave.Error, EOFError, OSError) as e:
+        logger.debug(f"Playing {path} unsplit: {e}")
+        return [path]
+
+
+# Example usage
+if __name__ == "__main__":
+    import math
+    import time
+    from array import array
+    
+    logging.basicConfig(level=logging.INFO)
+    
+    read_fd, write_fd = os.pipe()
+    stream = EAGIAudioStream(fd=read_fd, vad=VoiceActivityDetector(engine='energy')).start()
+    stream.arm()
+    
+    def tone(amplitude: int) -> bytes:
+        return array('h', (int(amplitude * math.sin(i / 3.0)) for i in range(160))).tobytes()
+    
+    # 0.4 s silence, 1.2 s speech, 1 s silence
+    for frame in [tone(50)] * 20 + [tone(3000)] * 60 + [tone(50)] * 50:
+        os.write(write_fd, frame)
+        time.sleep(0.001)
+    
+    audio = stream.wait_utterance(max_seconds=10, no_input_seconds=5)
+    print(f"Utterance: {len(audio) / 2 / EAGI_SAMPLE_RATE:.2f}s of audio")
+    os.close(write_fd)
@@ -0,0 +1,134 @@
+"""
+Follow-up Question Planner for AI Call Intake System.
+Slot filling over the incident analysis: asks only for details that are still missing or doubtful.
+"""
+
+import re
+import logging
+from typing import Any, Dict, List, Optional
+
+from services.incident_extractor import IncidentExtractor
+
+logger = logging.getLogger(__name__)
+
+
+# Address values the LLM and classifier use for "unknown"
+UNKNOWN_ADDRESSES = {'', 'не указан', 'не указано', 'неизвестно', 'unknown', 'not specified', 'n/a', 'белгісіз'}
+
+# Categories where "no weapons" is only trusted when the caller talked about weapons
+VIOLENT_CATEGORIES = {'assault', 'violence', 'robbery', 'domestic', 'domestic_violence', 'threat', 'murder'}
+
+# Weapon mentions, including negated ones ("ножа нет", "қару жоқ")
+_WEAPON_WORDS = re.compile(
+    r'\b(?:нож\w*|пистолет\w*|оружи\w*|ружь\w*|автомат\w*|бит[аоуы]\w*|топор\w*|стреля\w*|'
+    r'пышақ\w*|қару\w*|мылтық\w*|knife|knives|gun\w*|weapon\w*)'
+)
+
+
+class FollowUpPlanner:
+    """
+    Chooses the next follow-up question of one call.
+    
+    A slot is missing when the analysis has no usable value for it and
+    doubtful when the value is probably a default rather than something
+    the caller said:
+    
+    - address: unknown placeholder, or an address the LLM reported although
+      neither a street, a house number nor a landmark occurs in the caller's words
+    - current_danger: absent, or "no danger" for a high/critical urgency
+    - weapons: absent, or "no weapons" in a violent category without any
+      mention of weapons by the caller
+    - people_involved: absent or zero
+    
+    Every slot is asked at most once; when no open slot is left the record
+    is complete and the dialog stops.
+    """
+    
+    def __init__(self, extractor: Optional[IncidentExtractor] = None):
+        """
+        Initialize planner.
+        
+        Args:
+            extractor: Incident detail extractor used to check the address (new one by default)
+        """
+        self.extractor = extractor or IncidentExtractor()
+        self.asked: List[str] = []
+    
+    def missing_slots(self, analysis: Dict[str, Any], transcript: str = "") -> List[str]:
+        """
+        List required slots that are missing or doubtful.
+        
+        Args:
+            analysis: Current structured analysis
+            transcript: Everything the caller said so far
+        
+        Returns:
+            Slot names in asking order
+        """
+        text = transcript.lower()
+        missing = []
+        
+        address = str(analysis.get('address') or '').strip().lower()
+        if address in UNKNOWN_ADDRESSES:
+            missing.append('address')
+        elif text:
+            details = self.extractor.extract(transcript)
+            if not (details.street or details.house or details.landmark):
+                missing.append('address')
+        
+        danger = analysis.get('current_danger')
+        if danger is None or (danger is False and analysis.get('urgency') in ('critical', 'high')):
+            missing.append('current_danger')
+        
+        weapons = analysis.get('weapons')
+        if weapons is None or (weapons is False and analysis.get('category') in VIOLENT_CATEGORIES
+                               and not _WEAPON_WORDS.search(text)):
+            missing.append('weapons')
+        
+        try:
+            people = int(analysis.get('people_involved') or 0)
+        except (TypeError, ValueError):
+            people = 0
+        if people <= 0:
+            missing.append('people_involved')
+        
+        return missing
+    
+    def next_slot(self, analysis: Dict[str, Any], transcript: str = "") -> Optional[str]:
+        """
+        Pick the next slot to ask for and mark it as asked.
+        
+        Args:
+            analysis: Current structured analysis
+            transcript: Everything the caller said so far
+        
+        Returns:
+            Slot name, or None when the record is complete
+        """
+        for slot in self.missing_slots(analysis, transcript):
+            if slot not in self.asked:
+                self.asked.append(slot)
+                return slot
+        return None
+
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
+    planner = FollowUpPlanner()
+    transcript = "Драка во дворе на улице Абая, дом 15"
+    analysis = {
+        "urgency": "high",
+        "category": "assault",
+        "address": "ул. Абая, д. 15",
+        "current_danger": True,
+        "people_involved": 0,
+        "weapons": False
+    }
+    
+    print(f"Missing: {planner.missing_slots(analysis, transcript)}")
+    slot = planner.next_slot(analysis, transcript)
+    while slot:
+        print(f"Ask for: {slot}")
+        slot = planner.next_slot(analysis, transcript)
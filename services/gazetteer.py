@@ -0,0 +1,405 @@
+"""
+Gazetteer Service for AI Call Intake System.
+Offline street index that normalizes free-text addresses to street IDs and coordinates.
+"""
+
+import os
+import re
+import csv
+import mmap
+import struct
+import bisect
+import logging
+import threading
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+MAGIC = b'GZT1'
+HEADER = struct.Struct('<4sII')          # magic, record count, key count
+RECORD = struct.Struct('<qddII')         # street id, latitude, longitude, name offset, name length
+OFFSET = struct.Struct('<I')
+
+# Street type words removed before matching ("ул. Абая" and "Абай көшесі" both become "абая"/"абай")
+STREET_TYPES = (
+    r'улица|улице|улицы|улицу|ул|проспект\w*|пр-т|пр|переулок|пер|микрорайон\w*|мкр|'
+    r'бульвар\w*|б-р|площадь|пл|шоссе|көше\w*|даңғыл\w*|шағын\s*аудан\w*|около|возле'
+)
+
+_STREET_TYPE_PATTERN = re.compile(rf'\b(?:{STREET_TYPES})\b\.?')
+_HOUSE_PATTERN = re.compile(r'(?:,|\s)\s*(?:дом|д|үй\w*)?\.?\s*№?\s*(\d+(?:/\d+)?[а-яәa-z]?)\s*(?:-?\s*үй\w*)?\s*$')
+_PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+_SPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, fold ё, drop street type words and punctuation."""
+    name = name.lower().replace('ё', 'е')
+    name = _STREET_TYPE_PATTERN.sub(' ', name)
+    name = _PUNCTUATION_PATTERN.sub(' ', name)
+    return _SPACE_PATTERN.sub(' ', name).strip()
+
+
+def split_address(address: str) -> Tuple[str, Optional[str]]:
+    """
+    Split free-text address into normalized street name and house number.
+    
+    Args:
+        address: Address such as "ул. Абая, д. 15" or "Абай көшесі 15 үй"
+    
+    Returns:
+        Tuple of (normalized street name, house number or None)
+    """
+    text = address.lower().strip()
+    house = None
+    match = _HOUSE_PATTERN.search(text)
+    if match:
+        house = match.group(1)
+        text = text[:match.start()]
+    return normalize_name(text), house
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, giving up (returning limit + 1) once it exceeds ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class GeoMatch(NamedTuple):
+    """Canonical street resolved from a free-text address."""
+    street_id: int
+    name: str
+    latitude: float
+    longitude: float
+    house: Optional[str]
+    match: str       # exact, prefix or fuzzy
+
+
+class _KeyArray:
+    """
+    Sequence view over the sorted keys in the index file, for bisect.
+    
+    Items are UTF-8 bytes: byte order equals code point order, so keys can be
+    compared without decoding.
+    """
+    
+    def __init__(self, buffer, offsets_start: int, blob_start: int, count: int):
+        self._buffer = buffer
+        self._offsets_start = offsets_start
+        self._blob_start = blob_start
+        self._count = count
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __getitem__(self, index: int) -> bytes:
+        start, end = struct.unpack_from('<II', self._buffer, self._offsets_start + index * OFFSET.size)
+        return self._buffer[self._blob_start + start:self._blob_start + end]
+
+
+class Gazetteer:
+    """
+    Memory-mapped street index with exact, prefix and fuzzy lookup.
+    
+    The index file holds the street records and all normalized names and
+    aliases as one sorted key array. Sorted keys are a flattened trie: a
+    prefix is a contiguous range found by binary search, so exact and prefix
+    lookups touch only O(log n) keys of the mapped file and the OS page cache
+    is shared by every process using the same index. A trigram index for
+    fuzzy matching (misrecognized street names) is built in memory on first use.
+    
+    Build the index once from a CSV (for example an OSM extract of named
+    streets) with ``Gazetteer.build``.
+    """
+    
+    def __init__(self, index_path: str):
+        """
+        Open gazetteer index.
+        
+        Args:
+            index_path: Path to an index file produced by ``Gazetteer.build``
+        """
+        self.index_path = index_path
+        self._file = open(index_path, 'rb')
+        self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, self.record_count, self.key_count = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a gazetteer index: {index_path}")
+        
+        self._records_start = HEADER.size
+        self._key_records_start = self._records_start + self.record_count * RECORD.size
+        key_offsets_start = self._key_records_start + self.key_count * OFFSET.size
+        key_blob_start = key_offsets_start + (self.key_count + 1) * OFFSET.size
+        key_blob_size = OFFSET.unpack_from(self._buffer, key_offsets_start + self.key_count * OFFSET.size)[0]
+        self._names_start = key_blob_start + key_blob_size
+        
+        self._keys = _KeyArray(self._buffer, key_offsets_start, key_blob_start, self.key_count)
+        self._trigrams: Optional[Dict[str, List[int]]] = None  # Built on the first fuzzy lookup
+        self._trigrams_lock = threading.Lock()
+        
+        logger.info(f"Gazetteer loaded: {self.record_count} streets, {self.key_count} keys from {index_path}")
+    
+    @staticmethod
+    def build(csv_path: str, index_path: str) -> int:
+        """
+        Compile gazetteer CSV into an index file.
+        
+        The CSV needs the columns ``street_id``, ``name``, ``latitude`` and
+        ``longitude``; an optional ``aliases`` column holds alternative names
+        (other languages, old names) separated by ``|``.
+        
+        Args:
+            csv_path: Source CSV
+            index_path: Output index file
+        
+        Returns:
+            Number of indexed streets
+        """
+        records = []
+        keys: Dict[str, int] = {}
+        
+        with open(csv_path, 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                record_index = len(records)
+                records.append((int(row['street_id']), float(row['latitude']),
+                                float(row['longitude']), row['name'].strip()))
+                names = [row['name']] + [a for a in (row.get('aliases') or '').split('|') if a.strip()]
+                for name in names:
+                    key = normalize_name(name)
+                    if key:
+                        # First record wins for duplicate names
+                        keys.setdefault(key, record_index)
+        
+        sorted_keys = sorted(keys)
+        names_blob = bytearray()
+        record_bytes = bytearray()
+        for street_id, latitude, longitude, name in records:
+            encoded = name.encode('utf-8')
+            record_bytes += RECORD.pack(street_id, latitude, longitude, len(names_blob), len(encoded))
+            names_blob += encoded
+        
+        key_blob = bytearray()
+        key_offsets = bytearray()
+        for key in sorted_keys:
+            key_offsets += OFFSET.pack(len(key_blob))
+            key_blob += key.encode('utf-8')
+        key_offsets += OFFSET.pack(len(key_blob))
+        
+        tmp_path = index_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(records), len(sorted_keys)))
+            f.write(record_bytes)
+            f.write(b''.join(OFFSET.pack(keys[key]) for key in sorted_keys))
+            f.write(key_offsets)
+            f.write(key_blob)
+            f.write(names_blob)
+        os.replace(tmp_path, index_path)
+        
+        logger.info(f"Gazetteer index built: {len(records)} streets, {len(sorted_keys)} keys -> {index_path}")
+        return len(records)
+    
+    def _record(self, record_index: int, house: Optional[str], match: str) -> GeoMatch:
+        """Decode street record."""
+        street_id, latitude, longitude, name_offset, name_length = RECORD.unpack_from(
+            self._buffer, self._records_start + record_index * RECORD.size
+        )
+        start = self._names_start + name_offset
+        name = bytes(self._buffer[start:start + name_length]).decode('utf-8')
+        return GeoMatch(street_id, name, latitude, longitude, house, match)
+    
+    def _key_record(self, key_index: int) -> int:
+        """Record index a key points to."""
+        return OFFSET.unpack_from(self._buffer, self._key_records_start + key_index * OFFSET.size)[0]
+    
+    def key(self, index: int) -> str:
+        """Normalized key at ``index``."""
+        return self._keys[index].decode('utf-8')
+    
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        """Range of key indices starting with ``prefix``."""
+        encoded = prefix.encode('utf-8')
+        start = bisect.bisect_left(self._keys, encoded)
+        # 0xff never occurs in UTF-8, so it sorts after every continuation of the prefix
+        end = bisect.bisect_left(self._keys, encoded + b'\xff', lo=start)
+        return start, end
+    
+    def iter_prefix(self, prefix: str) -> Iterator[str]:
+        """Iterate keys starting with ``prefix`` in sorted order."""
+        start, end = self.prefix_range(prefix)
+        for i in range(start, end):
+            yield self.key(i)
+    
+    def lookup(self, address: str, fuzzy: bool = True) -> Optional[GeoMatch]:
+        """
+        Resolve free-text address to a canonical street.
+        
+        Tries an exact key match, then keys sharing the name's stem (handles
+        declension: "Абая" / "Абай"), then trigram candidates within a small
+        edit distance.
+        
+        Args:
+            address: Address text, e.g. "ул. Абая, д. 15"
+            fuzzy: Allow approximate matches
+        
+        Returns:
+            Matched street (with the house number from the address) or None
+        """
+        if not address or address in ('не указан', 'not specified', 'көрсетілмеген'):
+            return None
+        
+        name, house = split_address(address)
+        if not name:
+            return None
+        
+        encoded = name.encode('utf-8')
+        position = bisect.bisect_left(self._keys, encoded)
+        if position < self.key_count and self._keys[position] == encoded:
+            return self._record(self._key_record(position), house, 'exact')
+        
+        if not fuzzy:
+            return None
+        
+        # Same stem, different ending: at most two trailing characters differ
+        limit = max(1, len(name) // 5)
+        stem = name[:-2] if len(name) > 4 else name[:-1]
+        best = None
+        start, end = self.prefix_range(stem)
+        for i in range(start, min(end, start + 50)):
+            distance = edit_distance(name, self.key(i), limit)
+            if distance <= limit and (best is None or distance < best[0]):
+                best = (distance, i)
+        if best:
+            return self._record(self._key_record(best[1]), house, 'prefix')
+        
+        best = None
+        for i in self._fuzzy_candidates(name):
+            distance = edit_distance(name, self.key(i), limit)
+            if distance <= limit and (best is None or distance < best[0]):
+                best = (distance, i)
+        if best:
+            return self._record(self._key_record(best[1]), house, 'fuzzy')
+        
+        return None
+    
+    def _fuzzy_candidates(self, name: str, max_candidates: int = 20) -> List[int]:
+        """Keys sharing the most trigrams with ``name``."""
+        trigrams = self._trigram_index()
+        counts: Dict[int, int] = {}
+        for trigram in self._trigrams_of(name):
+            for i in trigrams.get(trigram, ()):
+                counts[i] = counts.get(i, 0) + 1
+        return sorted(counts, key=counts.get, reverse=True)[:max_candidates]
+    
+    def _trigram_index(self) -> Dict[str, List[int]]:
+        """
+        Trigram -> key numbers, built once on first use.
+        
+        The index is filled in a local dict and published under a lock, so
+        a concurrent lookup never sees a partial index and only one thread
+        pays for the build.
+        """
+        trigrams = self._trigrams
+        if trigrams is not None:
+            return trigrams
+        
+        with self._trigrams_lock:
+            if self._trigrams is None:
+                trigrams = {}
+                for i in range(self.key_count):
+                    for trigram in self._trigrams_of(self.key(i)):
+                        trigrams.setdefault(trigram, []).append(i)
+                self._trigrams = trigrams
+            return self._trigrams
+    
+    @staticmethod
+    def _trigrams_of(text: str) -> Set[str]:
+        padded = f'  {text} '
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+    
+    def close(self):
+        """Unmap index file."""
+        self._buffer.close()
+        self._file.close()
+
+
+_default_gazetteer = None
+_default_gazetteer_loaded = False
+
+
+def get_default_gazetteer() -> Optional[Gazetteer]:
+    """
+    Process-wide gazetteer from $GAZETTEER_INDEX, or None when not configured.
+    
+    Opened once per process; the mapped pages are shared between processes.
+    """
+    global _default_gazetteer, _default_gazetteer_loaded
+    if not _default_gazetteer_loaded:
+        _default_gazetteer_loaded = True
+        index_path = os.getenv('GAZETTEER_INDEX', '/var/lib/ai-call-intake/gazetteer.idx')
+        if os.path.exists(index_path):
+            try:
+                _default_gazetteer = Gazetteer(index_path)
+            except Exception as e:
+                logger.error(f"Failed to load gazetteer {index_path}: {e}")
+        else:
+            logger.info(f"Gazetteer index {index_path} not found, address geocoding disabled")
+    return _default_gazetteer
+
+
+# Factory function for easy instantiation
+def create_gazetteer(index_path: str = None):
+    """Create and return gazetteer instance."""
+    return Gazetteer(index_path or os.getenv('GAZETTEER_INDEX', '/var/lib/ai-call-intake/gazetteer.idx'))
+
+
+if __name__ == "__main__":
+    import json
+    import argparse
+    
+    logging.basicConfig(level=logging.INFO)
+    
+    parser = argparse.ArgumentParser(description="Build and query the offline street gazetteer")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    build_parser = subparsers.add_parser('build', help="Compile CSV (street_id,name,latitude,longitude[,aliases])")
+    build_parser.add_argument('csv_path')
+    build_parser.add_argument('index_path')
+    
+    lookup_parser = subparsers.add_parser('lookup', help="Resolve addresses")
+    lookup_parser.add_argument('index_path')
+    lookup_parser.add_argument('addresses', nargs='+')
+    
+    backfill_parser = subparsers.add_parser('backfill', help="Fill coordinates of stored calls")
+    backfill_parser.add_argument('index_path')
+    backfill_parser.add_argument('--db', default=None, help="Path to calls SQLite database (default: $CALL_LOG_DB)")
+    backfill_parser.add_argument('--all', action='store_true', help="Also re-resolve calls that have coordinates")
+    
+    args = parser.parse_args()
+    
+    if args.command == 'build':
+        Gazetteer.build(args.csv_path, args.index_path)
+    elif args.command == 'lookup':
+        gazetteer = Gazetteer(args.index_path)
+        for address in args.addresses:
+            match = gazetteer.lookup(address)
+            print(f"{address} -> {json.dumps(match._asdict() if match else None, ensure_ascii=False)}")
+    else:
+        from services.logger import CallLogger
+        
+        call_logger = CallLogger(args.db, gazetteer=Gazetteer(args.index_path))
+        print(json.dumps(call_logger.backfill_locations(only_missing=not args.all), indent=2))
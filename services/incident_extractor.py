@@ -0,0 +1,182 @@
+"""
+Incident Detail Extractor for AI Call Intake System.
+Single-pass extraction of street, house, landmark and head count from Russian and Kazakh text.
+"""
+
+import re
+import logging
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# A word of a street or landmark name (letters, may contain hyphens)
+_WORD = r'[^\W\d_][\w-]*'
+
+# Words that end a name instead of being part of it
+_STOP = (
+    r'(?:дом\w*|д|үй\w*|кв|квартира|возле|около|рядом|напротив|у|в|во|на|по|и|а|там|где|что|'
+    r'номер|здесь|сейчас|тут|жанында|көше\w*|улица|улице|улицы|улицу)'
+)
+
+# Titles that continue a name ("Төле би", "Қабанбай батыр", "Абылай хана")
+_NAME_SUFFIX = r'(?:би|батыр[аеу]?|хан[аеу]?|ата|жолы)'
+
+# A capitalized word; the case check is exempt from the pattern's IGNORECASE flag
+_CAPITAL_WORD = r'(?-i:[A-ZА-ЯЁӘҒҚҢӨҰҮҺІ])[\w-]*'
+
+# A second word belongs to the name only if it is a title or capitalized ("Карла Маркса"),
+# so "на улице Абая мужчина" does not take the next noun
+_NAME = rf'(?!{_STOP}\b){_WORD}(?:\s+(?:{_NAME_SUFFIX}\b|(?!{_STOP}\b){_CAPITAL_WORD}))?'
+
+# Names before "көшесі" are one word unless followed by a title
+_KZ_NAME = rf'(?!{_STOP}\b){_WORD}(?:\s+{_NAME_SUFFIX}\b)?'
+
+# Nouns that follow a head count (Russian stems and Kazakh "адам")
+_PEOPLE = r'(?:человек|чел\b|люд|мужчин|женщин|дет|ребен|парн|девуш|подрост|адам)\w*'
+
+_HOUSE_NUMBER = rf'\d+(?:/\d+)?[а-яә]?\b(?!\s*-?\s*{_PEOPLE})'
+
+# House number right after a street name: ", дом 15", " д. 15", " 15", " 15-үй"
+_HOUSE_TAIL = rf'(?:\s*,?\s*(?:(?:дом|д\.|үй\w*)\s*№?\s*)?(?P<{{name}}>{_HOUSE_NUMBER})(?:\s*-?\s*(?:үй|дом)\w*)?)?'
+
+_NUMBER_WORDS = {
+    'один': 1, 'одна': 1, 'двое': 2, 'два': 2, 'две': 2, 'трое': 3, 'три': 3,
+    'четверо': 4, 'четыре': 4, 'пятеро': 5, 'пять': 5, 'шестеро': 6, 'шесть': 6,
+    'бір': 1, 'екі': 2, 'үш': 3, 'төрт': 4, 'бес': 5, 'алты': 6,
+}
+
+# Head counts implied by vague wording, used only without an explicit number
+_VAGUE_COUNTS = {'пара': 2, 'несколько': 3, 'много': 5, 'толпа': 5, 'бірнеше': 3, 'көп': 5}
+
+_ALTERNATIVES = [
+    # "улица Абая, дом 15", "ул. Абая 15", "по улице Абая", "проспект Достык 5"
+    ('street_before',
+     rf'\b(?:улиц[аеуы]|ул\.|проспект\w*|пр\.|пр-т|мкр\.?|микрорайон\w*)\s*(?P<street_before_name>{_NAME})'
+     + _HOUSE_TAIL.format(name='street_before_house')),
+    # "Абай көшесі 15 үй", "Абай көшесіндегі 15-үйде", "Абай даңғылы"
+    ('street_after',
+     rf'\b(?P<street_after_name>{_KZ_NAME})\s+(?:көше\w*|даңғыл\w*)\b'
+     + _HOUSE_TAIL.format(name='street_after_house')),
+    # "15 дом на Абая"
+    ('house_on',
+     rf'\b(?P<house_on_number>\d+[а-яә]?)\s*-?\s*дом\w*\s+на\s+(?P<house_on_street>{_NAME})'),
+    # "дом 15", "д. 15", "в доме 15", "үй 15"
+    ('house',
+     rf'\b(?:дом\w*|д\.|үй\w*)\s*№?\s*(?P<house_number>{_HOUSE_NUMBER})'),
+    # "15 дом", "15-үй", "15 үйде"
+    ('house_after',
+     r'\b(?P<house_after_number>\d+[а-яә]?)\s*-?\s*(?:дом|үй\w*)\b'),
+    # "возле магазина", "рядом с рынком", "мектеп жанында"
+    ('landmark',
+     rf'\b(?:возле|около|рядом\s+со?|напротив)\s+(?P<landmark_name>{_NAME})'),
+    ('landmark_kz',
+     rf'\b(?P<landmark_kz_name>(?!{_STOP}\b){_WORD})\s+жанында\b'),
+    # "5 человек", "3 мужчин", "2 адам"
+    ('count',
+     rf'\b(?P<count_number>\d+)\s*-?\s*{_PEOPLE}'),
+    # "двое мужчин", "екі адам"
+    ('count_word',
+     rf'\b(?P<count_word_number>{"|".join(_NUMBER_WORDS)})\s+{_PEOPLE}'),
+    ('count_vague',
+     rf'\b(?P<count_vague_word>{"|".join(_VAGUE_COUNTS)})\b'),
+]
+
+
+class ExtractedDetails(NamedTuple):
+    """Location and head count found in an incident description."""
+    street: Optional[str]
+    house: Optional[str]
+    landmark: Optional[str]
+    people: int
+    
+    @property
+    def address(self) -> str:
+        """Address in the format used by the classifier ('не указан' if none)."""
+        if self.street and self.house:
+            return f"ул. {self.street}, д. {self.house}"
+        if self.street:
+            return f"ул. {self.street}"
+        if self.house:
+            return f"д. {self.house}"
+        if self.landmark:
+            return f"около {self.landmark}"
+        return 'не указан'
+
+
+class IncidentExtractor:
+    """
+    Extracts street, house number, landmark and number of people in one pass.
+    
+    All patterns are compiled into a single alternation with named groups and
+    the text is scanned once with ``finditer``; the first street, house,
+    landmark and count found are kept. Explicit numbers of people take
+    precedence over vague wording ("несколько", "толпа"). Matching ignores
+    case except for the second word of a name, so in lowercased text only
+    titles extend a name. Results are lowercase.
+    """
+    
+    _pattern = re.compile('|'.join(f'(?P<{name}>{regex})' for name, regex in _ALTERNATIVES), re.IGNORECASE)
+    
+    def extract(self, text: str) -> ExtractedDetails:
+        """
+        Extract incident details.
+        
+        Args:
+            text: Incident description (any case)
+        
+        Returns:
+            Extracted details; missing parts are None (people: 0)
+        """
+        street = house = landmark = None
+        people = vague_people = 0
+        
+        for match in self._pattern.finditer(text):
+            kind = match.lastgroup
+            group = lambda name: (match.group(name) or '').lower() or None
+            
+            if kind in ('street_before', 'street_after', 'house_on'):
+                if kind == 'house_on':
+                    name, number = group('house_on_street'), group('house_on_number')
+                else:
+                    name, number = group(f'{kind}_name'), group(f'{kind}_house')
+                if street is None:
+                    street = name.strip()
+                if house is None and number:
+                    house = number
+            elif kind in ('house', 'house_after'):
+                if house is None:
+                    house = group(f'{kind}_number')
+            elif kind in ('landmark', 'landmark_kz'):
+                if landmark is None:
+                    landmark = group(f'{kind}_name').strip()
+            elif kind == 'count':
+                if not people:
+                    people = int(group('count_number'))
+            elif kind == 'count_word':
+                if not people:
+                    people = _NUMBER_WORDS[group('count_word_number')]
+            elif kind == 'count_vague':
+                if not vague_people:
+                    vague_people = _VAGUE_COUNTS[group('count_vague_word')]
+        
+        return ExtractedDetails(street, house, landmark, people or vague_people)
+
+
+# Factory function for easy instantiation
+def create_extractor():
+    """Create and return extractor instance."""
+    return IncidentExtractor()
+
+
+# Example usage
+if __name__ == "__main__":
+    extractor = IncidentExtractor()
+    for sample in [
+        "Мужчина избивает женщину во дворе, улица Абая, дом 15, там 2 человека",
+        "Ер адам әйел адамға Абай көшесіндегі 15-үйде айқайлады",
+        "Пожар возле рынка, много людей",
+        "дом 7 по улице Толе би",
+    ]:
+        details = extractor.extract(sample)
+        print(f"{sample}\n  -> {details.address}, people: {details.people}")
@@ -0,0 +1,525 @@
+"""
+Inference Pool for AI Call Intake System.
+Runs STT/TTS models in dedicated worker processes fed through shared memory.
+"""
+
+import os
+import time
+import queue
+import atexit
+import signal
+import logging
+import threading
+import itertools
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# True inside an inference worker: services there run their models locally
+_in_worker = False
+
+
+class SharedAudioRing:
+    """
+    Ring of fixed-size audio slots in shared memory.
+    
+    The client copies an utterance into the next free slot and sends only
+    the slot number and length to a worker, which reads the audio straight
+    from shared memory. Slots are handed out in ring order and return to
+    the ring when the worker's result arrives; writers wait while all
+    slots are in flight. Several client processes share one ring by each
+    claiming its own range of slots after the fork.
+    """
+    
+    def __init__(self, slots: int = 16, slot_bytes: int = 4 * 1024 * 1024):
+        """
+        Initialize ring.
+        
+        Args:
+            slots: Number of utterances in flight at the same time
+            slot_bytes: Largest utterance (4 MB is about 2 minutes of 16 kHz 16-bit PCM)
+        """
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        self._claimed = slots
+        self._free = deque(range(slots))
+        self._available = threading.Semaphore(slots)
+        self._lock = threading.Lock()
+    
+    def write(self, data: bytes, timeout: Optional[float] = None) -> int:
+        """
+        Copy data into a free slot.
+        
+        Args:
+            data: Audio bytes
+            timeout: Time to wait for a free slot (None waits forever)
+        
+        Returns:
+            Slot number
+        
+        Raises:
+            ValueError: Data does not fit into a slot
+            TimeoutError: No slot became free in time
+        """
+        if len(data) > self.slot_bytes:
+            raise ValueError(f"Audio of {len(data)} bytes exceeds the {self.slot_bytes} byte slot")
+        if not self._available.acquire(timeout=timeout):
+            raise TimeoutError("No free audio slot")
+        
+        with self._lock:
+            slot = self._free.popleft()
+        offset = slot * self.slot_bytes
+        self.shm.buf[offset:offset + len(data)] = data
+        return slot
+    
+    def claim(self, first: int, count: int):
+        """Use only slots first..first+count-1 in this process (client side, after fork)."""
+        self._claimed = count
+        self._free = deque(range(first, first + count))
+        self._available = threading.Semaphore(count)
+        self._lock = threading.Lock()
+    
+    def read(self, slot: int, length: int) -> bytes:
+        """Read data from a slot (worker side)."""
+        offset = slot * self.slot_bytes
+        return bytes(self.shm.buf[offset:offset + length])
+    
+    def release(self, slot: int):
+        """Return a slot to the ring."""
+        with self._lock:
+            self._free.append(slot)
+        self._available.release()
+    
+    def in_flight(self) -> int:
+        """Number of this process's slots currently in use."""
+        with self._lock:
+            return self._claimed - len(self._free)
+    
+    def close(self):
+        """Free the shared memory (owner side)."""
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def default_handlers() -> Dict[str, Callable]:
+    """
+    Build the STT and TTS handlers of a worker.
+    
+    Models preloaded by the pre-fork master are inherited copy-on-write;
+    otherwise each worker loads its own.
+    """
+    from services.prefork import preloaded_models
+    from services.stt_service import STTService
+    from services.tts_service import TTSService
+    
+    models = preloaded_models()
+    language = os.getenv("DEFAULT_LANGUAGE", "kk")
+    stt = models.get("stt") or STTService(engine=os.getenv("STT_ENGINE", "whisper"), language=language)
+    tts = models.get("tts") or TTSService(engine=os.getenv("TTS_ENGINE", "coqui"), language=language)
+    
+    return {
+        'stt': lambda audio, language="ru": stt.transcribe(audio, language),
+        'tts': lambda _, text="", language="ru", output_format="wav": tts.text_to_speech(text, language, output_format)
+    }
+
+
+def _worker_main(index: int, ring: SharedAudioRing, requests, results, state: Dict[str, Any],
+                 handlers_factory: Callable):
+    """
+    Inference worker: load models, then serve requests until None arrives.
+    
+    The worker reports its load status in ``state['status'][index]`` (1
+    ready, -1 failed) and holds the id and client of the request being
+    served in ``state['current']``/``state['client']`` (-1 when idle), so
+    the owner can fail that request if the worker dies mid-request.
+    """
+    global _in_worker
+    _in_worker = True
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # The owner decides when workers stop
+    
+    try:
+        handlers = handlers_factory()
+    except Exception as e:
+        logger.error(f"Inference worker {index} failed to load models: {e}")
+        state['error'].value = str(e).encode(errors='replace')[:len(state['error']) - 1]
+        state['status'][index] = -1
+        return
+    state['status'][index] = 1
+    
+    while True:
+        item = requests.get()
+        if item is None:
+            break
+        request_id, client, kind, slot, length, params = item
+        state['client'][index] = client
+        state['current'][index] = request_id
+        try:
+            payload = ring.read(slot, length) if slot is not None else None
+            results[client].put((request_id, True, handlers[kind](payload, **params)))
+        except Exception as e:
+            results[client].put((request_id, False, f"{type(e).__name__}: {e}"))
+        state['current'][index] = -1
+
+
+class InferencePool:
+    """
+    Fixed pool of worker processes that own the STT/TTS models.
+    
+    Inference is CPU-bound and holds the GIL, so running it in threads of
+    a web worker stalls request handling. Here web code only copies audio
+    into the shared ring and waits on a future; a collector thread resolves
+    futures from the result queue. Workers are forked on Linux, so models
+    preloaded before the fork are shared, and restarted if they die.
+    
+    One pool serves every pre-fork web worker: the master creates it with
+    ``clients`` set to the number of web workers before forking them, and
+    each web worker calls ``attach(index)``, which gives it its own result
+    queue and share of the ring. With ``clients=1`` the creating process
+    is the only client and attaches right away.
+    """
+    
+    def __init__(self, workers: int = 2, slots: int = 16, slot_bytes: int = 4 * 1024 * 1024,
+                 timeout: float = 60.0, handlers_factory: Callable[[], Dict[str, Callable]] = default_handlers,
+                 clients: int = 1):
+        """
+        Initialize pool.
+        
+        Args:
+            workers: Number of inference processes (at most the number of cores to be useful)
+            slots: Utterances in flight at the same time, split between clients
+            slot_bytes: Largest utterance in bytes
+            timeout: Time to wait for a result
+            handlers_factory: Called in each worker, returns {"stt": fn(audio, **params), "tts": fn(None, **params)}
+            clients: Number of processes that will attach to the pool
+        """
+        self.workers = workers
+        self.timeout = timeout
+        self.handlers_factory = handlers_factory
+        self.clients = clients
+        self.ring = SharedAudioRing(slots=max(slots, clients), slot_bytes=slot_bytes)
+        self.pid = os.getpid()
+        
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+        self._requests = self._context.Queue()
+        self._results = [self._context.Queue() for _ in range(clients)]
+        self._state = {
+            'status': self._context.RawArray('b', workers),  # 0 loading, 1 ready, -1 failed to load
+            'current': self._context.RawArray('q', [-1] * workers),  # Request id each worker is serving
+            'client': self._context.RawArray('i', [-1] * workers),  # Client that request came from
+            'error': self._context.RawArray('c', 512)  # Last model load error
+        }
+        self._processes = {}
+        self._closed = False
+        self.client = None
+        self._client_pid = None
+        
+        for index in range(workers):
+            self._spawn(index)
+        self._supervisor = threading.Thread(target=self._supervise, name='inference-supervisor', daemon=True)
+        self._supervisor.start()
+        logger.info(f"InferencePool started: {workers} workers, {self.ring.slots} slots of "
+                    f"{slot_bytes // 1024} KB, {clients} client(s)")
+        
+        if clients == 1:
+            self.attach(0)
+    
+    def _spawn(self, index: int):
+        """Start one worker process."""
+        process = self._context.Process(
+            target=_worker_main, name=f'inference-{index}',
+            args=(index, self.ring, self._requests, self._results, self._state, self.handlers_factory),
+            daemon=True
+        )
+        process.start()
+        self._processes[index] = process
+    
+    def attach(self, client: int):
+        """
+        Make this process client number ``client`` of the pool.
+        
+        Called in each web worker after the fork; the client gets its own
+        result queue, an equal share of the ring and a collector thread.
+        A restarted web worker attaches under the index of the one it
+        replaces.
+        
+        Args:
+            client: Client index, 0..clients-1
+        """
+        if not 0 <= client < self.clients:
+            raise ValueError(f"Client {client} out of range for a pool with {self.clients} clients")
+        
+        per_client = self.ring.slots // self.clients
+        self.ring.claim(client * per_client, per_client)
+        self.client = client
+        self._client_pid = os.getpid()
+        self._pending: Dict[int, tuple] = {}
+        self._pending_lock = threading.Lock()
+        self._ids = itertools.count((os.getpid() & 0xFFFFFF) << 32)  # Unique across restarted clients
+        self.completed = 0
+        self.failed = 0
+        self._collector = threading.Thread(target=self._collect, name='inference-results', daemon=True)
+        self._collector.start()
+    
+    @property
+    def attached(self) -> bool:
+        """Whether this process is a client of the pool."""
+        return self._client_pid == os.getpid()
+    
+    @property
+    def load_error(self) -> Optional[str]:
+        """Model load error reported by a worker, if any."""
+        return self._state['error'].value.decode(errors='replace') or None
+    
+    def _ready_count(self) -> int:
+        """Number of workers with their models loaded."""
+        return sum(status == 1 for status in self._state['status'])
+    
+    def _load_failed(self) -> bool:
+        """Whether every worker failed to load its models."""
+        return all(status == -1 for status in self._state['status'])
+    
+    def submit(self, kind: str, payload: Optional[bytes] = None, **params) -> Future:
+        """
+        Queue an inference request.
+        
+        Args:
+            kind: Handler name ("stt" or "tts")
+            payload: Audio for the shared ring (None for text requests)
+            **params: Handler arguments sent over the queue
+        
+        Returns:
+            Future with the handler result
+        """
+        if self._closed:
+            raise RuntimeError("Inference pool is closed")
+        if not self.attached:
+            raise RuntimeError("Process is not attached to the inference pool")
+        if self._load_failed():
+            raise RuntimeError(f"Inference workers failed to load models: {self.load_error}")
+        
+        future = Future()
+        slot = self.ring.write(payload, timeout=self.timeout) if payload is not None else None
+        request_id = next(self._ids)
+        with self._pending_lock:
+            self._pending[request_id] = (future, slot, time.monotonic() + self.timeout)
+        self._requests.put((request_id, self.client, kind, slot, len(payload) if payload is not None else 0, params))
+        return future
+    
+    def transcribe(self, audio_data: bytes, language: str = "ru") -> str:
+        """Transcribe audio in a worker process."""
+        return self.submit('stt', audio_data, language=language).result(self.timeout)
+    
+    def text_to_speech(self, text: str, language: str = "ru", output_format: str = "wav") -> Optional[str]:
+        """Synthesize speech in a worker process; returns the audio file path."""
+        return self.submit('tts', text=text, language=language, output_format=output_format).result(self.timeout)
+    
+    def _collect(self):
+        """Resolve this client's futures from worker results and reclaim expired requests (client side)."""
+        results = self._results[self.client]
+        while not self._closed and self.attached:
+            if self._load_failed():
+                self._fail_pending(f"Inference workers failed to load models: {self.load_error}")
+            self._reclaim_expired()
+            try:
+                request_id, ok, result = results.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            
+            with self._pending_lock:
+                future, slot, _ = self._pending.pop(request_id, (None, None, None))
+            if slot is not None:
+                self.ring.release(slot)
+            if future is None:
+                continue  # Timed out already, or sent by a client this one replaced
+            if ok:
+                self.completed += 1
+                future.set_result(result)
+            else:
+                self.failed += 1
+                future.set_exception(RuntimeError(result))
+    
+    def _supervise(self):
+        """
+        Restart crashed workers (owner side); workers that could not load their models are not restarted.
+        
+        The request a worker was serving when it died is failed through
+        its client's result queue, which also returns its audio slot to
+        the ring, otherwise the slot would stay in flight for good.
+        """
+        while not self._closed:
+            time.sleep(1.0)
+            for index, process in list(self._processes.items()):
+                if process.is_alive() or self._closed or self._state['status'][index] == -1:
+                    continue
+                logger.warning(f"Inference worker {index} exited with code {process.exitcode}, restarting")
+                request_id, self._state['current'][index] = self._state['current'][index], -1
+                client = self._state['client'][index]
+                if request_id >= 0 and 0 <= client < self.clients:
+                    self._results[client].put(
+                        (request_id, False, f"Inference worker {index} died (exit code {process.exitcode})"))
+                self._state['status'][index] = 0
+                self._spawn(index)
+    
+    def close(self):
+        """
+        Stop workers and free the shared memory.
+        
+        In a client process other than the owner this only detaches: its
+        waiting requests fail and its collector stops, the workers keep
+        serving the other clients.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self.attached:
+            self._collector.join(timeout=2)  # Wakes up from the result queue within a second
+            self._fail_pending("Inference pool closed")
+        if os.getpid() != self.pid:
+            return
+        
+        for _ in self._processes:
+            self._requests.put(None)
+        for process in self._processes.values():
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.ring.close()
+    
+    def _reclaim_expired(self):
+        """
+        Fail requests that outlived the timeout and free their slots.
+        
+        Covers a worker dying after taking a request from the queue but
+        before recording it as its current one; the caller has given up on
+        such a request by now anyway.
+        """
+        now = time.monotonic()
+        with self._pending_lock:
+            expired = [request_id for request_id, (_, _, deadline) in self._pending.items() if deadline < now]
+        for request_id in expired:
+            self._fail_request(request_id, f"Inference request timed out after {self.timeout}s")
+    
+    def _fail_request(self, request_id: int, reason: str):
+        """Fail one waiting request and free its slot (no-op if its result already arrived)."""
+        with self._pending_lock:
+            future, slot, _ = self._pending.pop(request_id, (None, None, None))
+        if slot is not None:
+            self.ring.release(slot)
+        if future is not None and not future.done():
+            self.failed += 1
+            future.set_exception(RuntimeError(reason))
+    
+    def _fail_pending(self, reason: str):
+        """Fail all waiting requests of this client and free their slots."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for future, slot, _ in pending.values():
+            if slot is not None:
+                self.ring.release(slot)
+            if not future.done():
+                future.set_exception(RuntimeError(reason))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics; request counters are those of this client."""
+        stats = {
+            'workers': self.workers,
+            'clients': self.clients,
+            'ready': self._ready_count()
+        }
+        if os.getpid() == self.pid:
+            stats['alive'] = sum(process.is_alive() for process in self._processes.values())
+        if self.attached:
+            stats.update({
+                'client': self.client,
+                'pending': len(self._pending),
+                'slots_in_flight': self.ring.in_flight(),
+                'completed': self.completed,
+                'failed': self.failed
+            })
+        return stats
+
+
+_pool: Optional[InferencePool] = None
+_pool_lock = threading.Lock()
+
+
+def inference_pool_enabled() -> bool:
+    """Whether local STT/TTS models run in the inference pool ($INFERENCE_WORKERS > 0)."""
+    return not _in_worker and int(os.getenv("INFERENCE_WORKERS", 0)) > 0
+
+
+def start_inference_pool(clients: int = 1) -> Optional[InferencePool]:
+    """
+    Start the inference pool of this process and its children.
+    
+    The pre-fork master calls this before forking the web workers with
+    ``clients`` set to their number, so they all share one set of
+    inference processes instead of starting one each.
+    
+    Args:
+        clients: Number of processes that will use the pool
+    
+    Returns:
+        Pool, or None when disabled
+    """
+    global _pool
+    if not inference_pool_enabled():
+        return None
+    
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = InferencePool(
+                workers=int(os.getenv("INFERENCE_WORKERS", 2)),
+                slots=int(os.getenv("INFERENCE_SLOTS", 16)),
+                timeout=float(os.getenv("INFERENCE_TIMEOUT", 60)),
+                clients=clients
+            )
+            atexit.register(_pool.close)
+        return _pool
+
+
+def get_inference_pool() -> Optional[InferencePool]:
+    """
+    Get the inference pool for this process, starting it on first use.
+    
+    A pre-fork web worker attaches to the pool its master started, as the
+    client with its worker index; a standalone process starts its own.
+    None when the pool is disabled or inside an inference worker.
+    """
+    if not inference_pool_enabled():
+        return None
+    
+    with _pool_lock:
+        pool = _pool
+        if pool is not None and pool.pid != os.getpid() and not pool.attached:
+            from services.prefork import worker_index
+            pool.attach(worker_index())
+    if pool is not None and pool.attached:
+        return pool
+    return start_inference_pool()
+
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
+    def echo_handlers():
+        return {'stt': lambda audio, language="ru": f"{len(audio)} bytes of {language} audio in pid {os.getpid()}"}
+    
+    pool = InferencePool(workers=2, slots=4, slot_bytes=64 * 1024, handlers_factory=echo_handlers)
+    started = time.perf_counter()
+    futures = [pool.submit('stt', b'\0' * 32000, language='kk') for _ in range(8)]
+    for future in futures:
+        print(future.result(10))
+    print(f"{time.perf_counter() - started:.3f}s, {pool.get_stats()}")
+    pool.close()
@@ -0,0 +1,114 @@
+"""
+Incremental JSON Parser for AI Call Intake System.
+Yields top-level fields of a JSON object while it is still being streamed.
+"""
+
+import json
+import logging
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalJSONParser:
+    """
+    Streaming parser for a single top-level JSON object.
+    
+    Chunks are scanned once, tracking only nesting depth and string state.
+    Whenever a top-level member ends (at the following ``,`` or the closing
+    ``}``) it is decoded on its own and returned, so early fields are
+    available long before the object is complete. Text before the opening
+    brace (e.g. a markdown code fence) is skipped.
+    """
+    
+    def __init__(self):
+        """Initialize empty parser."""
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self.text = ''
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = None
+    
+    def feed(self, chunk: str) -> Dict[str, Any]:
+        """
+        Consume the next piece of the stream.
+        
+        Args:
+            chunk: Streamed text (any size, may split tokens and escapes); text
+                after the end of the object is kept in ``text`` but not parsed
+        
+        Returns:
+            Top-level fields completed by this chunk (empty dict if none)
+        """
+        if not chunk:
+            return {}
+        
+        self.text += chunk
+        if self.done:
+            return {}
+        text = self.text
+        completed = {}
+        
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            
+            if char == '"':
+                if self._depth > 0:
+                    self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+                if self._depth == 1:
+                    if char != '{':
+                        self._depth = 0
+                        continue
+                    self._member_start = i + 1
+            elif char in '}]':
+                if self._depth == 1:
+                    self._complete_member(text, i, completed)
+                    self.done = True
+                    self._pos = i + 1
+                    return completed
+                if self._depth > 0:
+                    self._depth -= 1
+            elif char == ',' and self._depth == 1:
+                self._complete_member(text, i, completed)
+                self._member_start = i + 1
+        
+        self._pos = len(text)
+        return completed
+    
+    def _complete_member(self, text: str, end: int, completed: Dict[str, Any]):
+        """Decode the ``"key": value`` member ending at ``end``."""
+        member = text[self._member_start:end].strip()
+        if not member:
+            return
+        try:
+            decoded = json.loads('{' + member + '}')
+        except json.JSONDecodeError:
+            logger.debug(f"Skipping undecodable streamed member: {member[:80]}")
+            return
+        self.fields.update(decoded)
+        completed.update(decoded)
+
+
+# Example usage
+if __name__ == "__main__":
+    parser = IncrementalJSONParser()
+    stream = '```json\n{"urgency": "critical", "category": "violence", "summary": "Мужчина {с ножом}", ' \
+             '"clarification_questions": ["Где вы?", "Есть раненые?"]}\n```'
+    for start in range(0, len(stream), 7):
+        fields = parser.feed(stream[start:start + 7])
+        if fields:
+            print(f"after {start + 7:3d} chars: {fields}")
@@ -0,0 +1,90 @@
+"""
+Keyword Matcher for AI Call Intake System.
+Multi-pattern substring matching of classifier keyword sets in one pass over the text.
+"""
+
+import logging
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class KeywordMatcher:
+    """
+    Compiled set of keywords, each tagged with one or more labels.
+    
+    Keywords from all sets (categories, danger, weapons, ...) are merged into a
+    single Aho-Corasick automaton, so one scan of the text yields every hit
+    regardless of how many keyword lists share it. Matching is plain substring
+    matching, identical to ``keyword in text``.
+    
+    The automaton comes from ``pyahocorasick``. Without it the matcher falls
+    back to one ``in`` check per distinct keyword, which still checks each
+    keyword once instead of once per list it belongs to.
+    """
+    
+    def __init__(self, keywords: Iterable[Tuple[str, Hashable]]):
+        """
+        Compile matcher.
+        
+        Args:
+            keywords: (keyword, label) pairs; a keyword may appear with several labels
+                and repeated pairs are counted (see ``count``)
+        """
+        self._labels: Dict[str, List[Hashable]] = {}
+        for keyword, label in keywords:
+            self._labels.setdefault(keyword.lower(), []).append(label)
+        
+        # Column index of every distinct keyword, for term matrices
+        self.vocabulary: Dict[str, int] = {keyword: i for i, keyword in enumerate(self._labels)}
+        
+        self._automaton = None
+        try:
+            import ahocorasick
+            
+            automaton = ahocorasick.Automaton()
+            for keyword in self._labels:
+                automaton.add_word(keyword, keyword)
+            if self._labels:
+                automaton.make_automaton()
+                self._automaton = automaton
+        except ImportError:
+            logger.warning("pyahocorasick not installed, using per-keyword scan. "
+                           "Install with: pip install pyahocorasick")
+        
+        logger.debug(f"KeywordMatcher compiled {len(self._labels)} keywords "
+                     f"({'automaton' if self._automaton else 'fallback'})")
+    
+    def match(self, text: str) -> FrozenSet[str]:
+        """
+        Find all keywords occurring in text.
+        
+        Args:
+            text: Lowercased text
+        
+        Returns:
+            Set of matched keywords
+        """
+        if self._automaton is not None:
+            return frozenset(keyword for _, keyword in self._automaton.iter(text))
+        return frozenset(keyword for keyword in self._labels if keyword in text)
+    
+    def labels(self, matched: Iterable[str]) -> Dict[Hashable, int]:
+        """
+        Count matched keywords per label.
+        
+        Args:
+            matched: Keywords returned by ``match``
+        
+        Returns:
+            Number of matched keywords for each label that has at least one hit
+        """
+        counts: Dict[Hashable, int] = {}
+        for keyword in matched:
+            for label in self._labels[keyword]:
+                counts[label] = counts.get(label, 0) + 1
+        return counts
+    
+    def count(self, text: str) -> Dict[Hashable, int]:
+        """Scan text once and count matched keywords per label."""
+        return self.labels(self.match(text))
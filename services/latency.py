@@ -0,0 +1,118 @@
+"""
+Latency Histogram for AI Call Intake System.
+Fixed log-scale buckets with decay, used to derive timeouts and hedge delays from observed latency.
+"""
+
+import bisect
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _log_buckets(low: float, high: float, factor: float) -> List[float]:
+    """Upper bounds from ``low`` to ``high`` seconds, each ``factor`` times the previous."""
+    bounds = [low]
+    while bounds[-1] < high:
+        bounds.append(bounds[-1] * factor)
+    return bounds
+
+
+class LatencyHistogram:
+    """
+    Thread-safe latency distribution of one remote dependency.
+    
+    Samples are counted in geometric buckets (~12% wide by default), so
+    recording and quantile queries cost O(number of buckets) and memory
+    does not grow with traffic. When ``max_samples`` is reached all counts
+    are halved, letting old observations fade and the quantiles follow
+    recent behaviour.
+    """
+    
+    def __init__(self, low: float = 0.01, high: float = 120.0, factor: float = 1.12,
+                 max_samples: int = 2000):
+        """
+        Initialize histogram.
+        
+        Args:
+            low: Upper bound of the first bucket in seconds
+            high: Largest tracked latency in seconds (slower samples go to the last bucket)
+            factor: Ratio between neighbouring bucket bounds
+            max_samples: Sample count at which counts are halved
+        """
+        self.bounds = _log_buckets(low, high, factor)
+        self.max_samples = max_samples
+        self._counts = [0] * len(self.bounds)
+        self._total = 0
+        self._lifetime = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+    
+    def record(self, seconds: float):
+        """Add one observed latency."""
+        index = min(bisect.bisect_left(self.bounds, seconds), len(self.bounds) - 1)
+        with self._lock:
+            self._counts[index] += 1
+            self._total += 1
+            self._lifetime += 1
+            self._sum += seconds
+            if self._total >= self.max_samples:
+                self._counts = [count // 2 for count in self._counts]
+                self._sum *= sum(self._counts) / self._total
+                self._total = sum(self._counts)
+    
+    @property
+    def count(self) -> int:
+        """Number of samples currently weighted in the distribution."""
+        return self._total
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a latency quantile.
+        
+        Args:
+            q: Quantile in [0, 1], e.g. 0.95
+        
+        Returns:
+            Upper bound of the bucket containing the quantile, or None without samples
+        """
+        with self._lock:
+            if not self._total:
+                return None
+            rank = q * self._total
+            seen = 0
+            for bound, count in zip(self.bounds, self._counts):
+                seen += count
+                if seen >= rank and count:
+                    return bound
+            return self.bounds[-1]
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Return sample counts, mean and common quantiles (seconds, rounded)."""
+        p50, p95, p99 = self.quantile(0.5), self.quantile(0.95), self.quantile(0.99)
+        with self._lock:
+            mean = self._sum / self._total if self._total else None
+            lifetime = self._lifetime
+        
+        def rounded(value):
+            return round(value, 3) if value is not None else None
+        
+        return {
+            'samples': lifetime,
+            'mean': rounded(mean),
+            'p50': rounded(p50),
+            'p95': rounded(p95),
+            'p99': rounded(p99)
+        }
+
+
+# Example usage
+if __name__ == "__main__":
+    import random
+    
+    histogram = LatencyHistogram()
+    rng = random.Random(1)
+    for _ in range(10000):
+        histogram.record(rng.lognormvariate(0.0, 0.5))
+    print(histogram.snapshot())
@@ -5,14 +5,105 @@ Supports OpenAI GPT, DeepSeek, and local models for incident analysis.
 
 import os
 import json
+import time
 import logging
 import re
-from typing import Dict, Any, Optional
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Any, Optional
 from enum import Enum
 
+from services.json_stream import IncrementalJSONParser
+from services.latency import LatencyHistogram
+from services.circuit_breaker import CircuitOpenError, get_breaker
+
 logger = logging.getLogger(__name__)
 
 
+# Fields the system prompt asks for first; reported as soon as they are streamed
+PROVISIONAL_FIELDS = ('urgency', 'category')
+
+# Models used for a hedge engine when LLM_HEDGE_MODEL is not set
+HEDGE_DEFAULT_MODELS = {
+    'openai': 'gpt-3.5-turbo',
+    'deepseek': 'deepseek-chat',
+    'ollama': 'llama2'
+}
+
+# Primary latency samples needed before the hedge delay follows the histogram
+HEDGE_MIN_SAMPLES = 20
+
+# Appended to the system prompt of multi-turn sessions. The prompt is identical for
+# every turn and call, so providers with prefix caching serve it from cache.
+UPDATE_INSTRUCTIONS = {
+    'ru': """
+
+ОБНОВЛЕНИЕ АНАЛИЗА:
+Если сообщение содержит текущий анализ и новый ответ гражданина, верни полный обновленный JSON
+в том же формате: дополни или исправь поля по новому ответу, остальные оставь без изменений.""",
+    'kk': """
+
+ТАЛДАУДЫ ЖАҢАРТУ:
+Егер хабарламада ағымдағы талдау мен азаматтың жаңа жауабы болса, сол форматтағы толық жаңартылған
+JSON қайтар: жаңа жауап бойынша өрістерді толықтыр немесе түзет, қалғандарын өзгертпе.""",
+    'en': """
+
+ANALYSIS UPDATE:
+If the message contains the current analysis and a new answer from the caller, return the complete
+updated JSON in the same format: fill in or correct fields from the new answer, keep the rest unchanged."""
+}
+
+UPDATE_MESSAGES = {
+    'ru': "Текущий анализ:\n{analysis}\n\nВопрос оператора: {question}\nОтвет гражданина: {answer}",
+    'kk': "Ағымдағы талдау:\n{analysis}\n\nОператор сұрағы: {question}\nАзамат жауабы: {answer}",
+    'en': "Current analysis:\n{analysis}\n\nOperator question: {question}\nCaller answer: {answer}"
+}
+
+# Fields the model regenerates on every turn, left out of the analysis sent back to it
+SESSION_OMITTED_FIELDS = ('needs_clarification', 'clarification_questions')
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for engines that report no usage (~3 characters per token for Cyrillic)."""
+    return len(text) // 3 + 1
+
+
+class StreamCancel(threading.Event):
+    """
+    Cancellation flag of a streamed request that also closes its response stream.
+    
+    Checking a plain flag between chunks leaves a stalled stream (no chunks
+    arriving) holding its executor thread until the read timeout; closing
+    the stream interrupts the blocked read at once.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self._stream_lock = threading.Lock()
+        self._stream = None
+    
+    def attach(self, stream):
+        """Register the open stream; closes it right away if already cancelled."""
+        with self._stream_lock:
+            self._stream = stream
+        if self.is_set():
+            self._close(stream)
+    
+    def set(self):
+        super().set()
+        with self._stream_lock:
+            stream = self._stream
+        if stream is not None:
+            self._close(stream)
+    
+    @staticmethod
+    def _close(stream):
+        try:
+            stream.close()
+        except Exception as e:
+            logger.debug(f"Closing cancelled stream failed: {e}")
+
+
 class LLMEngine(Enum):
     """Available LLM engines."""
     OPENAI = "openai"
@@ -24,7 +115,8 @@ class LLMEngine(Enum):
 class LLMService:
     """Main LLM service class for incident analysis."""
     
-    def __init__(self, engine: str = None, model: str = None, api_key: str = None):
+    def __init__(self, engine: str = None, model: str = None, api_key: str = None,
+                 hedge_engine: str = None):
         """
         Initialize LLM service.
         
@@ -32,11 +124,21 @@ class LLMService:
             engine: LLM engine to use (openai, deepseek, ollama, mock)
             model: Model name (gpt-4, gpt-3.5-turbo, deepseek-chat, etc.)
             api_key: API key for the LLM service
+            hedge_engine: Secondary engine raced against slow primary requests
+                ($LLM_HEDGE_ENGINE by default, empty string disables hedging)
         """
         self.engine = engine or os.getenv('LLM_ENGINE', 'openai').lower()
         self.model = model or os.getenv('LLM_MODEL', 'gpt-3.5-turbo')
         self.client = None
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        self.latency = LatencyHistogram()
+        self.breaker = None
+        self.hedge = None
+        self.hedge_quantile = float(os.getenv('LLM_HEDGE_QUANTILE', 0.95))
+        self.hedge_initial_delay = float(os.getenv('LLM_HEDGE_DELAY', 3.0))
+        self.hedges_sent = 0
+        self.hedge_wins = 0
+        self._executor = None
         
         logger.info(f"Initializing LLM service with engine: {self.engine}, model: {self.model}")
         
@@ -49,6 +151,41 @@ class LLMService:
             self._init_ollama()
         else:
             logger.info("Using mock LLM engine for testing")
+        
+        if self.client:
+            # Shared by all services of the process using this engine and model
+            self.breaker = get_breaker(
+                f"llm.{self.engine}.{self.model}",
+                slow_call_seconds=15.0,
+                max_timeout=float(os.getenv('LLM_TIMEOUT', 30))
+            )
+            self.latency = self.breaker.latency
+        
+        hedge_engine = os.getenv('LLM_HEDGE_ENGINE', '') if hedge_engine is None else hedge_engine
+        if hedge_engine and self.client:
+            self._init_hedge(hedge_engine.lower())
+    
+    def _init_hedge(self, hedge_engine: str):
+        """Initialize secondary engine for hedged requests."""
+        model = os.getenv('LLM_HEDGE_MODEL') or HEDGE_DEFAULT_MODELS.get(hedge_engine, self.model)
+        if hedge_engine == self.engine and model == self.model:
+            logger.warning("Hedge engine is the same as the primary engine, hedging disabled")
+            return
+        
+        try:
+            hedge = LLMService(hedge_engine, model, hedge_engine='')
+        except Exception as e:
+            logger.warning(f"Failed to initialize hedge engine {hedge_engine}: {e}")
+            return
+        
+        if not hedge.client:
+            logger.warning(f"Hedge engine {hedge_engine} unavailable, hedging disabled")
+            return
+        
+        self.hedge = hedge
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='llm-hedge')
+        logger.info(f"Hedging {self.engine} requests with {hedge_engine} ({model}) "
+                    f"after p{self.hedge_quantile * 100:.0f} latency")
     
     def _init_openai(self):
         """Initialize OpenAI client."""
@@ -111,13 +248,16 @@ class LLMService:
             logger.error(f"Failed to initialize Ollama: {e}")
             raise
     
-    def analyze_incident(self, transcript: str, language: str = "ru") -> Dict[str, Any]:
+    def analyze_incident(self, transcript: str, language: str = "ru",
+                         on_provisional: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
         """
         Analyze incident transcript and extract structured information.
         
         Args:
             transcript: Caller's speech transcript
             language: Language of the transcript
+            on_provisional: Optional callback receiving ``urgency`` and ``category``
+                as soon as the model has produced them; enables streaming mode
             
         Returns:
             Dictionary with structured analysis
@@ -129,19 +269,151 @@ class LLMService:
         logger.info(f"Analyzing incident transcript (language: {language})")
         
         try:
-            if self.engine == LLMEngine.OPENAI.value:
-                return self._analyze_with_openai(transcript, language)
-            elif self.engine == LLMEngine.DEEPSEEK.value:
-                return self._analyze_with_deepseek(transcript, language)
-            elif self.engine == LLMEngine.OLLAMA.value:
-                return self._analyze_with_ollama(transcript, language)
-            else:
-                return self._analyze_mock(transcript, language)
+            if self.hedge:
+                return self._analyze_hedged(transcript, language, on_provisional)
+            
+            if not self.client:
+                result = self._analyze_mock(transcript, language)
+                if on_provisional:
+                    self._emit_provisional(on_provisional, result)
+                return result
+            
+            # An open circuit raises immediately and the mock fallback below answers
+            return self.breaker.call(self._analyze_remote, transcript, language, on_provisional)
         except Exception as e:
             logger.error(f"LLM analysis failed: {e}")
             # Fallback to mock analysis
             return self._analyze_mock(transcript, language)
     
+    def _analyze_remote(self, transcript: str, language: str,
+                        on_provisional: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Single request to the configured remote engine."""
+        if on_provisional:
+            return self._analyze_streaming(transcript, language, on_provisional)
+        elif self.engine == LLMEngine.OPENAI.value:
+            return self._analyze_with_openai(transcript, language)
+        elif self.engine == LLMEngine.DEEPSEEK.value:
+            return self._analyze_with_deepseek(transcript, language)
+        else:
+            return self._analyze_with_ollama(transcript, language)
+    
+    def hedge_delay(self) -> float:
+        """Time to wait for the primary engine before sending the hedge request."""
+        if self.latency.count < HEDGE_MIN_SAMPLES:
+            return self.hedge_initial_delay
+        return self.latency.quantile(self.hedge_quantile)
+    
+    def _analyze_hedged(self, transcript: str, language: str,
+                        on_provisional: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Race the primary engine against the hedge engine.
+        
+        The hedge request is sent only if the primary has not answered within
+        ``hedge_delay()`` or failed. The first valid JSON wins; the other
+        request is cancelled by closing its response stream, which frees its
+        executor thread even if the stream has stalled.
+        """
+        provisional_lock = threading.Lock()
+        provisional_sent = []
+        
+        def provisional_once(fields):
+            with provisional_lock:
+                if provisional_sent:
+                    return
+                provisional_sent.append(True)
+            on_provisional(fields)
+        
+        callback = provisional_once if on_provisional else None
+        cancel = {self: StreamCancel(), self.hedge: StreamCancel()}
+        
+        primary = self._executor.submit(self._timed_attempt, transcript, language, callback, cancel[self])
+        wait([primary], timeout=self.hedge_delay())
+        if primary.done() and primary.exception() is None:
+            return primary.result()
+        
+        self.hedges_sent += 1
+        logger.info(f"{self.engine} slow or failed, sending hedge request to {self.hedge.engine}")
+        secondary = self._executor.submit(self.hedge._timed_attempt, transcript, language, callback,
+                                          cancel[self.hedge])
+        
+        pending = {primary: self, secondary: self.hedge}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                service = pending.pop(future)
+                if future.exception() is not None:
+                    logger.warning(f"{service.engine} request failed: {future.exception()}")
+                    continue
+                for loser in pending.values():
+                    cancel[loser].set()
+                if service is self.hedge:
+                    self.hedge_wins += 1
+                return future.result()
+        
+        raise RuntimeError("All LLM engines failed")
+    
+    def _timed_attempt(self, transcript: str, language: str,
+                       on_provisional: Optional[Callable[[Dict[str, Any]], None]],
+                       cancel: threading.Event) -> Dict[str, Any]:
+        """
+        Streamed request with strict parsing through the breaker.
+        
+        A cancelled request is no breaker outcome, but its elapsed time is a
+        lower bound of its latency and goes into the histogram: dropping the
+        slow losers would pull the hedge delay quantile down.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.breaker.name, self.breaker.retry_in())
+        
+        started = time.perf_counter()
+        try:
+            result = self._analyze_streaming(transcript, language, on_provisional, cancel=cancel, strict=True)
+        except Exception:
+            if not cancel.is_set():
+                self.breaker.record(False, time.perf_counter() - started)
+                raise
+            result = None
+        
+        if cancel.is_set():
+            self.latency.record(time.perf_counter() - started)
+            self.breaker.release()
+        else:
+            self.breaker.record(True, time.perf_counter() - started)
+        return result
+    
+    def start_session(self, language: str = "ru") -> 'AnalysisSession':
+        """
+        Start a multi-turn analysis of one call.
+        
+        Args:
+            language: Language of the dialog
+        
+        Returns:
+            Session keeping the conversation state between turns
+        """
+        return AnalysisSession(self, language)
+    
+    def _chat(self, system_prompt: str, user_message: str):
+        """
+        Single chat completion through the breaker.
+        
+        Returns:
+            Tuple of (response text, provider usage object or None)
+        """
+        extra = {"response_format": {"type": "json_object"}} if self.engine == LLMEngine.OPENAI.value else {}
+        response = self.breaker.call(
+            self.client.chat.completions.create,
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_message}
+            ],
+            temperature=0.1,
+            timeout=self.breaker.timeout(),
+            **extra
+        )
+        return response.choices[0].message.content, getattr(response, 'usage', None)
+    
     def _build_system_prompt(self, language: str) -> str:
         """Build system prompt for incident analysis."""
         
@@ -329,6 +601,7 @@ If information is insufficient, set needs_clarification: true and suggest clarif
                     {"role": "user", "content": transcript}
                 ],
                 temperature=0.1,  # Low temperature for consistent output
+                timeout=self.breaker.timeout(),
                 response_format={"type": "json_object"}
             )
             
@@ -353,7 +626,8 @@ If information is insufficient, set needs_clarification: true and suggest clarif
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": transcript}
                 ],
-                temperature=0.1
+                temperature=0.1,
+                timeout=self.breaker.timeout()
             )
             
             result_text = response.choices[0].message.content
@@ -377,7 +651,8 @@ If information is insufficient, set needs_clarification: true and suggest clarif
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": transcript}
                 ],
-                temperature=0.1
+                temperature=0.1,
+                timeout=self.breaker.timeout()
             )
             
             result_text = response.choices[0].message.content
@@ -387,6 +662,72 @@ If information is insufficient, set needs_clarification: true and suggest clarif
             logger.error(f"Ollama API error: {e}")
             raise
     
+    def _analyze_streaming(self, transcript: str, language: str,
+                           on_provisional: Optional[Callable[[Dict[str, Any]], None]],
+                           cancel: Optional[threading.Event] = None, strict: bool = False) -> Dict[str, Any]:
+        """
+        Analyze with any OpenAI-compatible engine, streaming the completion.
+        
+        The JSON object is parsed incrementally; once all PROVISIONAL_FIELDS
+        are complete they are passed to ``on_provisional`` while the rest of
+        the object (summary, clarification questions) is still generating.
+        Setting ``cancel`` closes the stream at the next chunk and returns None;
+        a ``StreamCancel`` closes it immediately.
+        """
+        system_prompt = self._build_system_prompt(language)
+        extra = {"response_format": {"type": "json_object"}} if self.engine == LLMEngine.OPENAI.value else {}
+        
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": transcript}
+                ],
+                temperature=0.1,
+                timeout=self.breaker.timeout(),
+                stream=True,
+                **extra
+            )
+            if isinstance(cancel, StreamCancel):
+                cancel.attach(stream)
+            
+            parser = IncrementalJSONParser()
+            emitted = not on_provisional
+            for chunk in stream:
+                if cancel is not None and cancel.is_set():
+                    stream.close()
+                    logger.debug(f"{self.engine} request cancelled")
+                    return None
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if parser.feed(delta) and not emitted and all(f in parser.fields for f in PROVISIONAL_FIELDS):
+                    emitted = True
+                    self._emit_provisional(on_provisional, parser.fields)
+            
+            return self._parse_llm_response(parser.text, strict=strict)
+        
+        except Exception as e:
+            if cancel is not None and cancel.is_set():
+                logger.debug(f"{self.engine} request cancelled: {e}")
+                return None
+            logger.error(f"{self.engine} streaming API error: {e}")
+            raise
+    
+    def _emit_provisional(self, on_provisional: Callable[[Dict[str, Any]], None], fields: Dict[str, Any]):
+        """Pass validated provisional urgency/category to the callback; never fails the analysis."""
+        provisional = {field: fields.get(field, self._get_default_value(field)) for field in PROVISIONAL_FIELDS}
+        if provisional['urgency'] not in ['critical', 'high', 'medium', 'low']:
+            provisional['urgency'] = 'medium'
+        
+        try:
+            on_provisional(provisional)
+        except Exception as e:
+            logger.warning(f"Provisional analysis callback failed: {e}")
+    
     def _analyze_mock(self, transcript: str, language: str) -> Dict[str, Any]:
         """Mock analysis for testing."""
         # Simulate processing delay
@@ -437,8 +778,8 @@ If information is insufficient, set needs_clarification: true and suggest clarif
             "clarification_questions": []
         }
     
-    def _parse_llm_response(self, response_text: str) -> Dict[str, Any]:
-        """Parse LLM response and ensure valid JSON."""
+    def _parse_llm_response(self, response_text: str, strict: bool = False) -> Dict[str, Any]:
+        """Parse LLM response and ensure valid JSON (``strict``: raise instead of returning defaults)."""
         try:
             # Clean response text
             response_text = response_text.strip()
@@ -482,9 +823,13 @@ If information is insufficient, set needs_clarification: true and suggest clarif
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON response: {e}")
             logger.error(f"Response text: {response_text}")
+            if strict:
+                raise
             return self._get_default_response()
         except Exception as e:
             logger.error(f"Error parsing LLM response: {e}")
+            if strict:
+                raise
             return self._get_default_response()
     
     def _get_default_response(self) -> Dict[str, Any]:
@@ -524,7 +869,163 @@ If information is insufficient, set needs_clarification: true and suggest clarif
             'engine': self.engine,
             'model': self.model,
             'status': 'initialized' if self.client or self.engine == 'mock' else 'failed',
-            'supports_json': True
+            'supports_json': True,
+            'latency': self.latency.snapshot(),
+            'hedge': {
+                'engine': self.hedge.engine,
+                'model': self.hedge.model,
+                'delay': round(self.hedge_delay(), 3),
+                'sent': self.hedges_sent,
+                'wins': self.hedge_wins,
+                'latency': self.hedge.latency.snapshot()
+            } if self.hedge else None
+        }
+
+
+class AnalysisSession:
+    """
+    Multi-turn incident analysis that sends only the delta of each turn.
+    
+    The first turn sends the transcript. Every follow-up answer is sent
+    together with the previous structured result instead of the whole
+    conversation, so prompt size stays constant per turn rather than
+    growing with the dialog. The system prompt (with update instructions)
+    is the same for all turns and calls, which lets OpenAI and DeepSeek
+    serve it from their prompt cache. Tokens and latency of every turn are
+    recorded in ``turns``.
+    """
+    
+    def __init__(self, service: LLMService, language: str = "ru"):
+        """
+        Initialize session.
+        
+        Args:
+            service: LLM service used for the turns
+            language: Language of the dialog
+        """
+        self.service = service
+        self.language = language
+        self.result: Optional[Dict[str, Any]] = None
+        self.turns = []
+        self._texts = []
+        self._system_prompt = service._build_system_prompt(language) + \
+            UPDATE_INSTRUCTIONS.get(language, UPDATE_INSTRUCTIONS['en'])
+    
+    def analyze(self, transcript: str) -> Dict[str, Any]:
+        """
+        Analyze the initial transcript (first turn).
+        
+        Args:
+            transcript: Caller's first statement
+        
+        Returns:
+            Structured analysis
+        """
+        self._texts = [transcript]
+        if not transcript or len(transcript.strip()) < 5:
+            logger.warning("Transcript too short for analysis")
+            self.result = self.service._get_default_response()
+            return self.result
+        return self._turn(transcript)
+    
+    @property
+    def transcript(self) -> str:
+        """Everything the caller said so far."""
+        return " ".join(self._texts)
+    
+    def seed(self, transcript: str, result: Dict[str, Any]):
+        """
+        Start from an existing analysis (e.g. of a duplicate incident) without an LLM turn.
+        
+        Args:
+            transcript: Caller's first statement
+            result: Analysis to update with the follow-up answers
+        """
+        self._texts = [transcript]
+        self.result = dict(result)
+    
+    def update(self, answer: str, question: str = "") -> Dict[str, Any]:
+        """
+        Update the analysis with a follow-up answer.
+        
+        Args:
+            answer: Caller's answer
+            question: Question the answer responds to
+        
+        Returns:
+            Updated structured analysis
+        """
+        if self.result is None:
+            return self.analyze(answer)
+        
+        self._texts.append(answer)
+        template = UPDATE_MESSAGES.get(self.language, UPDATE_MESSAGES['en'])
+        message = template.format(
+            analysis=json.dumps(
+                {key: value for key, value in self.result.items() if key not in SESSION_OMITTED_FIELDS},
+                ensure_ascii=False, separators=(',', ':')
+            ),
+            question=question or "-",
+            answer=answer
+        )
+        return self._turn(message)
+    
+    def _turn(self, message: str) -> Dict[str, Any]:
+        """Run one turn and record its usage."""
+        service = self.service
+        started = time.perf_counter()
+        usage = None
+        response_text = ""
+        
+        try:
+            if not service.client:
+                raise RuntimeError(f"{service.engine} engine has no client")
+            response_text, usage = service._chat(self._system_prompt, message)
+            self.result = service._parse_llm_response(response_text)
+        except Exception as e:
+            if service.client:
+                logger.error(f"LLM session turn failed: {e}")
+            # Local analysis over everything the caller said so far
+            self.result = service._analyze_mock(self.transcript, self.language)
+        
+        self.turns.append(self._turn_metrics(message, response_text, usage, time.perf_counter() - started))
+        turn = self.turns[-1]
+        logger.info(f"LLM turn {turn['turn']}: {turn['prompt_tokens']} prompt tokens "
+                    f"({turn['cached_tokens']} cached), {turn['completion_tokens']} completion tokens, "
+                    f"{turn['latency']:.2f}s")
+        return self.result
+    
+    def _turn_metrics(self, message: str, response_text: str, usage, latency: float) -> Dict[str, Any]:
+        """Token counts reported by the provider, estimated when it reports none."""
+        if usage is not None:
+            details = getattr(usage, 'prompt_tokens_details', None)
+            cached = getattr(details, 'cached_tokens', None) if details is not None else None
+            if cached is None:
+                # DeepSeek reports cache hits separately
+                cached = getattr(usage, 'prompt_cache_hit_tokens', 0)
+            prompt_tokens, completion_tokens, estimated = usage.prompt_tokens, usage.completion_tokens, False
+        else:
+            prompt_tokens = estimate_tokens(self._system_prompt) + estimate_tokens(message)
+            completion_tokens = estimate_tokens(response_text or json.dumps(self.result, ensure_ascii=False))
+            cached, estimated = 0, True
+        
+        return {
+            'turn': len(self.turns) + 1,
+            'prompt_tokens': prompt_tokens,
+            'cached_tokens': cached or 0,
+            'completion_tokens': completion_tokens,
+            'latency': round(latency, 3),
+            'estimated': estimated
+        }
+    
+    def stats(self) -> Dict[str, Any]:
+        """Totals over all turns of the session."""
+        return {
+            'turns': len(self.turns),
+            'prompt_tokens': sum(turn['prompt_tokens'] for turn in self.turns),
+            'cached_tokens': sum(turn['cached_tokens'] for turn in self.turns),
+            'completion_tokens': sum(turn['completion_tokens'] for turn in self.turns),
+            'latency': round(sum(turn['latency'] for turn in self.turns), 3)
         }
 
 
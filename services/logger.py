@@ -7,25 +7,87 @@ import os
 import json
 import logging
 import sqlite3
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
 import hashlib
 
+from services.call_events import CallEventBus, call_event_bus
+from services.gazetteer import Gazetteer, get_default_gazetteer
+
 logger = logging.getLogger(__name__)
 
 
+# Columns of the calls table, used to validate projections
+CALL_COLUMNS = (
+    'id', 'call_id', 'timestamp', 'caller_id', 'language', 'duration',
+    'recording_path', 'transcript', 'ai_response_json', 'urgency', 'category',
+    'address', 'current_danger', 'people_involved', 'weapons',
+    'recommended_department', 'summary', 'confidence_score', 'validated',
+    'status', 'error_message', 'created_at', 'street_id', 'latitude', 'longitude',
+    'incident_id'
+)
+
+# Columns added after the initial schema: (name, SQL type)
+MIGRATED_COLUMNS = (
+    ('street_id', 'INTEGER'),
+    ('latitude', 'REAL'),
+    ('longitude', 'REAL'),
+    ('incident_id', 'TEXT'),
+)
+
+
+class CallSummary:
+    """Compact call record for list views (no transcript or AI response payload)."""
+    
+    __slots__ = (
+        'call_id', 'timestamp', 'caller_id', 'urgency', 'category',
+        'address', 'summary', 'people_involved'
+    )
+    
+    def __init__(self, call_id: str, timestamp: str, caller_id: Optional[str],
+                 urgency: Optional[str], category: Optional[str], address: Optional[str],
+                 summary: Optional[str], people_involved: Optional[int]):
+        self.call_id = call_id
+        self.timestamp = timestamp
+        self.caller_id = caller_id
+        self.urgency = urgency
+        self.category = category
+        self.address = address
+        self.summary = summary
+        self.people_involved = people_involved
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    def __repr__(self) -> str:
+        return f"CallSummary(call_id={self.call_id!r}, urgency={self.urgency!r}, category={self.category!r})"
+
+
 class CallLogger:
     """Database logger for call records."""
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, event_bus: CallEventBus = None,
+                 gazetteer: Optional[Gazetteer] = None, caller_profiles=None):
         """
         Initialize call logger.
         
         Args:
             db_path: Path to SQLite database file
+            event_bus: Bus notified about every logged call (process-wide bus by default)
+            gazetteer: Street index used to geocode addresses ($GAZETTEER_INDEX by default)
+            caller_profiles: Optional CallerProfileCache updated with every logged call
         """
         self.db_path = db_path or os.getenv('CALL_LOG_DB', '/var/lib/ai-call-intake/calls.db')
+        self.event_bus = event_bus or call_event_bus
+        self.gazetteer = gazetteer if gazetteer is not None else get_default_gazetteer()
+        self.caller_profiles = caller_profiles
+        self._version_lock = threading.Lock()
+        self._version_conn = None
+        self._pragma_version = None
+        self._data_version = 0
         
         # Create directory if it doesn't exist
         db_dir = Path(self.db_path).parent
@@ -70,11 +132,21 @@ class CallLogger:
                 )
             ''')
             
+            # Add columns missing from databases created by older versions
+            existing = {row[1] for row in cursor.execute('PRAGMA table_info(calls)')}
+            for column, column_type in MIGRATED_COLUMNS:
+                if column not in existing:
+                    cursor.execute(f'ALTER TABLE calls ADD COLUMN {column} {column_type}')
+                    logger.info(f"Added column calls.{column}")
+            
             # Create indexes for faster queries
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_calls_timestamp ON calls(timestamp)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_calls_urgency ON calls(urgency)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_calls_category ON calls(category)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_calls_status ON calls(status)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_calls_caller_id ON calls(caller_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_calls_street_id ON calls(street_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_calls_incident_id ON calls(incident_id)')
             
             # Create call_events table for detailed event logging
             cursor.execute('''
@@ -88,6 +160,22 @@ class CallLogger:
                 )
             ''')
             
+            # Version of the calls table, bumped by triggers on every write from any process
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS data_version (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    version INTEGER NOT NULL
+                )
+            ''')
+            cursor.execute('INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)')
+            for operation in ('INSERT', 'UPDATE', 'DELETE'):
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS calls_version_{operation.lower()} AFTER {operation} ON calls
+                    BEGIN
+                        UPDATE data_version SET version = version + 1 WHERE id = 1;
+                    END
+                ''')
+            
             conn.commit()
             conn.close()
             
@@ -97,6 +185,21 @@ class CallLogger:
             logger.error(f"Failed to initialize database: {e}")
             raise
     
+    def generate_call_id(self, caller_id: Optional[str]) -> str:
+        """
+        Generate a call ID before the call is logged.
+        
+        Lets events published while the call is still being processed
+        carry the ID the call will be logged under.
+        
+        Args:
+            caller_id: Caller phone number
+        
+        Returns:
+            Call ID to pass to ``log_call``
+        """
+        return self._generate_call_id(caller_id or 'unknown')
+    
     def _generate_call_id(self, caller_id: str, timestamp: datetime = None) -> str:
         """Generate unique call ID."""
         if timestamp is None:
@@ -155,6 +258,8 @@ class CallLogger:
             confidence_score = 0.0
             validated = False
         
+        street_id, latitude, longitude = self._geocode(address)
+        
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
@@ -165,8 +270,9 @@ class CallLogger:
                     recording_path, transcript, ai_response_json,
                     urgency, category, address, current_danger,
                     people_involved, weapons, recommended_department,
-                    summary, confidence_score, validated, status, error_message
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    summary, confidence_score, validated, status, error_message,
+                    street_id, latitude, longitude, incident_id
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 call_id,
                 timestamp.isoformat(),
@@ -187,8 +293,13 @@ class CallLogger:
                 confidence_score,
                 validated,
                 call_data.get('status', 'completed'),
-                call_data.get('error')
+                call_data.get('error'),
+                street_id,
+                latitude,
+                longitude,
+                call_data.get('incident_id')
             ))
+            row_id = cursor.lastrowid
             
             # Log call events if available
             events = call_data.get('events', [])
@@ -199,6 +310,28 @@ class CallLogger:
             conn.close()
             
             logger.info(f"Call logged successfully: {call_id}")
+            
+            if self.caller_profiles is not None:
+                self.caller_profiles.record(
+                    call_data.get('caller_id'),
+                    category,
+                    call_data.get('status') == 'false_call',
+                    timestamp
+                )
+            
+            self._publish_call(row_id, {
+                'call_id': call_id,
+                'timestamp': timestamp.isoformat(),
+                'caller_id': call_data.get('caller_id'),
+                'urgency': urgency,
+                'category': category,
+                'address': address,
+                'summary': summary,
+                'people_involved': people_involved,
+                'current_danger': bool(current_danger),
+                'weapons': bool(weapons),
+                'incident_id': call_data.get('incident_id')
+            })
             return call_id
             
         except Exception as e:
@@ -207,6 +340,47 @@ class CallLogger:
             self._fallback_log(call_data, str(e))
             return call_id
     
+    def _geocode(self, address: Optional[str]):
+        """Resolve address to (street_id, latitude, longitude), or Nones if unknown."""
+        if self.gazetteer is None or not address:
+            return None, None, None
+        try:
+            match = self.gazetteer.lookup(address)
+        except Exception as e:
+            logger.warning(f"Gazetteer lookup failed for '{address}': {e}")
+            return None, None, None
+        if match is None:
+            return None, None, None
+        return match.street_id, match.latitude, match.longitude
+    
+    @property
+    def data_version(self) -> int:
+        """
+        Version of the calls table; changes with every write from any process.
+        
+        The counter is kept by triggers in the database. It is re-read only
+        when ``PRAGMA data_version`` of a dedicated read connection reports
+        a commit by another connection, so while nothing is written a check
+        costs one pragma and no table read.
+        """
+        with self._version_lock:
+            if self._version_conn is None:
+                self._version_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            pragma_version = self._version_conn.execute('PRAGMA data_version').fetchone()[0]
+            if pragma_version != self._pragma_version:
+                self._pragma_version = pragma_version
+                self._data_version = self._version_conn.execute(
+                    'SELECT version FROM data_version WHERE id = 1'
+                ).fetchone()[0]
+            return self._data_version
+    
+    def _publish_call(self, row_id: int, call: Dict[str, Any]):
+        """Notify live subscribers about a logged call; never fails the write."""
+        try:
+            self.event_bus.publish_call(row_id, call)
+        except Exception as e:
+            logger.warning(f"Failed to publish call event: {e}")
+    
     def _log_event(self, call_id: str, event_data: Dict[str, Any]):
         """Log individual call event."""
         try:
@@ -250,25 +424,54 @@ class CallLogger:
         except Exception as e:
             logger.error(f"Fallback logging also failed: {e}")
     
-    def get_call(self, call_id: str) -> Optional[Dict[str, Any]]:
-        """Retrieve call details by ID."""
+    def _select_clause(self, columns: Optional[List[str]]) -> str:
+        """Build SELECT column list, validating projection against the calls schema."""
+        if not columns:
+            return 'SELECT *'
+        
+        unknown = [column for column in columns if column not in CALL_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown call columns: {', '.join(unknown)}")
+        
+        return 'SELECT ' + ', '.join(columns)
+    
+    def _row_to_call(self, row: sqlite3.Row, parse_json: bool) -> Dict[str, Any]:
+        """Convert database row to call dictionary, optionally parsing AI response JSON."""
+        call = dict(row)
+        
+        # Parse JSON fields
+        if parse_json and call.get('ai_response_json'):
+            try:
+                call['ai_response'] = json.loads(call['ai_response_json'])
+            except json.JSONDecodeError:
+                call['ai_response'] = {}
+        
+        return call
+    
+    def get_call(self, call_id: str, parse_json: bool = True,
+                 columns: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve call details by ID.
+        
+        Args:
+            call_id: Call identifier
+            parse_json: Add parsed ``ai_response`` next to the raw ``ai_response_json``.
+                Pass False when the stored JSON is forwarded to the client as is.
+            columns: Columns to fetch (all columns if not specified)
+        
+        Returns:
+            Call dictionary with events, or None if not found
+        """
         try:
             conn = sqlite3.connect(self.db_path)
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
-            cursor.execute('SELECT * FROM calls WHERE call_id = ?', (call_id,))
+            cursor.execute(f'{self._select_clause(columns)} FROM calls WHERE call_id = ?', (call_id,))
             row = cursor.fetchone()
             
             if row:
-                call = dict(row)
-                
-                # Parse JSON fields
-                if call.get('ai_response_json'):
-                    try:
-                        call['ai_response'] = json.loads(call['ai_response_json'])
-                    except json.JSONDecodeError:
-                        call['ai_response'] = {}
+                call = self._row_to_call(row, parse_json)
                 
                 # Get events
                 cursor.execute('SELECT * FROM call_events WHERE call_id = ? ORDER BY event_time', (call_id,))
@@ -285,31 +488,32 @@ class CallLogger:
             logger.error(f"Failed to retrieve call: {e}")
             return None
     
-    def get_recent_calls(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
-        """Get recent calls with pagination."""
+    def get_recent_calls(self, limit: int = 100, offset: int = 0, parse_json: bool = True,
+                         columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Get recent calls with pagination.
+        
+        Args:
+            limit: Maximum number of calls
+            offset: Number of calls to skip
+            parse_json: Add parsed ``ai_response`` to every row
+            columns: Columns to fetch (all columns if not specified)
+        
+        Returns:
+            List of call dictionaries, newest first
+        """
         try:
             conn = sqlite3.connect(self.db_path)
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
-            cursor.execute('''
-                SELECT * FROM calls 
+            cursor.execute(f'''
+                {self._select_clause(columns)} FROM calls 
                 ORDER BY timestamp DESC 
                 LIMIT ? OFFSET ?
             ''', (limit, offset))
             
-            calls = []
-            for row in cursor.fetchall():
-                call = dict(row)
-                
-                # Parse JSON fields
-                if call.get('ai_response_json'):
-                    try:
-                        call['ai_response'] = json.loads(call['ai_response_json'])
-                    except json.JSONDecodeError:
-                        call['ai_response'] = {}
-                
-                calls.append(call)
+            calls = [self._row_to_call(row, parse_json) for row in cursor.fetchall()]
             
             conn.close()
             return calls
@@ -318,15 +522,27 @@ class CallLogger:
             logger.error(f"Failed to retrieve recent calls: {e}")
             return []
     
-    def search_calls(self, filters: Dict[str, Any], limit: int = 100) -> List[Dict[str, Any]]:
-        """Search calls with filters."""
+    def search_calls(self, filters: Dict[str, Any], limit: int = 100, parse_json: bool = True,
+                     columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Search calls with filters.
+        
+        Args:
+            filters: Filter values (urgency, category, date_from, date_to, caller_id, status, incident_id)
+            limit: Maximum number of calls
+            parse_json: Add parsed ``ai_response`` to every row
+            columns: Columns to fetch (all columns if not specified)
+        
+        Returns:
+            List of matching call dictionaries, newest first
+        """
         try:
             conn = sqlite3.connect(self.db_path)
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
             # Build query
-            query = 'SELECT * FROM calls WHERE 1=1'
+            query = f'{self._select_clause(columns)} FROM calls WHERE 1=1'
             params = []
             
             if 'urgency' in filters:
@@ -353,31 +569,231 @@ class CallLogger:
                 query += ' AND status = ?'
                 params.append(filters['status'])
             
+            if 'incident_id' in filters:
+                query += ' AND incident_id = ?'
+                params.append(filters['incident_id'])
+            
             query += ' ORDER BY timestamp DESC LIMIT ?'
             params.append(limit)
             
             cursor.execute(query, params)
             
+            calls = [self._row_to_call(row, parse_json) for row in cursor.fetchall()]
+            
+            conn.close()
+            return calls
+            
+        except Exception as e:
+            logger.error(f"Failed to search calls: {e}")
+            return []
+    
+    def get_call_summaries(self, limit: int = 100, offset: int = 0) -> List[CallSummary]:
+        """
+        Get recent calls as compact summaries for list views.
+        
+        Only the columns in CallSummary are read, so transcripts and AI
+        response blobs never leave SQLite.
+        
+        Args:
+            limit: Maximum number of calls
+            offset: Number of calls to skip
+        
+        Returns:
+            List of CallSummary records, newest first
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.execute(f'''
+                SELECT {', '.join(CallSummary.__slots__)} FROM calls
+                ORDER BY timestamp DESC
+                LIMIT ? OFFSET ?
+            ''', (limit, offset))
+            
+            summaries = [CallSummary(*row) for row in cursor.fetchall()]
+            
+            conn.close()
+            return summaries
+        
+        except Exception as e:
+            logger.error(f"Failed to retrieve call summaries: {e}")
+            return []
+    
+    def get_new_calls(self, since_id: int, limit: int = 500) -> List[Dict[str, Any]]:
+        """
+        Get calls inserted after a given row id, for live feeds.
+        
+        Args:
+            since_id: Last ``calls.id`` already seen
+            limit: Maximum number of calls
+        
+        Returns:
+            List of dictionaries with ``id``, CallSummary fields, current_danger, weapons
+            and incident_id, oldest first
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            
+            cursor.execute(f'''
+                SELECT id, {', '.join(CallSummary.__slots__)}, current_danger, weapons, incident_id FROM calls
+                WHERE id > ?
+                ORDER BY id
+                LIMIT ?
+            ''', (since_id, limit))
+            
             calls = []
             for row in cursor.fetchall():
                 call = dict(row)
-                
-                # Parse JSON fields
-                if call.get('ai_response_json'):
-                    try:
-                        call['ai_response'] = json.loads(call['ai_response_json'])
-                    except json.JSONDecodeError:
-                        call['ai_response'] = {}
-                
+                call['current_danger'] = bool(call['current_danger'])
+                call['weapons'] = bool(call['weapons'])
                 calls.append(call)
             
             conn.close()
             return calls
-            
+        
         except Exception as e:
-            logger.error(f"Failed to search calls: {e}")
+            logger.error(f"Failed to retrieve new calls: {e}")
             return []
     
+    def get_max_call_id(self) -> int:
+        """Get highest ``calls.id`` (0 for an empty table)."""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT MAX(id) FROM calls')
+            max_id = cursor.fetchone()[0] or 0
+            
+            conn.close()
+            return max_id
+        
+        except Exception as e:
+            logger.error(f"Failed to get max call id: {e}")
+            return 0
+    
+    def get_caller_history(self, caller_id: str, hours: int = 24) -> Dict[str, int]:
+        """
+        Get recent call history of a caller number (exact match).
+        
+        Args:
+            caller_id: Caller phone number
+            hours: Look-back window for ``recent_calls``
+        
+        Returns:
+            Dictionary with ``recent_calls`` and ``false_calls`` (all time)
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            threshold = (datetime.now() - timedelta(hours=hours)).isoformat()
+            cursor.execute('''
+                SELECT
+                    SUM(CASE WHEN timestamp >= ? THEN 1 ELSE 0 END),
+                    SUM(CASE WHEN status = 'false_call' THEN 1 ELSE 0 END)
+                FROM calls
+                WHERE caller_id = ?
+            ''', (threshold, caller_id))
+            recent_calls, false_calls = cursor.fetchone()
+            
+            conn.close()
+            return {'recent_calls': recent_calls or 0, 'false_calls': false_calls or 0}
+        
+        except Exception as e:
+            logger.error(f"Failed to get caller history: {e}")
+            return {'recent_calls': 0, 'false_calls': 0}
+    
+    def get_caller_activity(self, hours: int = 24) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-caller activity for warming a CallerProfileCache.
+        
+        Args:
+            hours: Look-back window for individual call timestamps
+        
+        Returns:
+            Mapping of caller number to ``timestamps`` (epoch seconds of calls in
+            the window), ``last_category`` and ``false_calls`` (all time)
+        """
+        activity: Dict[str, Dict[str, Any]] = {}
+        
+        def profile(caller_id):
+            if caller_id not in activity:
+                activity[caller_id] = {'timestamps': [], 'last_category': None, 'false_calls': 0}
+            return activity[caller_id]
+        
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            threshold = (datetime.now() - timedelta(hours=hours)).isoformat()
+            cursor.execute('''
+                SELECT caller_id, timestamp, category FROM calls
+                WHERE timestamp >= ? AND caller_id IS NOT NULL
+                ORDER BY timestamp
+            ''', (threshold,))
+            for caller_id, timestamp, category in cursor:
+                entry = profile(caller_id)
+                entry['timestamps'].append(datetime.fromisoformat(timestamp).timestamp())
+                entry['last_category'] = category
+            
+            cursor.execute('''
+                SELECT caller_id, COUNT(*) FROM calls
+                WHERE status = 'false_call' AND caller_id IS NOT NULL
+                GROUP BY caller_id
+            ''')
+            for caller_id, false_calls in cursor:
+                profile(caller_id)['false_calls'] = false_calls
+            
+            conn.close()
+            return activity
+        
+        except Exception as e:
+            logger.error(f"Failed to get caller activity: {e}")
+            return {}
+    
+    def get_total_calls(self) -> int:
+        """Get total number of logged calls."""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT COUNT(*) FROM calls')
+            total = cursor.fetchone()[0] or 0
+            
+            conn.close()
+            return total
+        
+        except Exception as e:
+            logger.error(f"Failed to count calls: {e}")
+            return 0
+    
+    def count_calls_since(self, date_from: str) -> int:
+        """
+        Count calls logged at or after a point in time.
+        
+        Args:
+            date_from: ISO date or timestamp (same format as the ``date_from`` filter)
+        
+        Returns:
+            Number of calls (0 on error)
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT COUNT(*) FROM calls WHERE timestamp >= ?', (date_from,))
+            total = cursor.fetchone()[0] or 0
+            
+            conn.close()
+            return total
+        
+        except Exception as e:
+            logger.error(f"Failed to count calls since {date_from}: {e}")
+            return 0
+    
     def get_statistics(self, days: int = 7) -> Dict[str, Any]:
         """Get call statistics for specified period."""
         try:
@@ -495,6 +911,169 @@ class CallLogger:
             logger.error(f"Failed to export to CSV: {e}")
             return False
     
+    def iter_calls(self, since_id: int = 0, batch_size: int = 5000,
+                   columns: Optional[List[str]] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stream calls in primary key order, one batch at a time.
+        
+        Uses keyset pagination on ``id`` so each batch is an index range scan
+        and memory stays bounded regardless of table size.
+        
+        Args:
+            since_id: Only rows with ``id`` greater than this are returned
+            batch_size: Maximum number of rows per batch
+            columns: Columns to read (``id`` is always included); all by default
+        
+        Yields:
+            Lists of call rows as dictionaries (``ai_response_json`` unparsed)
+        """
+        if columns is not None and 'id' not in columns:
+            columns = ['id'] + list(columns)
+        select_clause = self._select_clause(columns)
+        
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            last_id = since_id
+            while True:
+                cursor = conn.execute(f'''
+                    {select_clause} FROM calls
+                    WHERE id > ?
+                    ORDER BY id
+                    LIMIT ?
+                ''', (last_id, batch_size))
+                rows = [dict(row) for row in cursor.fetchall()]
+                if not rows:
+                    break
+                
+                last_id = rows[-1]['id']
+                yield rows
+        finally:
+            conn.close()
+    
+    def mark_false_call(self, call_id: str) -> bool:
+        """
+        Mark a logged call as a confirmed false call.
+        
+        Sets ``status = 'false_call'`` and counts the call against the
+        caller's number in the caller profile cache, so hoax screening
+        applies to the next calls from it. Marking twice has no effect.
+        
+        Args:
+            call_id: Call identifier
+        
+        Returns:
+            True if the call was marked, False if not found or already marked
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                row = conn.execute(
+                    "SELECT caller_id FROM calls WHERE call_id = ? AND COALESCE(status, '') != 'false_call'",
+                    (call_id,)
+                ).fetchone()
+                if row is None:
+                    return False
+                conn.execute("UPDATE calls SET status = 'false_call' WHERE call_id = ?", (call_id,))
+        finally:
+            conn.close()
+        
+        logger.info(f"Call {call_id} marked as false call")
+        if self.caller_profiles is not None:
+            self.caller_profiles.record_false_call(row[0])
+        return True
+    
+    def update_classifications(self, updates: List[Dict[str, Any]]) -> int:
+        """
+        Overwrite classification fields of existing calls in one transaction.
+        
+        Args:
+            updates: Dictionaries with the row ``id`` and the classification
+                result (``ai_response``) to store for it
+        
+        Returns:
+            Number of updated rows
+        """
+        if not updates:
+            return 0
+        
+        params = []
+        for update in updates:
+            ai_response = update['ai_response']
+            address = ai_response.get('address', 'не указан')
+            params.append((
+                json.dumps(ai_response, ensure_ascii=False),
+                ai_response.get('urgency', 'medium'),
+                ai_response.get('category', 'other'),
+                address,
+                ai_response.get('current_danger', False),
+                ai_response.get('people_involved', 0),
+                ai_response.get('weapons', False),
+                ai_response.get('recommended_department', 'Полиция'),
+                ai_response.get('summary', ''),
+                ai_response.get('confidence_score', 0.0),
+                ai_response.get('validated', False),
+                *self._geocode(address),
+                update['id']
+            ))
+        
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                cursor = conn.executemany('''
+                    UPDATE calls SET
+                        ai_response_json = ?, urgency = ?, category = ?, address = ?,
+                        current_danger = ?, people_involved = ?, weapons = ?,
+                        recommended_department = ?, summary = ?, confidence_score = ?,
+                        validated = ?, street_id = ?, latitude = ?, longitude = ?
+                    WHERE id = ?
+                ''', params)
+                updated = cursor.rowcount
+        finally:
+            conn.close()
+        
+        return updated
+    
+    def backfill_locations(self, only_missing: bool = True, batch_size: int = 5000) -> Dict[str, int]:
+        """
+        Geocode stored calls with the gazetteer and write their coordinates.
+        
+        Args:
+            only_missing: Skip calls that already have coordinates
+            batch_size: Rows read and updated per transaction
+        
+        Returns:
+            Dictionary with numbers of processed and geocoded calls
+        """
+        if self.gazetteer is None:
+            raise ValueError("No gazetteer configured")
+        
+        processed = geocoded = 0
+        for rows in self.iter_calls(batch_size=batch_size, columns=['id', 'address', 'latitude']):
+            updates = []
+            for row in rows:
+                if only_missing and row['latitude'] is not None:
+                    continue
+                processed += 1
+                street_id, latitude, longitude = self._geocode(row['address'])
+                if street_id is not None:
+                    updates.append((street_id, latitude, longitude, row['id']))
+            
+            if updates:
+                conn = sqlite3.connect(self.db_path)
+                try:
+                    with conn:
+                        conn.executemany(
+                            'UPDATE calls SET street_id = ?, latitude = ?, longitude = ? WHERE id = ?',
+                            updates
+                        )
+                finally:
+                    conn.close()
+                geocoded += len(updates)
+        
+        logger.info(f"Location backfill: {geocoded} of {processed} calls geocoded")
+        return {'processed': processed, 'geocoded': geocoded}
+    
     def backup_database(self, backup_path: str = None):
         """Create backup of the database."""
         try:
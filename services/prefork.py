@@ -0,0 +1,254 @@
+"""
+Pre-fork Server for AI Call Intake System.
+Loads local models once in a master process and forks uvicorn workers that share them copy-on-write.
+"""
+
+import gc
+import os
+import sys
+import time
+import signal
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Models loaded by the master before forking, inherited by every worker
+_preloaded: Dict[str, Any] = {}
+
+# Index of this pre-fork worker (0 in a normally started process)
+_worker_index = 0
+
+
+def preloaded_models() -> Dict[str, Any]:
+    """Get models the pre-fork master loaded (empty in a normally started process)."""
+    return _preloaded
+
+
+def worker_index() -> int:
+    """Get the index of this pre-fork worker; a restarted worker keeps the index of the one it replaces."""
+    return _worker_index
+
+
+def memory_usage(pid: int) -> Dict[str, int]:
+    """
+    Get memory usage of a process in kB from /proc/<pid>/smaps_rollup (Linux).
+    
+    RSS counts pages shared with other processes in full; PSS divides
+    them among the processes that share them, so the PSS of the master
+    and its workers adds up to the memory the server really uses.
+    
+    Args:
+        pid: Process id
+    
+    Returns:
+        rss, pss, shared and private memory in kB (empty if unavailable)
+    """
+    usage = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                if name in ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty'):
+                    usage[name.lower()] = int(value.split()[0])
+    except (OSError, ValueError):
+        return {}
+    
+    return {
+        'rss': usage.get('rss', 0),
+        'pss': usage.get('pss', 0),
+        'shared': usage.get('shared_clean', 0) + usage.get('shared_dirty', 0),
+        'private': usage.get('private_clean', 0) + usage.get('private_dirty', 0)
+    }
+
+
+def memory_report(pids: Iterable[int]) -> Dict[str, Any]:
+    """
+    Summarize memory usage of a group of processes.
+    
+    Args:
+        pids: Process ids (master and workers)
+    
+    Returns:
+        Per-process usage and the total PSS in kB
+    """
+    processes = {pid: memory_usage(pid) for pid in pids}
+    return {
+        'processes': processes,
+        'total_pss': sum(usage.get('pss', 0) for usage in processes.values()),
+        'total_rss': sum(usage.get('rss', 0) for usage in processes.values())
+    }
+
+
+class PreforkServer:
+    """
+    Master process that preloads models and forks uvicorn workers.
+    
+    ``uvicorn --workers`` starts workers with multiprocessing spawn, so
+    each imports the app and loads its own Whisper/Coqui weights. Here
+    the master loads them once, moves everything allocated so far to the
+    permanent GC generation (``gc.freeze``) so collections in the workers
+    do not write to the shared objects, binds the socket and forks. Model
+    weights are only read during inference, so their pages stay shared
+    between all workers. Dead workers are restarted.
+    
+    Only local models belong in ``preload``: network clients (gRPC,
+    HTTP pools) must be created in each worker after the fork. The master
+    must not run inference itself, since thread pools started before a
+    fork (OpenMP in torch) do not survive it.
+    """
+    
+    def __init__(self, app: Any, host: str = "0.0.0.0", port: int = 8000, workers: int = 4,
+                 preload: Optional[Callable[[], Dict[str, Any]]] = None, **uvicorn_options):
+        """
+        Initialize server.
+        
+        Args:
+            app: ASGI app or import string ("main:app")
+            host: Bind address
+            port: Bind port
+            workers: Number of worker processes
+            preload: Callable returning the models to share, e.g. {"stt": STTService(...)}
+            **uvicorn_options: Extra uvicorn.Config options (log_level, timeout_keep_alive, ...)
+        """
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.preload = preload
+        self.uvicorn_options = uvicorn_options
+        self.children: Dict[int, int] = {}
+        self.should_exit = False
+        self.config = None
+        self.socket = None
+    
+    def run(self):
+        """Preload models, start workers and supervise them until SIGTERM/SIGINT."""
+        try:
+            import uvicorn
+        except ImportError:
+            logger.error("uvicorn not installed. Install with: pip install uvicorn")
+            raise
+        
+        if self.preload:
+            started = time.perf_counter()
+            _preloaded.update(self.preload() or {})
+            logger.info(f"Preloaded {', '.join(_preloaded) or 'no models'} "
+                        f"in {time.perf_counter() - started:.1f}s (pid {os.getpid()})")
+        
+        self.config = uvicorn.Config(self.app, host=self.host, port=self.port, **self.uvicorn_options)
+        self.config.load()  # Import the app in the master too, so its modules are shared as well
+        self.socket = self.config.bind_socket()
+        
+        gc.collect()
+        gc.freeze()
+        
+        signal.signal(signal.SIGTERM, self._handle_exit)
+        signal.signal(signal.SIGINT, self._handle_exit)
+        
+        for index in range(self.workers):
+            self._spawn(index)
+        logger.info(f"Pre-fork server on {self.host}:{self.port}: {self.workers} workers {list(self.children)}")
+        
+        self._supervise()
+        self.socket.close()
+    
+    def _spawn(self, index: int):
+        """Fork one worker serving on the shared socket."""
+        global _worker_index
+        pid = os.fork()
+        if pid:
+            self.children[pid] = index
+            return
+        
+        _worker_index = index
+        # Worker: default signal handling, uvicorn installs its own
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        self._limit_threads()
+        code = 0
+        try:
+            import uvicorn
+            uvicorn.Server(self.config).run(sockets=[self.socket])
+        except Exception as e:
+            logger.error(f"Worker {index} failed: {e}")
+            code = 1
+        finally:
+            os._exit(code)
+    
+    def _limit_threads(self):
+        """Split CPU threads of already imported inference libraries between workers."""
+        torch = sys.modules.get('torch')
+        if torch is not None:
+            torch.set_num_threads(max(1, (os.cpu_count() or 1) // self.workers))
+    
+    def _supervise(self):
+        """
+        Wait for workers; restart the ones that die unless shutting down.
+        
+        Workers are polled by pid rather than with ``os.wait()``, which
+        would also reap other children of the master (the inference pool
+        processes) behind the back of their owner.
+        """
+        while self.children:
+            for pid in list(self.children):
+                try:
+                    exited, status = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    exited, status = pid, -1
+                if not exited:
+                    continue
+                
+                index = self.children.pop(pid)
+                if self.should_exit:
+                    continue
+                logger.warning(f"Worker {index} (pid {pid}) exited with status {status}, restarting")
+                time.sleep(1)
+                self._spawn(index)
+            time.sleep(0.5)
+    
+    def _handle_exit(self, signum, frame):
+        """Stop all workers."""
+        self.should_exit = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get worker pids and memory usage of the master and its workers."""
+        return {
+            'master': os.getpid(),
+            'workers': sorted(self.children),
+            'memory': memory_report([os.getpid(), *self.children])
+        }
+
+
+def run_prefork(app: Any, workers: int, preload: Optional[Callable[[], Dict[str, Any]]] = None,
+                **options):
+    """
+    Run an ASGI app in pre-fork mode.
+    
+    Args:
+        app: ASGI app or import string
+        workers: Number of worker processes
+        preload: Callable returning the models to share
+        **options: host, port and uvicorn.Config options
+    """
+    PreforkServer(app, workers=workers, preload=preload, **options).run()
+
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
+    async def app(scope, receive, send):
+        if scope['type'] != 'http':
+            return
+        weights = preloaded_models().get('weights', b'')
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [(b'content-type', b'text/plain')]})
+        await send({'type': 'http.response.body', 'body': f"pid {os.getpid()}, {len(weights)} bytes shared\n".encode()})
+    
+    run_prefork(app, workers=2, preload=lambda: {'weights': bytes(64 * 1024 * 1024)}, port=8009)
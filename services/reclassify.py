@@ -0,0 +1,162 @@
+"""
+Bulk Reclassification Service for AI Call Intake System.
+Re-runs rule-based classification over stored calls, e.g. after keyword changes.
+"""
+
+import json
+import time
+import logging
+from typing import Dict, Any
+
+from services.classifier import IncidentClassifier
+from services.logger import CallLogger
+
+logger = logging.getLogger(__name__)
+
+
+# Fields added to the classifier input that are not part of the stored AI response
+INPUT_ONLY_FIELDS = ['transcript']
+
+# Fields the classifier rules fill from keywords; a valid stored value is kept
+# unless it is removed from the input, so a forced run drops them
+RULE_DERIVED_FIELDS = [
+    'category', 'urgency', 'current_danger', 'weapons', 'recommended_department',
+    'confidence_score', 'validated', 'validation_notes'
+]
+
+
+class BulkReclassifier:
+    """Streams the calls table through IncidentClassifier.classify_batch and writes results back."""
+    
+    def __init__(self, call_logger: CallLogger, classifier: IncidentClassifier, batch_size: int = 5000):
+        """
+        Initialize reclassifier.
+        
+        Args:
+            call_logger: Call logger providing access to the calls database
+            classifier: Classifier with the current rules and keywords
+            batch_size: Number of rows read, classified and updated per batch
+        """
+        self.call_logger = call_logger
+        self.classifier = classifier
+        self.batch_size = batch_size
+        
+        logger.info(f"Initializing BulkReclassifier with batch size {batch_size}")
+    
+    def run(self, since_id: int = 0, dry_run: bool = False, force: bool = False) -> Dict[str, Any]:
+        """
+        Reclassify all calls with ``id`` greater than ``since_id``.
+        
+        The classifier keeps a stored category, urgency or department that
+        is already valid, so a plain run only fills gaps and fixes invalid
+        values. After keyword changes use ``force``: rule-derived fields are
+        dropped from the input and re-derived from the transcript, which
+        also replaces values the LLM chose.
+        
+        Args:
+            since_id: Resume point (last processed ``calls.id``)
+            dry_run: Classify and count changes without writing them
+            force: Re-derive RULE_DERIVED_FIELDS instead of validating the stored ones
+        
+        Returns:
+            Dictionary with reclassification statistics
+        """
+        started = time.perf_counter()
+        rows_processed = 0
+        rows_changed = 0
+        category_changes: Dict[str, int] = {}
+        urgency_changes: Dict[str, int] = {}
+        last_id = since_id
+        
+        for rows in self.call_logger.iter_calls(
+            since_id=since_id,
+            batch_size=self.batch_size,
+            columns=['id', 'transcript', 'ai_response_json']
+        ):
+            stored = [self._parse_ai_response(row) for row in rows]
+            records = [
+                {**ai_response, 'transcript': ai_response.get('transcript', row.get('transcript') or '')}
+                for row, ai_response in zip(rows, stored)
+            ]
+            if force:
+                for record in records:
+                    for field in RULE_DERIVED_FIELDS:
+                        record.pop(field, None)
+            results = self.classifier.classify_batch(records)
+            
+            updates = []
+            for row, ai_response, result in zip(rows, stored, results):
+                for field in INPUT_ONLY_FIELDS:
+                    if field not in ai_response:
+                        result.pop(field, None)
+                
+                if result != ai_response:
+                    updates.append({'id': row['id'], 'ai_response': result})
+                    old_category = ai_response.get('category')
+                    if old_category != result.get('category'):
+                        change = f"{old_category} -> {result.get('category')}"
+                        category_changes[change] = category_changes.get(change, 0) + 1
+                    old_urgency = ai_response.get('urgency')
+                    if old_urgency != result.get('urgency'):
+                        change = f"{old_urgency} -> {result.get('urgency')}"
+                        urgency_changes[change] = urgency_changes.get(change, 0) + 1
+            
+            if updates and not dry_run:
+                self.call_logger.update_classifications(updates)
+            
+            rows_processed += len(rows)
+            rows_changed += len(updates)
+            last_id = rows[-1]['id']
+            logger.info(f"Reclassified up to id {last_id}: {rows_processed} rows, {rows_changed} changed")
+        
+        return {
+            'rows_processed': rows_processed,
+            'rows_changed': rows_changed,
+            'category_changes': category_changes,
+            'urgency_changes': urgency_changes,
+            'since_id': since_id,
+            'last_id': last_id,
+            'dry_run': dry_run,
+            'force': force,
+            'elapsed_seconds': round(time.perf_counter() - started, 2)
+        }
+    
+    @staticmethod
+    def _parse_ai_response(row: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse stored AI response of a row, tolerating empty or corrupt values."""
+        if not row.get('ai_response_json'):
+            return {}
+        try:
+            parsed = json.loads(row['ai_response_json'])
+            return parsed if isinstance(parsed, dict) else {}
+        except json.JSONDecodeError:
+            logger.warning(f"Corrupt ai_response_json in call row {row['id']}, reclassifying from transcript")
+            return {}
+
+
+# Factory function for easy instantiation
+def create_reclassifier(db_path: str = None, batch_size: int = 5000):
+    """Create and return bulk reclassifier instance."""
+    return BulkReclassifier(CallLogger(db_path), IncidentClassifier(), batch_size)
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    logging.basicConfig(level=logging.INFO)
+    
+    parser = argparse.ArgumentParser(description="Reclassify stored calls with the current classifier rules")
+    parser.add_argument('--db', default=None, help="Path to calls SQLite database (default: $CALL_LOG_DB)")
+    parser.add_argument('--batch-size', type=int, default=5000, help="Rows per batch")
+    parser.add_argument('--since-id', type=int, default=0, help="Only reclassify calls with a greater id")
+    parser.add_argument('--dry-run', action='store_true', help="Report changes without writing them")
+    parser.add_argument('--force', action='store_true',
+                        help="Re-derive category, urgency and department from the transcript (after keyword changes)")
+    args = parser.parse_args()
+    
+    # Per-record classifier logging would dominate the run time
+    logging.getLogger('services.classifier').setLevel(logging.WARNING)
+    
+    reclassifier = create_reclassifier(args.db, args.batch_size)
+    stats = reclassifier.run(since_id=args.since_id, dry_run=args.dry_run, force=args.force)
+    print(json.dumps(stats, indent=2, ensure_ascii=False))
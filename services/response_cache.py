@@ -0,0 +1,111 @@
+"""
+Response Cache for AI Call Intake System.
+Versioned in-memory cache of rendered HTTP responses with ETag support.
+"""
+
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse(NamedTuple):
+    """Rendered response body with its validator."""
+    body: bytes
+    content_type: str
+    etag: str
+    created_at: float
+
+
+class ResponseCache:
+    """
+    LRU cache of rendered responses keyed by request and data version.
+    
+    Entries are tied to the data version that produced them, so a write
+    (which bumps the version) invalidates everything without explicit purges.
+    A TTL bounds staleness of responses that also depend on the clock,
+    such as "today" counters.
+    """
+    
+    def __init__(self, max_entries: int = 512, ttl: float = 60.0):
+        """
+        Initialize response cache.
+        
+        Args:
+            max_entries: Maximum number of cached responses
+            ttl: Maximum age of an entry in seconds
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Any, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_etag(body: bytes) -> str:
+        """Build strong ETag from response content."""
+        return '"' + hashlib.md5(body).hexdigest() + '"'
+    
+    def get(self, key: Hashable, version: int) -> Optional[CachedResponse]:
+        """
+        Look up cached response.
+        
+        Args:
+            key: Request key (endpoint and arguments)
+            version: Current data version
+        
+        Returns:
+            Cached response or None if missing, expired or from an older version
+        """
+        cache_key = (key, version)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None or time.monotonic() - entry.created_at > self.ttl:
+                if entry is not None:
+                    del self._entries[cache_key]
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            return entry
+    
+    def put(self, key: Hashable, version: int, body: bytes, content_type: str) -> CachedResponse:
+        """
+        Store rendered response.
+        
+        Args:
+            key: Request key (endpoint and arguments)
+            version: Data version the response was computed from
+            body: Response body
+            content_type: Response content type
+        
+        Returns:
+            Stored entry including its ETag
+        """
+        entry = CachedResponse(body, content_type, self.make_etag(body), time.monotonic())
+        with self._lock:
+            self._entries[(key, version)] = entry
+            self._entries.move_to_end((key, version))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+    
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> dict:
+        """Get cache statistics."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses
+            }
@@ -9,6 +9,9 @@ import tempfile
 from typing import Optional
 from enum import Enum
 
+from services.circuit_breaker import get_breaker
+from services.inference_pool import get_inference_pool, inference_pool_enabled
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,7 +26,8 @@ class STTEngine(Enum):
 class STTService:
     """Main STT service class."""
     
-    def __init__(self, engine: str = None, model_size: str = "base", language: str = "kk"):
+    def __init__(self, engine: str = None, model_size: str = "base", language: str = "kk",
+                 use_inference_pool: Optional[bool] = None):
         """
         Initialize STT service.
         
@@ -31,24 +35,39 @@ class STTService:
             engine: STT engine to use (whisper, google, azure, mock)
             model_size: For Whisper, model size (tiny, base, small, medium, large)
             language: Default language for transcription
+            use_inference_pool: Run Whisper in the inference worker processes
+                instead of loading it here (default: $INFERENCE_WORKERS > 0)
         """
         self.engine = engine or os.getenv('STT_ENGINE', 'whisper').lower()
         self.model_size = model_size
         self.language = language
         self.model = None
         self.client = None
+        self.breaker = None
+        self.use_inference_pool = inference_pool_enabled() if use_inference_pool is None else use_inference_pool
         
         logger.info(f"Initializing STT service with engine: {self.engine}")
         
         # Initialize selected engine
         if self.engine == STTEngine.WHISPER.value:
-            self._init_whisper()
+            if self.use_inference_pool:
+                logger.info("Whisper runs in the inference pool")
+            else:
+                self._init_whisper()
         elif self.engine == STTEngine.GOOGLE.value:
             self._init_google()
         elif self.engine == STTEngine.AZURE.value:
             self._init_azure()
         else:
             logger.info("Using mock STT engine for testing")
+        
+        # Cloud engines go through a breaker shared by all services of the process
+        if self.client:
+            self.breaker = get_breaker(
+                f"stt.{self.engine}",
+                slow_call_seconds=8.0,
+                max_timeout=float(os.getenv('STT_TIMEOUT', 15))
+            )
     
     def _init_whisper(self):
         """Initialize Whisper model."""
@@ -141,9 +160,9 @@ class STTService:
             if self.engine == STTEngine.WHISPER.value:
                 return self._transcribe_whisper(audio_data, language)
             elif self.engine == STTEngine.GOOGLE.value:
-                return self._transcribe_google(audio_data, engine_language)
+                return self.breaker.call(self._transcribe_google, audio_data, engine_language)
             elif self.engine == STTEngine.AZURE.value:
-                return self._transcribe_azure(audio_data, engine_language)
+                return self.breaker.call(self._transcribe_azure, audio_data, engine_language)
             else:
                 return self._transcribe_mock(audio_data, language)
         except Exception as e:
@@ -153,6 +172,8 @@ class STTService:
     
     def _transcribe_whisper(self, audio_data: bytes, language: str) -> str:
         """Transcribe using Whisper."""
+        if self.use_inference_pool:
+            return get_inference_pool().transcribe(audio_data, language)
         if not self.model:
             raise RuntimeError("Whisper model not initialized")
         
@@ -196,7 +217,7 @@ class STTService:
         )
         
         # Perform transcription
-        response = self.client.recognize(config=config, audio=audio)
+        response = self.client.recognize(config=config, audio=audio, timeout=self.breaker.timeout())
         
         # Combine results
         transcripts = []
@@ -276,7 +297,8 @@ class STTService:
             'engine': self.engine,
             'model_size': self.model_size if self.engine == 'whisper' else None,
             'supported_languages': self.get_supported_languages(),
-            'status': 'initialized' if self.model or self.client else 'mock'
+            'status': 'inference_pool' if self.use_inference_pool else
+                      'initialized' if self.model or self.client else 'mock'
         }
 
 
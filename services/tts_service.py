@@ -10,6 +10,9 @@ from pathlib import Path
 from typing import Optional
 from enum import Enum
 
+from services.circuit_breaker import get_breaker
+from services.inference_pool import get_inference_pool, inference_pool_enabled
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,7 +27,8 @@ class TTSEngine(Enum):
 class TTSService:
     """Main TTS service class."""
     
-    def __init__(self, engine: str = None, voice: str = None, language: str = None):
+    def __init__(self, engine: str = None, voice: str = None, language: str = None,
+                 use_inference_pool: Optional[bool] = None):
         """
         Initialize TTS service.
         
@@ -32,12 +36,16 @@ class TTSService:
             engine: TTS engine to use (coqui, openai, google, mock)
             voice: Voice name or ID
             language: Language for TTS
+            use_inference_pool: Run Coqui in the inference worker processes
+                instead of loading it here (default: $INFERENCE_WORKERS > 0)
         """
         self.engine = 'mock'  # Force mock for now
         self.voice = voice or os.getenv('TTS_VOICE', 'tts_models/multilingual/multi-dataset/xtts_v2')
         self.language = language or os.getenv('DEFAULT_LANGUAGE', 'kk')
         self.model = None
         self.client = None
+        self.breaker = None
+        self.use_inference_pool = inference_pool_enabled() if use_inference_pool is None else use_inference_pool
         self.output_dir = Path(os.getenv('TTS_OUTPUT_DIR', '/tmp/tts_output'))
         
         # Create output directory
@@ -47,13 +55,24 @@ class TTSService:
         
         # Initialize selected engine
         if self.engine == TTSEngine.COQUI.value:
-            self._init_coqui()
+            if self.use_inference_pool:
+                logger.info("Coqui TTS runs in the inference pool")
+            else:
+                self._init_coqui()
         elif self.engine == TTSEngine.OPENAI.value:
             self._init_openai()
         elif self.engine == TTSEngine.GOOGLE.value:
             self._init_google()
         else:
             logger.info("Using mock TTS engine for testing")
+        
+        # Cloud engines go through a breaker shared by all services of the process
+        if self.client:
+            self.breaker = get_breaker(
+                f"tts.{self.engine}",
+                slow_call_seconds=5.0,
+                max_timeout=float(os.getenv('TTS_TIMEOUT', 10))
+            )
     
     def _init_coqui(self):
         """Initialize Coqui TTS model."""
@@ -145,9 +164,11 @@ class TTSService:
             if self.engine == TTSEngine.COQUI.value:
                 return self._tts_coqui(text, language, output_format)
             elif self.engine == TTSEngine.OPENAI.value:
-                return self._tts_openai(text, language, output_format)
+                return self.breaker.call(self._tts_openai, text, language, output_format,
+                                         is_failure=lambda path: path is None)
             elif self.engine == TTSEngine.GOOGLE.value:
-                return self._tts_google(text, language, output_format)
+                return self.breaker.call(self._tts_google, text, language, output_format,
+                                         is_failure=lambda path: path is None)
             else:
                 return self._tts_mock(text, language, output_format)
         except Exception as e:
@@ -183,6 +204,8 @@ class TTSService:
     
     def _tts_coqui(self, text: str, language: str, output_format: str) -> Optional[str]:
         """Convert text to speech using Coqui TTS."""
+        if self.use_inference_pool:
+            return get_inference_pool().text_to_speech(text, language, output_format)
         if not self.model:
             raise RuntimeError("Coqui TTS model not initialized")
         
@@ -241,7 +264,8 @@ class TTSService:
             response = self.client.audio.speech.create(
                 model="tts-1",
                 voice=voice,
-                input=text
+                input=text,
+                timeout=self.breaker.timeout()
             )
             
             # Save audio
@@ -300,7 +324,8 @@ class TTSService:
             response = self.client.synthesize_speech(
                 input=synthesis_input,
                 voice=voice,
-                audio_config=audio_config
+                audio_config=audio_config,
+                timeout=self.breaker.timeout()
             )
             
             # Write audio content to file
@@ -375,7 +400,8 @@ class TTSService:
             'voice': self.voice,
             'supported_languages': self.get_supported_languages(),
             'output_dir': str(self.output_dir),
-            'status': 'initialized' if self.model or self.client else 'mock'
+            'status': 'inference_pool' if self.use_inference_pool else
+                      'initialized' if self.model or self.client else 'mock'
         }
         
         if self.engine == TTSEngine.OPENAI.value and hasattr(self, 'supported_voices'):
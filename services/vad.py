@@ -0,0 +1,158 @@
+"""
+Voice Activity Detection for AI Call Intake System.
+Frame-level speech detection with start/end-of-speech events for barge-in and turn taking.
+"""
+
+import os
+import math
+import logging
+from array import array
+from enum import Enum
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class VADEngine(Enum):
+    """Available VAD engines."""
+    WEBRTC = "webrtc"
+    ENERGY = "energy"
+
+
+class VoiceActivityDetector:
+    """
+    Detects the start and end of caller speech in 16-bit mono PCM frames.
+    
+    Frames are classified as speech or not by WebRTC VAD, or by an energy
+    threshold above an adaptive noise floor when webrtcvad is not
+    installed. Speech starts after ``start_ms`` of consecutive speech
+    frames (so clicks and short noise do not interrupt prompts) and ends
+    after ``end_ms`` of consecutive non-speech frames.
+    """
+    
+    START = 'start'
+    END = 'end'
+    
+    def __init__(self, sample_rate: int = 8000, frame_ms: int = 20, engine: str = None,
+                 aggressiveness: int = 2, start_ms: int = 200, end_ms: int = 700):
+        """
+        Initialize detector.
+        
+        Args:
+            sample_rate: Sample rate of the audio (8000 for telephony)
+            frame_ms: Frame length in milliseconds (10, 20 or 30)
+            engine: VAD engine (webrtc, energy); $VAD_ENGINE or webrtc by default
+            aggressiveness: WebRTC VAD aggressiveness 0-3
+            start_ms: Speech needed before speech counts as started
+            end_ms: Silence needed before speech counts as ended
+        """
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_bytes = sample_rate * frame_ms // 1000 * 2
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.end_frames = max(1, end_ms // frame_ms)
+        self.engine = (engine or os.getenv('VAD_ENGINE', VADEngine.WEBRTC.value)).lower()
+        self.vad = None
+        
+        if self.engine == VADEngine.WEBRTC.value:
+            try:
+                self._init_webrtc(aggressiveness)
+            except ImportError:
+                logger.warning("Falling back to energy VAD")
+                self.engine = VADEngine.ENERGY.value
+        
+        # Energy VAD: RMS noise floor, adapted on non-speech frames
+        self.noise_floor = 100.0
+        self.min_rms = 300.0
+        self.energy_ratio = 3.0
+        
+        self.reset()
+    
+    def _init_webrtc(self, aggressiveness: int):
+        """Initialize WebRTC VAD."""
+        try:
+            import webrtcvad
+            self.vad = webrtcvad.Vad(aggressiveness)
+            logger.info(f"WebRTC VAD initialized (aggressiveness {aggressiveness})")
+        except ImportError:
+            logger.error("webrtcvad not installed. Install with: pip install webrtcvad")
+            raise
+    
+    def reset(self):
+        """Forget the current utterance (keeps the noise floor)."""
+        self.in_speech = False
+        self._speech_run = 0
+        self._silence_run = 0
+    
+    def is_speech(self, frame: bytes) -> bool:
+        """
+        Classify one frame.
+        
+        Args:
+            frame: ``frame_ms`` of 16-bit little-endian mono PCM
+        
+        Returns:
+            True if the frame contains speech
+        """
+        if self.vad is not None:
+            return self.vad.is_speech(frame, self.sample_rate)
+        
+        samples = array('h', frame)
+        if not samples:
+            return False
+        rms = math.sqrt(sum(sample * sample for sample in samples) / len(samples))
+        speech = rms >= max(self.min_rms, self.noise_floor * self.energy_ratio)
+        if not speech:
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * rms
+        return speech
+    
+    def process(self, frame: bytes) -> Optional[str]:
+        """
+        Feed one frame and report a change of state.
+        
+        Args:
+            frame: ``frame_ms`` of 16-bit little-endian mono PCM
+        
+        Returns:
+            START when speech begins, END when it ends, None otherwise
+        """
+        speech = self.is_speech(frame)
+        
+        if not self.in_speech:
+            self._speech_run = self._speech_run + 1 if speech else 0
+            if self._speech_run >= self.start_frames:
+                self.in_speech = True
+                self._silence_run = 0
+                return self.START
+            return None
+        
+        self._silence_run = 0 if speech else self._silence_run + 1
+        if self._silence_run >= self.end_frames:
+            self.in_speech = False
+            self._speech_run = 0
+            return self.END
+        return None
+
+
+# Factory function for easy instantiation
+def create_vad(sample_rate=8000, engine=None):
+    """Create and return voice activity detector instance."""
+    return VoiceActivityDetector(sample_rate=sample_rate, engine=engine)
+
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
+    vad = create_vad(engine='energy')
+    frame_samples = vad.frame_bytes // 2
+    
+    def tone(amplitude: int) -> bytes:
+        return array('h', (int(amplitude * math.sin(i / 3.0)) for i in range(frame_samples))).tobytes()
+    
+    # 0.5 s noise, 1 s speech, 1 s noise
+    frames = [tone(50)] * 25 + [tone(3000)] * 50 + [tone(50)] * 50
+    for index, frame in enumerate(frames):
+        event = vad.process(frame)
+        if event:
+            print(f"{index * vad.frame_ms} ms: speech {event}")